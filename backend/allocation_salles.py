@@ -0,0 +1,270 @@
+"""
+Allocation des salles libres par créneau
+Chaque plage horaire d'un jour garde ses salles libres regroupées par capacité
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import date as date_type, time
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class CreneauSalles:
+    """
+    Salles libres d'un créneau, rangées par capacité
+
+    Pour chaque capacité, un tas contient le rang (position dans la liste des
+    salles) des salles libres : à capacité égale, la salle de plus petit rang
+    est choisie en premier. Les capacités ayant au moins une salle libre sont
+    gardées triées pour trouver par bisection la plus petite salle suffisante.
+    Occuper une salle précise ne la retire pas de son tas : elle y est ignorée
+    tant qu'elle reste occupée (suppression paresseuse).
+    """
+
+    def __init__(self, rangs_par_capacite: Dict[int, List[int]]):
+        self.tas: Dict[int, List[int]] = {
+            capacite: list(rangs) for capacite, rangs in rangs_par_capacite.items()
+        }
+        self.nb_libres: Dict[int, int] = {
+            capacite: len(rangs) for capacite, rangs in rangs_par_capacite.items()
+        }
+        self.capacites_libres: List[int] = sorted(
+            capacite for capacite, nb in self.nb_libres.items() if nb > 0
+        )
+        self.occupees = set()
+        self.nb_operations_tas = 0
+
+    def occuper(self, rang: int, capacite: int):
+        """Marque la salle comme occupée (sans effet si elle l'est déjà)"""
+        if rang in self.occupees:
+            return
+        self.occupees.add(rang)
+        self.nb_libres[capacite] -= 1
+        if self.nb_libres[capacite] == 0:
+            self.capacites_libres.pop(bisect_left(self.capacites_libres, capacite))
+
+    def liberer(self, rang: int, capacite: int):
+        """Rend la salle disponible (sans effet si elle l'est déjà)"""
+        if rang not in self.occupees:
+            return
+        self.occupees.discard(rang)
+        if self.nb_libres[capacite] == 0:
+            insort(self.capacites_libres, capacite)
+        self.nb_libres[capacite] += 1
+        heapq.heappush(self.tas[capacite], rang)
+        self.nb_operations_tas += 1
+
+    def premiers_libres(self, capacite: int, nb: int) -> List[int]:
+        """Rangs des nb salles libres de plus petit rang pour une capacité"""
+        tas = self.tas[capacite]
+        rangs = []
+        nb_retraits = len(tas)
+        while len(rangs) < nb:
+            rang = heapq.heappop(tas)
+            if rang not in self.occupees and (not rangs or rang != rangs[-1]):
+                rangs.append(rang)
+        nb_retraits -= len(tas)
+        for rang in rangs:
+            heapq.heappush(tas, rang)
+        self.nb_operations_tas += nb_retraits + len(rangs)
+        return rangs
+
+    def choisir_capacites(self, nb_etudiants: int) -> Dict[int, int]:
+        """
+        Choisit combien de salles prendre dans chaque capacité
+
+        Les plus grandes salles libres sont prises tant que les étudiants
+        restants ne tiennent pas dans une seule salle, ce qui minimise le
+        nombre de salles ; la dernière salle est la plus petite suffisante
+        (best-fit). Si ce choix perd des places, les autres choix du même
+        nombre de salles sont explorés (ameliorer_capacites) pour perdre le
+        moins de places possible.
+
+        Returns:
+            Nombre de salles par capacité, vide si les salles libres ne suffisent pas
+        """
+        prises: Dict[int, int] = defaultdict(int)
+        restants = nb_etudiants
+        capacites = self.capacites_libres
+
+        while restants > 0:
+            position = bisect_left(capacites, restants)
+            while position < len(capacites) and prises[capacites[position]] >= self.nb_libres[capacites[position]]:
+                position += 1
+            if position < len(capacites):
+                prises[capacites[position]] += 1
+                if capacites[position] > restants and len(prises) > 1:
+                    return self.ameliorer_capacites(nb_etudiants, prises)
+                return prises
+
+            position = len(capacites) - 1
+            while position >= 0 and prises[capacites[position]] >= self.nb_libres[capacites[position]]:
+                position -= 1
+            if position < 0:
+                return {}
+            prises[capacites[position]] += 1
+            restants -= capacites[position]
+
+        return prises
+
+    def ameliorer_capacites(self, nb_etudiants: int, initiales: Dict[int, int]) -> Dict[int, int]:
+        """
+        Choix du même nombre de salles que initiales perdant le moins de places
+
+        Séparation et évaluation sur les capacités libres, prises par ordre
+        décroissant, la dernière salle étant toujours la plus petite suffisante.
+        À perte égale, le choix initial (plus grandes salles d'abord) est gardé.
+        """
+        capacites = self.capacites_libres
+        decroissantes = capacites[::-1]
+        meilleur = {'total': sum(capacite * nb for capacite, nb in initiales.items()), 'prises': initiales}
+        prises: Dict[int, int] = defaultdict(int)
+
+        def explorer(debut: int, nb_restantes: int, restants: int, total: int):
+            for indice in range(debut, len(decroissantes)):
+                capacite = decroissantes[indice]
+                if capacite * nb_restantes < restants or meilleur['total'] == nb_etudiants:
+                    return
+                if prises[capacite] >= self.nb_libres[capacite]:
+                    continue
+                # Même complété au plus juste, ce choix ne perdrait pas moins de places
+                if total + max(restants, capacite + (nb_restantes - 1) * capacites[0]) >= meilleur['total']:
+                    continue
+                if nb_restantes > 2:
+                    prises[capacite] += 1
+                    explorer(indice, nb_restantes - 1, restants - capacite, total + capacite)
+                    prises[capacite] -= 1
+                    continue
+
+                # Dernière salle : la plus petite suffisante, sans dépasser la précédente
+                position = bisect_left(capacites, restants - capacite)
+                derniere = capacites[position]
+                if derniere == capacite and prises[capacite] + 1 >= self.nb_libres[capacite]:
+                    continue
+                if total + capacite + derniere < meilleur['total']:
+                    prises[capacite] += 1
+                    prises[derniere] += 1
+                    meilleur['total'] = total + capacite + derniere
+                    meilleur['prises'] = defaultdict(int, {c: nb for c, nb in prises.items() if nb})
+                    prises[capacite] -= 1
+                    prises[derniere] -= 1
+
+        explorer(0, sum(initiales.values()), nb_etudiants, 0)
+        return meilleur['prises']
+
+
+class AllocateurSalles:
+    """
+    Salles libres de chaque jour de la période, en tenant compte de la durée des examens
+
+    Les heures de début possibles découpent la journée en cellules : la cellule
+    k va du début du créneau k au début du suivant (la dernière jusqu'au soir).
+    Un examen occupe sa salle dans toutes les cellules que son intervalle
+    [début, début + durée) recouvre : un examen de 180 minutes à 08:00 occupe
+    aussi la cellule de 10:30. Comme tous les examens commencent au début d'une
+    cellule, deux examens se chevauchent exactement quand ils partagent une
+    cellule.
+
+    Pour chaque plage de cellules utilisée, un CreneauSalles (créé à la première
+    utilisation) range par capacité les salles libres sur toute la plage ; il
+    est tenu à jour à chaque réservation d'une de ses cellules.
+    """
+
+    def __init__(self, salles: List[dict], creneaux: List[time]):
+        """
+        Args:
+            salles: Salles disponibles ; à capacité égale, l'ordre de la liste
+                    est l'ordre de préférence
+            creneaux: Heures de début possibles, triées
+        """
+        self.salles = salles
+        self.rang_par_id = {salle['id']: rang for rang, salle in enumerate(salles)}
+        self.rangs_par_capacite: Dict[int, List[int]] = defaultdict(list)
+        for rang, salle in enumerate(salles):
+            self.rangs_par_capacite[salle['capacite']].append(rang)
+        self.debuts = [heure.hour * 60 + heure.minute for heure in creneaux]
+        self.cellule_par_heure = {heure: k for k, heure in enumerate(creneaux)}
+        # Rangs des salles occupées dans chaque cellule (jour, k)
+        self.occupees: Dict[Tuple[date_type, int], Set[int]] = defaultdict(set)
+        # Salles libres par plage de cellules (premiere, derniere) de chaque jour
+        self.plages: Dict[date_type, Dict[Tuple[int, int], CreneauSalles]] = defaultdict(dict)
+
+    def cellules(self, heure: time, duree_minutes: Optional[int]) -> Tuple[int, int]:
+        """Première et dernière cellules recouvertes par un examen"""
+        premiere = self.cellule_par_heure[heure]
+        fin = self.debuts[premiere] + (duree_minutes or 0)
+        derniere = premiere
+        while derniere + 1 < len(self.debuts) and self.debuts[derniere + 1] < fin:
+            derniere += 1
+        return premiere, derniere
+
+    def plage(self, date: date_type, premiere: int, derniere: int) -> CreneauSalles:
+        plages = self.plages[date]
+        creneau = plages.get((premiere, derniere))
+        if creneau is None:
+            creneau = CreneauSalles(self.rangs_par_capacite)
+            for k in range(premiere, derniere + 1):
+                for rang in self.occupees[(date, k)]:
+                    creneau.occuper(rang, self.salles[rang]['capacite'])
+            plages[(premiere, derniere)] = creneau
+        return creneau
+
+    def nb_operations_tas(self) -> int:
+        """Nombre d'insertions et de retraits effectués dans les tas de salles"""
+        return sum(
+            creneau.nb_operations_tas for plages in self.plages.values() for creneau in plages.values()
+        )
+
+    def trouver(self, date: date_type, heure: time, duree_minutes: Optional[int],
+                nb_etudiants: int) -> List[dict]:
+        """
+        Salles libres pendant tout l'examen couvrant nb_etudiants avec le moins
+        de salles et de places perdues
+
+        Returns:
+            Salles choisies, de la plus grande à la plus petite, ou [] si les
+            salles libres ne suffisent pas
+        """
+        if nb_etudiants <= 0:
+            return []
+        creneau = self.plage(date, *self.cellules(heure, duree_minutes))
+        prises = creneau.choisir_capacites(nb_etudiants)
+
+        salles = []
+        for capacite in sorted(prises, reverse=True):
+            for rang in creneau.premiers_libres(capacite, prises[capacite]):
+                salles.append(self.salles[rang])
+        return salles
+
+    def sont_libres(self, date: date_type, heure: time, duree_minutes: Optional[int],
+                    salles: List[dict]) -> bool:
+        """Vérifie qu'aucune des salles n'est occupée pendant l'examen"""
+        premiere, derniere = self.cellules(heure, duree_minutes)
+        return all(
+            self.rang_par_id[salle['id']] not in self.occupees[(date, k)]
+            for k in range(premiere, derniere + 1)
+            for salle in salles
+        )
+
+    def occuper(self, date: date_type, heure: time, duree_minutes: Optional[int], salles: List[dict]):
+        """Marque les salles comme occupées pendant l'examen"""
+        premiere, derniere = self.cellules(heure, duree_minutes)
+        for k in range(premiere, derniere + 1):
+            self.occupees[(date, k)].update(self.rang_par_id[salle['id']] for salle in salles)
+        for (debut, fin), creneau in self.plages[date].items():
+            if debut <= derniere and premiere <= fin:
+                for salle in salles:
+                    creneau.occuper(self.rang_par_id[salle['id']], salle['capacite'])
+
+    def liberer(self, date: date_type, heure: time, duree_minutes: Optional[int], salles: List[dict]):
+        """Libère les salles pendant l'examen"""
+        premiere, derniere = self.cellules(heure, duree_minutes)
+        rangs = [self.rang_par_id[salle['id']] for salle in salles]
+        for k in range(premiere, derniere + 1):
+            self.occupees[(date, k)].difference_update(rangs)
+        for (debut, fin), creneau in self.plages[date].items():
+            if debut <= derniere and premiere <= fin:
+                for rang, salle in zip(rangs, salles):
+                    if not any(rang in self.occupees[(date, k)] for k in range(debut, fin + 1)):
+                        creneau.liberer(rang, salle['capacite'])
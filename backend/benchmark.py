@@ -0,0 +1,685 @@
+"""
+Benchmarks de l'optimiseur sur des instances synthétiques (sans base de données)
+Usage : python benchmark.py [occupation | memoire | departements | suite --help]
+"""
+
+import argparse
+import csv
+import importlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time as time_module
+import tracemalloc
+from collections import Counter
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from examen import Examen
+from occupation import BACKENDS_OCCUPATION, creer_occupation
+from optimizer import ExamScheduleOptimizer
+
+# Proportions de la base de démonstration (13 000 étudiants)
+ETUDIANTS_REFERENCE = 13000
+ETUDIANTS_PAR_FORMATION = 62
+NB_DEPARTEMENTS = 7
+PROFS_PAR_DEPARTEMENT = 45
+NB_SALLES = 135
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def generer_instance(nb_etudiants: int = ETUDIANTS_REFERENCE, taux_options: float = 0.1,
+                     graine: int = 42, taux_salles: float = 1.0) -> dict:
+    """
+    Génère une instance synthétique ayant la structure de la base de démonstration
+
+    Args:
+        nb_etudiants: Nombre d'étudiants de l'instance
+        taux_options: Proportion d'étudiants inscrits à 2 modules d'autres formations
+        graine: Graine du générateur aléatoire
+        taux_salles: Nombre de salles relativement aux proportions de la base
+                     (moins de 1 pour des salles rares)
+
+    Returns:
+        Dictionnaire {modules, salles, professeurs, inscriptions}, les
+        inscriptions en tableau NumPy (module_id, etudiant_id)
+    """
+    rng = np.random.default_rng(graine)
+    echelle = nb_etudiants / ETUDIANTS_REFERENCE
+    nb_formations = max(1, nb_etudiants // ETUDIANTS_PAR_FORMATION)
+
+    professeurs = []
+    for dept_id in range(1, NB_DEPARTEMENTS + 1):
+        for i in range(max(1, round(PROFS_PAR_DEPARTEMENT * echelle))):
+            professeurs.append({
+                'id': len(professeurs) + 1,
+                'matricule': f"P{dept_id}{i + 1:05d}",
+                'nom': f"Prof {dept_id}-{i + 1}",
+                'prenom': "",
+                'departement_id': dept_id
+            })
+    profs_par_dept = {}
+    for prof in professeurs:
+        profs_par_dept.setdefault(prof['departement_id'], []).append(prof['id'])
+
+    # Les modules d'une formation ont des identifiants consécutifs
+    modules = []
+    premier_module = np.zeros(nb_formations, dtype=np.int64)
+    nb_modules_formation = np.zeros(nb_formations, dtype=np.int64)
+    for formation_id in range(1, nb_formations + 1):
+        dept_id = 1 + formation_id % NB_DEPARTEMENTS
+        premier_module[formation_id % nb_formations] = len(modules) + 1
+        nb_modules_formation[formation_id % nb_formations] = 6 + formation_id % 4
+        for i in range(6 + formation_id % 4):
+            profs_dept = profs_par_dept[dept_id]
+            modules.append({
+                'id': len(modules) + 1,
+                'code': f"MOD{formation_id:05d}{i + 1:02d}",
+                'nom': f"Module {i + 1}",
+                'formation_id': formation_id,
+                'duree_minutes': [90, 120, 180][(formation_id + i) % 3],
+                'departement_id': dept_id,
+                'prof_responsable_id': profs_dept[i % len(profs_dept)]
+            })
+
+    salles = [
+        {
+            'id': i + 1,
+            'nom': f"Salle {i + 1}",
+            'type': 'Salle',
+            'capacite': 20,
+            'batiment': f"Bâtiment {chr(65 + i % 5)}"
+        }
+        for i in range(max(1, round(NB_SALLES * echelle * taux_salles)))
+    ]
+
+    # Modules de la formation de chaque étudiant
+    etudiants = np.arange(1, nb_etudiants + 1, dtype=np.int64)
+    formations = etudiants % nb_formations
+    nb_par_etudiant = nb_modules_formation[formations]
+    etudiants_formation = np.repeat(etudiants, nb_par_etudiant)
+    rang_dans_formation = (np.arange(len(etudiants_formation))
+                           - np.repeat(np.cumsum(nb_par_etudiant) - nb_par_etudiant, nb_par_etudiant))
+    modules_formation = np.repeat(premier_module[formations], nb_par_etudiant) + rang_dans_formation
+
+    # Deux modules distincts tirés parmi tous, gardés s'ils sont hors formation
+    avec_options = etudiants[rng.random(nb_etudiants) < taux_options]
+    nb_modules = len(modules)
+    option_a = rng.integers(1, nb_modules + 1, len(avec_options))
+    option_b = rng.integers(1, max(nb_modules, 2), len(avec_options))
+    option_b += option_b >= option_a
+    etudiants_options = np.concatenate([avec_options, avec_options])
+    modules_options = np.concatenate([option_a, option_b])
+    debut_formation = premier_module[etudiants_options % nb_formations]
+    hors_formation = ((modules_options < debut_formation)
+                      | (modules_options >= debut_formation + nb_modules_formation[etudiants_options % nb_formations]))
+    hors_formation &= modules_options <= nb_modules
+
+    inscriptions = np.column_stack([
+        np.concatenate([modules_formation, modules_options[hors_formation]]),
+        np.concatenate([etudiants_formation, etudiants_options[hors_formation]])
+    ])
+
+    return {
+        'modules': modules,
+        'salles': salles,
+        'professeurs': professeurs,
+        'inscriptions': inscriptions
+    }
+
+
+def creer_optimiseur(instance: dict, classe_optimiseur: Type[ExamScheduleOptimizer] = ExamScheduleOptimizer,
+                     **options) -> ExamScheduleOptimizer:
+    """Crée un optimiseur (de la classe choisie) chargé avec une instance synthétique"""
+    optimizer = classe_optimiseur(db_config={}, **options)
+    optimizer.charger_instance(
+        [dict(m) for m in instance['modules']],
+        [dict(s) for s in instance['salles']],
+        [dict(p) for p in instance['professeurs']],
+        instance['inscriptions']
+    )
+    return optimizer
+
+
+def jours_ouvres(date_debut: str, date_fin: str) -> List:
+    """Liste des jours ouvrés de la période"""
+    courant = datetime.strptime(date_debut, "%Y-%m-%d").date()
+    fin = datetime.strptime(date_fin, "%Y-%m-%d").date()
+    jours = []
+    while courant <= fin:
+        if courant.weekday() < 5:
+            jours.append(courant)
+        courant += timedelta(days=1)
+    return jours
+
+
+def mesurer_occupation(optimizer: ExamScheduleOptimizer, backend: str, dates: List) -> dict:
+    """
+    Rejoue la recherche de jour du glouton (premier jour sans conflit étudiant)
+    en n'utilisant que la structure d'occupation
+
+    Returns:
+        Temps de construction, temps de recherche et affectation obtenue
+    """
+    modules = sorted(optimizer.modules_a_planifier, key=lambda m: m['nb_etudiants'], reverse=True)
+
+    debut = time_module.perf_counter()
+    occupation = creer_occupation(backend, modules, len(optimizer.taille_cohortes), dates)
+    temps_construction = time_module.perf_counter() - debut
+
+    affectation = {}
+    nb_verifications = 0
+    debut = time_module.perf_counter()
+    for module in modules:
+        for date in dates:
+            nb_verifications += 1
+            if occupation.est_libre(module, date):
+                occupation.occuper(module, date)
+                affectation[module['id']] = date
+                break
+    temps_recherche = time_module.perf_counter() - debut
+
+    return {
+        'construction': temps_construction,
+        'recherche': temps_recherche,
+        'nb_verifications': nb_verifications,
+        'affectation': affectation
+    }
+
+
+def comparer_occupation(tailles=(13000, 50000, 200000), taux_options: float = 0.1,
+                        date_debut: str = "2025-01-20", date_fin: str = "2025-02-15",
+                        planning_complet_max: int = ETUDIANTS_REFERENCE):
+    """
+    Compare les backends d'occupation pour plusieurs tailles d'instance
+
+    Args:
+        tailles: Nombres d'étudiants à tester
+        taux_options: Proportion d'étudiants suivant des modules hors formation
+        planning_complet_max: Taille maximale pour laquelle generer_planning
+                              est aussi chronométré en entier
+    """
+    dates = jours_ouvres(date_debut, date_fin)
+
+    print("=" * 72)
+    print("   BENCHMARK DES BACKENDS D'OCCUPATION ÉTUDIANTS")
+    print("=" * 72)
+
+    for nb_etudiants in tailles:
+        instance = generer_instance(nb_etudiants, taux_options=taux_options)
+        optimizer = creer_optimiseur(instance)
+
+        print(f"\n{nb_etudiants:,} étudiants | {len(instance['modules']):,} modules | "
+              f"{len(instance['inscriptions']):,} inscriptions | "
+              f"{len(optimizer.taille_cohortes):,} cohortes")
+
+        reference = None
+        for backend in BACKENDS_OCCUPATION:
+            mesure = mesurer_occupation(optimizer, backend, dates)
+            if reference is None:
+                reference = mesure['affectation']
+            identique = "✓" if mesure['affectation'] == reference else "✗ DIFFÉRENT"
+            print(f"   - {backend:<10} construction {mesure['construction'] * 1000:8.1f} ms | "
+                  f"recherche {mesure['recherche'] * 1000:8.1f} ms "
+                  f"({mesure['nb_verifications']:,} vérifications) {identique}")
+
+        if nb_etudiants <= planning_complet_max:
+            for backend in BACKENDS_OCCUPATION:
+                optimizer_complet = creer_optimiseur(instance, backend_occupation=backend)
+                with redirect_stdout(io.StringIO()):
+                    resultat = optimizer_complet.generer_planning(date_debut, date_fin)
+                print(f"   - generer_planning [{backend}] {resultat['temps_execution']:.2f}s "
+                      f"({resultat['nb_planifies']}/{resultat['nb_total']} modules)")
+
+
+def comparer_departements(tailles=(13000, 50000, 200000), taux_options: float = 0.1,
+                          nb_workers: Optional[int] = None,
+                          date_debut: str = "2025-01-20", date_fin: str = "2025-02-15"):
+    """
+    Compare le moteur par départements au glouton
+
+    Le moteur par départements n'est proposé dans l'interface et la ligne de
+    commande que s'il est nettement plus rapide que le glouton à qualité égale.
+
+    Args:
+        tailles: Nombres d'étudiants à tester
+        taux_options: Proportion d'étudiants inscrits à des modules hors formation
+        nb_workers: Nombre de processus du moteur par départements (nombre de cœurs par défaut)
+    """
+    from department_optimizer import DepartmentScheduleOptimizer
+
+    print("=" * 72)
+    print("   BENCHMARK DU MOTEUR PAR DÉPARTEMENTS")
+    print("=" * 72)
+    print(f"{os.cpu_count()} cœurs disponibles")
+
+    for nb_etudiants in tailles:
+        instance = generer_instance(nb_etudiants, taux_options=taux_options)
+        print(f"\n{nb_etudiants:,} étudiants | {len(instance['modules']):,} modules | "
+              f"{len(instance['inscriptions']):,} inscriptions")
+
+        mesures = {}
+        for nom, classe_optimiseur, options in (
+            ('glouton', ExamScheduleOptimizer, {}),
+            ('departements', DepartmentScheduleOptimizer, {'nb_workers': nb_workers}),
+        ):
+            optimizer = creer_optimiseur(instance, classe_optimiseur, **options)
+            debut = time_module.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                resultat = optimizer.generer_planning(date_debut, date_fin)
+            mesures[nom] = time_module.perf_counter() - debut
+            details = ""
+            if nom == 'departements':
+                details = (f" | partition max {resultat['duree_partition_max']:.2f}s, "
+                           f"réconciliation {resultat['duree_reconciliation']:.2f}s, "
+                           f"{resultat['nb_examens_ecartes']:,} examens écartés")
+            print(f"   - {nom:<12} {mesures[nom]:7.2f}s | {resultat['nb_planifies']}/{resultat['nb_total']} modules | "
+                  f"étalement {resultat['penalite_etalement']:,}{details}")
+
+        print(f"   - accélération {mesures['glouton'] / mesures['departements']:.2f}x")
+
+
+def mesurer_memoire(tailles=(17000, 130000), taux_options: float = 0.1,
+                    date_debut: str = "2025-01-20", date_fin: str = "2025-02-15"):
+    """
+    Mémoire occupée par les données de l'optimiseur (environ 130 000 et
+    1 000 000 d'inscriptions avec les tailles par défaut)
+
+    Compare les inscriptions chargées en colonnes NumPy et les examens
+    compacts (Examen) à l'ancienne représentation : une liste d'identifiants
+    d'étudiants par module et un dictionnaire détaillé par examen.
+    """
+    print("=" * 72)
+    print("   MÉMOIRE DES DONNÉES DE L'OPTIMISEUR")
+    print("=" * 72)
+
+    for nb_etudiants in tailles:
+        instance = generer_instance(nb_etudiants, taux_options=taux_options)
+        inscriptions = instance['inscriptions']
+
+        tracemalloc.start()
+        optimizer = creer_optimiseur(instance, backend_occupation='numpy')
+        memoire_chargement, pic_chargement = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        listes_etudiants = {}
+        for module_id, etudiant_id in inscriptions.tolist():
+            listes_etudiants.setdefault(module_id, []).append(etudiant_id)
+        memoire_listes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del listes_etudiants
+
+        with redirect_stdout(io.StringIO()):
+            optimizer.generer_planning(date_debut, date_fin)
+
+        tracemalloc.start()
+        examens = [Examen(e.module_id, e.jour, e.creneau, e.salles, e.surveillants, e.nb_etudiants)
+                   for e in optimizer.examens_planifies]
+        memoire_examens = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del examens
+
+        tracemalloc.start()
+        detailles = [optimizer.decrire_examen(examen) for examen in optimizer.examens_planifies]
+        memoire_detailles = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del detailles
+
+        mo = 1024 * 1024
+        print(f"\n{nb_etudiants:,} étudiants | {len(inscriptions):,} inscriptions | "
+              f"{len(optimizer.taille_cohortes):,} cohortes | "
+              f"{len(optimizer.examens_par_module):,} examens")
+        print(f"   - chargement (colonnes)     {memoire_chargement / mo:8.1f} Mo conservés, "
+              f"pic {pic_chargement / mo:.1f} Mo")
+        print(f"   - listes d'étudiants        {memoire_listes / mo:8.1f} Mo (ancienne représentation)")
+        print(f"   - examens compacts          {memoire_examens / mo:8.2f} Mo")
+        print(f"   - examens détaillés         {memoire_detailles / mo:8.2f} Mo (ancienne représentation)")
+
+
+# Suite de benchmarks : facteurs d'échelle par rapport à la base de démonstration
+ECHELLES = (1, 5, 20, 50)
+
+PERIODE_DEBUT = "2025-01-20"
+
+# Variantes de densité, appliquées à chaque échelle
+SCENARIOS = {
+    'reference': {'taux_options': 0.1, 'taux_salles': 1.0, 'date_fin': "2025-02-15"},
+    'options': {'taux_options': 0.4, 'taux_salles': 1.0, 'date_fin': "2025-02-15"},
+    'periode_serree': {'taux_options': 0.1, 'taux_salles': 1.0, 'date_fin': "2025-02-07"},
+    'salles_rares': {'taux_options': 0.1, 'taux_salles': 0.6, 'date_fin': "2025-02-15"},
+}
+
+# Moteurs mesurés : module, classe, options et prise en compte du budget (temps_limite)
+MOTEURS_BENCHMARK = {
+    **{
+        f"glouton-{backend}": ('optimizer', 'ExamScheduleOptimizer', {'backend_occupation': backend}, False)
+        for backend in BACKENDS_OCCUPATION
+    },
+    'multi-departs': ('parallel_optimizer', 'MultiStartScheduleOptimizer', {}, True),
+    'recherche-locale': ('local_search', 'LocalSearchScheduleOptimizer', {}, True),
+    'cp-sat': ('cpsat_optimizer', 'CpSatScheduleOptimizer', {}, True),
+    'departements': ('department_optimizer', 'DepartmentScheduleOptimizer', {}, False),
+}
+
+CHEMIN_HISTORIQUE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 '..', '.cache', 'benchmarks', 'historique.csv')
+
+CHAMPS_HISTORIQUE = (
+    'date', 'machine', 'python', 'scenario', 'echelle', 'nb_etudiants', 'nb_inscriptions',
+    'moteur', 'temps', 'temps_chargement', 'temps_planification', 'rss_max_mo',
+    'nb_planifies', 'nb_total', 'taux_placement', 'cv_surveillances', 'max_surveillances', 'erreur'
+)
+CHAMPS_ENTIERS = ('echelle', 'nb_etudiants', 'nb_inscriptions', 'nb_planifies', 'nb_total', 'max_surveillances')
+CHAMPS_REELS = ('temps', 'temps_chargement', 'temps_planification', 'rss_max_mo',
+                'taux_placement', 'cv_surveillances')
+
+# Écarts en dessous desquels une différence de temps est attribuée au bruit
+TEMPS_MINIMAL_REGRESSION = 0.1
+
+
+def memoire_max_mo() -> Optional[float]:
+    """
+    Pic de mémoire résidente du processus et de ses enfants terminés
+    (processus des moteurs parallèles), en Mo ; None sous Windows
+    """
+    if resource is None:
+        return None
+    pic = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+              resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return pic / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def equilibre_surveillants(optimizer: ExamScheduleOptimizer) -> Tuple[float, int]:
+    """
+    Équilibre des surveillances entre professeurs
+
+    Returns:
+        Coefficient de variation du nombre de surveillances par professeur
+        (0 pour une répartition parfaite) et nombre maximal de surveillances
+    """
+    charges = Counter(prof_id for examen in optimizer.examens_planifies for prof_id in examen.surveillants)
+    nombres = np.array([charges.get(prof['id'], 0) for prof in optimizer.professeurs_disponibles], dtype=float)
+    if not len(nombres) or not nombres.mean():
+        return 0.0, 0
+    return float(nombres.std() / nombres.mean()), int(nombres.max())
+
+
+def executer_cas(cas: dict) -> dict:
+    """
+    Génère l'instance d'un cas et la planifie avec un moteur
+
+    Exécuté dans un interpréteur neuf pour que le pic de mémoire soit propre au cas.
+    """
+    scenario = SCENARIOS[cas['scenario']]
+    nom_module, nom_classe, options, avec_budget = MOTEURS_BENCHMARK[cas['moteur']]
+    if avec_budget:
+        options = {**options, 'temps_limite': cas['budget']}
+    classe_optimiseur = getattr(importlib.import_module(nom_module), nom_classe)
+
+    instance = generer_instance(cas['nb_etudiants'], taux_options=scenario['taux_options'],
+                                graine=cas['graine'], taux_salles=scenario['taux_salles'])
+
+    debut = time_module.perf_counter()
+    optimizer = creer_optimiseur(instance, classe_optimiseur, **options)
+    temps_chargement = time_module.perf_counter() - debut
+
+    debut = time_module.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        resultat = optimizer.generer_planning(PERIODE_DEBUT, scenario['date_fin'])
+    temps_planification = time_module.perf_counter() - debut
+
+    cv_surveillances, max_surveillances = equilibre_surveillants(optimizer)
+    return {
+        'nb_inscriptions': len(instance['inscriptions']),
+        'temps': temps_chargement + temps_planification,
+        'temps_chargement': temps_chargement,
+        'temps_planification': temps_planification,
+        'rss_max_mo': memoire_max_mo(),
+        'nb_planifies': resultat['nb_planifies'],
+        'nb_total': resultat['nb_total'],
+        'taux_placement': resultat['nb_planifies'] / resultat['nb_total'] if resultat['nb_total'] else 1.0,
+        'cv_surveillances': cv_surveillances,
+        'max_surveillances': max_surveillances,
+        'erreur': None
+    }
+
+
+def mesurer_cas(cas: dict, delai_max: float) -> dict:
+    """
+    Exécute un cas dans un nouvel interpréteur (python benchmark.py cas ...),
+    interrompu au bout de delai_max secondes
+    """
+    try:
+        execution = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), 'cas', json.dumps(cas)],
+            capture_output=True, text=True, timeout=delai_max,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+    except subprocess.TimeoutExpired:
+        return {'erreur': f"délai de {delai_max:.0f}s dépassé"}
+
+    lignes = execution.stdout.strip().splitlines()
+    if execution.returncode != 0 or not lignes:
+        erreurs = execution.stderr.strip().splitlines()
+        return {'erreur': erreurs[-1] if erreurs else f"code de sortie {execution.returncode}"}
+    return json.loads(lignes[-1])
+
+
+def lire_historique(chemin: str) -> List[dict]:
+    """Mesures déjà enregistrées (.json : liste d'objets, sinon CSV)"""
+    if not os.path.exists(chemin):
+        return []
+    if chemin.endswith('.json'):
+        with open(chemin, encoding='utf-8') as fichier:
+            return json.load(fichier)
+
+    historique = []
+    with open(chemin, newline='', encoding='utf-8') as fichier:
+        for ligne in csv.DictReader(fichier):
+            for champ in CHAMPS_ENTIERS:
+                ligne[champ] = int(ligne[champ]) if ligne[champ] else None
+            for champ in CHAMPS_REELS:
+                ligne[champ] = float(ligne[champ]) if ligne[champ] else None
+            ligne['erreur'] = ligne['erreur'] or None
+            historique.append(ligne)
+    return historique
+
+
+def enregistrer_historique(chemin: str, mesures: List[dict]):
+    """Ajoute les mesures à la fin de l'historique"""
+    os.makedirs(os.path.dirname(os.path.abspath(chemin)), exist_ok=True)
+    if chemin.endswith('.json'):
+        historique = lire_historique(chemin) + mesures
+        with open(chemin, 'w', encoding='utf-8') as fichier:
+            json.dump(historique, fichier, indent=1)
+        return
+
+    nouveau = not os.path.exists(chemin)
+    with open(chemin, 'a', newline='', encoding='utf-8') as fichier:
+        writer = csv.DictWriter(fichier, fieldnames=CHAMPS_HISTORIQUE)
+        if nouveau:
+            writer.writeheader()
+        for mesure in mesures:
+            writer.writerow({champ: mesure.get(champ) for champ in CHAMPS_HISTORIQUE})
+
+
+def detecter_regressions(mesures: List[dict], historique: List[dict], seuil: float = 0.25,
+                         seuil_qualite: float = 0.02, nb_references: int = 5) -> List[str]:
+    """
+    Compare chaque mesure aux précédentes du même cas sur la même machine
+
+    La référence est la médiane des nb_references dernières mesures réussies.
+    Le temps et la mémoire régressent s'ils dépassent la référence de plus de
+    seuil (en proportion) ; le taux de placement s'il baisse, et le coefficient
+    de variation des surveillances s'il augmente, de plus de seuil_qualite.
+    Un cas qui échoue alors qu'il réussissait est aussi une régression.
+    """
+    references: Dict[tuple, List[dict]] = {}
+    for ancienne in historique:
+        if ancienne['erreur'] is None:
+            cle = (ancienne['machine'], ancienne['scenario'], ancienne['echelle'], ancienne['moteur'])
+            references.setdefault(cle, []).append(ancienne)
+
+    regressions = []
+    for mesure in mesures:
+        cle = (mesure['machine'], mesure['scenario'], mesure['echelle'], mesure['moteur'])
+        anciennes = references.get(cle, [])[-nb_references:]
+        if not anciennes:
+            continue
+        nom = f"{mesure['moteur']} / {mesure['scenario']} / {mesure['echelle']}×"
+        if mesure['erreur'] is not None:
+            regressions.append(f"{nom}: échec ({mesure['erreur']})")
+            continue
+
+        temps = statistics.median(a['temps'] for a in anciennes)
+        if mesure['temps'] > temps * (1 + seuil) and mesure['temps'] - temps > TEMPS_MINIMAL_REGRESSION:
+            regressions.append(f"{nom}: temps {mesure['temps']:.2f}s au lieu de {temps:.2f}s")
+
+        pics = [a['rss_max_mo'] for a in anciennes if a['rss_max_mo'] is not None]
+        if mesure['rss_max_mo'] is not None and pics:
+            pic = statistics.median(pics)
+            if mesure['rss_max_mo'] > pic * (1 + seuil):
+                regressions.append(f"{nom}: mémoire {mesure['rss_max_mo']:.0f} Mo au lieu de {pic:.0f} Mo")
+
+        taux = statistics.median(a['taux_placement'] for a in anciennes)
+        if mesure['taux_placement'] < taux - seuil_qualite:
+            regressions.append(f"{nom}: placement {mesure['taux_placement']:.1%} au lieu de {taux:.1%}")
+
+        cv = statistics.median(a['cv_surveillances'] for a in anciennes)
+        if mesure['cv_surveillances'] > cv + seuil_qualite:
+            regressions.append(f"{nom}: équilibre des surveillances {mesure['cv_surveillances']:.3f} "
+                               f"au lieu de {cv:.3f}")
+    return regressions
+
+
+def executer_suite(echelles=ECHELLES, scenarios=tuple(SCENARIOS), moteurs=tuple(MOTEURS_BENCHMARK),
+                   budget: float = 45, graine: int = 42, delai_max: float = 1800,
+                   chemin_historique: str = CHEMIN_HISTORIQUE, enregistrer: bool = True,
+                   seuil: float = 0.25, seuil_qualite: float = 0.02) -> Tuple[List[dict], List[str]]:
+    """
+    Mesure chaque moteur sur chaque scénario à chaque échelle
+
+    Chaque cas s'exécute dans son propre processus. Les mesures sont
+    comparées à l'historique puis y sont ajoutées.
+
+    Args:
+        echelles: Facteurs d'échelle par rapport aux 13 000 étudiants de la base
+        budget: Temps limite des moteurs qui en acceptent un (secondes)
+        delai_max: Durée au-delà de laquelle un cas est interrompu (secondes)
+        seuil, seuil_qualite: Voir detecter_regressions
+
+    Returns:
+        Mesures et régressions détectées
+    """
+    print("=" * 72)
+    print("   SUITE DE BENCHMARKS DES MOTEURS")
+    print("=" * 72)
+
+    mesures = []
+    for echelle in echelles:
+        for scenario in scenarios:
+            print(f"\n{echelle}× ({ETUDIANTS_REFERENCE * echelle:,} étudiants) | scénario {scenario}")
+            for moteur in moteurs:
+                cas = {
+                    'scenario': scenario,
+                    'moteur': moteur,
+                    'nb_etudiants': ETUDIANTS_REFERENCE * echelle,
+                    'graine': graine,
+                    'budget': budget
+                }
+                mesure = {
+                    **dict.fromkeys(CHAMPS_HISTORIQUE),
+                    'date': datetime.now().isoformat(timespec='seconds'),
+                    'machine': platform.node(),
+                    'python': platform.python_version(),
+                    'scenario': scenario,
+                    'echelle': echelle,
+                    'nb_etudiants': cas['nb_etudiants'],
+                    'moteur': moteur,
+                    **mesurer_cas(cas, delai_max)
+                }
+                mesures.append(mesure)
+
+                if mesure['erreur'] is not None:
+                    print(f"   - {moteur:<18} ✗ {mesure['erreur']}")
+                    continue
+                rss = f"{mesure['rss_max_mo']:7.0f} Mo" if mesure['rss_max_mo'] is not None else "      ? Mo"
+                print(f"   - {moteur:<18} {mesure['temps']:8.2f}s | {rss} | "
+                      f"{mesure['nb_planifies']}/{mesure['nb_total']} ({mesure['taux_placement']:.1%}) | "
+                      f"surveillances cv {mesure['cv_surveillances']:.3f}, max {mesure['max_surveillances']}")
+
+    regressions = detecter_regressions(mesures, lire_historique(chemin_historique), seuil, seuil_qualite)
+    if enregistrer:
+        enregistrer_historique(chemin_historique, mesures)
+        print(f"\n📁 Historique: {os.path.normpath(chemin_historique)}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} régression(s):")
+        for regression in regressions:
+            print(f"   - {regression}")
+    else:
+        print("\n✅ Aucune régression")
+    return mesures, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de l'optimiseur sur des instances synthétiques")
+    commandes = parser.add_subparsers(dest='commande')
+    commandes.add_parser('occupation', help="Compare les backends d'occupation étudiants")
+    commandes.add_parser('memoire', help="Mémoire occupée par les données de l'optimiseur")
+    departements = commandes.add_parser('departements', help="Compare le moteur par départements au glouton")
+    departements.add_argument('--tailles', type=int, nargs='+', default=[13000, 50000, 200000])
+    departements.add_argument('--workers', type=int, help="Processus du moteur (nombre de cœurs par défaut)")
+    commandes.add_parser('cas', help="Exécute un seul cas de la suite (usage interne)").add_argument('cas')
+
+    suite = commandes.add_parser('suite', help="Mesure les moteurs à plusieurs échelles et détecte les régressions")
+    suite.add_argument('--echelles', type=int, nargs='+', default=list(ECHELLES))
+    suite.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    suite.add_argument('--moteurs', nargs='+', choices=list(MOTEURS_BENCHMARK), default=list(MOTEURS_BENCHMARK))
+    suite.add_argument('--budget', type=float, default=45, help="Temps limite des moteurs à budget (s)")
+    suite.add_argument('--delai-max', type=float, default=1800, help="Interruption d'un cas (s)")
+    suite.add_argument('--graine', type=int, default=42)
+    suite.add_argument('--historique', default=CHEMIN_HISTORIQUE, help="Fichier .csv ou .json")
+    suite.add_argument('--sans-enregistrement', action='store_true', help="Ne pas ajouter les mesures à l'historique")
+    suite.add_argument('--seuil', type=float, default=0.25, help="Hausse tolérée du temps et de la mémoire")
+    suite.add_argument('--seuil-qualite', type=float, default=0.02,
+                       help="Baisse tolérée du taux de placement et hausse tolérée du déséquilibre")
+    arguments = parser.parse_args()
+
+    if arguments.commande == 'cas':
+        try:
+            mesure = executer_cas(json.loads(arguments.cas))
+        except Exception as e:
+            mesure = {'erreur': f"{type(e).__name__}: {e}"}
+        print(json.dumps(mesure))
+        return
+    if arguments.commande == 'suite':
+        _, regressions = executer_suite(
+            arguments.echelles, arguments.scenarios, arguments.moteurs, arguments.budget,
+            arguments.graine, arguments.delai_max, arguments.historique,
+            not arguments.sans_enregistrement, arguments.seuil, arguments.seuil_qualite
+        )
+        sys.exit(1 if regressions else 0)
+    if arguments.commande == 'departements':
+        comparer_departements(arguments.tailles, nb_workers=arguments.workers)
+        return
+    if arguments.commande in (None, 'occupation'):
+        comparer_occupation()
+    if arguments.commande in (None, 'memoire'):
+        mesurer_memoire()
+
+
+if __name__ == "__main__":
+    main()
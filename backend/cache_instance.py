@@ -0,0 +1,120 @@
+"""
+Cache disque des données d'entrée de l'optimiseur
+Un instantané par année et session, invalidé par une empreinte des tables sources
+"""
+
+import json
+import os
+from typing import Optional
+
+import numpy as np
+
+# Tables lues par ExamScheduleOptimizer.charger_donnees
+TABLES_SOURCES = ('modules', 'formations', 'lieux_examen', 'professeurs', 'inscriptions')
+
+
+def calculer_empreinte(cur, annee_academique: str, rattrapage: bool = False) -> dict:
+    """
+    Empreinte peu coûteuse des données d'entrée
+
+    Nombre de lignes et plus grand created_at de chaque table source (les
+    inscriptions de l'année seulement), complétés par les compteurs de
+    versions_donnees lorsque la table existe : ceux-ci détectent aussi les
+    modifications et suppressions qui ne changent ni l'un ni l'autre.
+
+    Pour une session de rattrapage, le nombre d'inscriptions non validées
+    est ajouté : la saisie des résultats ne change que est_valide.
+    """
+    empreinte = {}
+    for table in TABLES_SOURCES:
+        if table == 'inscriptions':
+            cur.execute("""
+                SELECT COUNT(*), MAX(created_at) FROM inscriptions
+                WHERE annee_academique = %s
+            """, (annee_academique,))
+        else:
+            cur.execute(f"SELECT COUNT(*), MAX(created_at) FROM {table}")
+        nb_lignes, derniere_creation = cur.fetchone()
+        empreinte[table] = [nb_lignes, derniere_creation.isoformat() if derniere_creation else None]
+
+    if rattrapage:
+        cur.execute("""
+            SELECT COUNT(*) FROM inscriptions
+            WHERE annee_academique = %s AND est_valide IS NOT TRUE
+        """, (annee_academique,))
+        empreinte['inscriptions_non_validees'] = cur.fetchone()[0]
+
+    cur.execute("SELECT to_regclass('versions_donnees') IS NOT NULL")
+    if cur.fetchone()[0]:
+        cur.execute("SELECT nom_table, version FROM versions_donnees ORDER BY nom_table")
+        empreinte['versions'] = {nom_table: version for nom_table, version in cur.fetchall()}
+
+    return empreinte
+
+
+class CacheInstance:
+    """
+    Instantanés des données chargées, rangés dans un répertoire
+
+    Chaque instantané est fait de deux fichiers : les inscriptions en .npy,
+    relu en projection mémoire (mmap), et un .json contenant l'empreinte,
+    les modules, les salles et les professeurs.
+    """
+
+    def __init__(self, repertoire: str):
+        self.repertoire = repertoire
+
+    def chemin(self, annee_academique: str, session: str) -> str:
+        """Chemin des fichiers de l'instantané, sans extension"""
+        return os.path.join(self.repertoire, f"instance_{annee_academique}_{session}")
+
+    def charger(self, annee_academique: str, session: str, empreinte: dict) -> Optional[dict]:
+        """
+        Relit l'instantané s'il existe et correspond à l'empreinte
+
+        Returns:
+            Dictionnaire {modules, salles, professeurs, inscriptions}, ou None
+        """
+        chemin = self.chemin(annee_academique, session)
+        try:
+            with open(chemin + '.json', encoding='utf-8') as fichier:
+                contenu = json.load(fichier)
+            if contenu['empreinte'] != empreinte:
+                return None
+            inscriptions = np.load(chemin + '.npy', mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            return None
+
+        return {
+            'modules': contenu['modules'],
+            'salles': contenu['salles'],
+            'professeurs': contenu['professeurs'],
+            'inscriptions': inscriptions
+        }
+
+    def enregistrer(self, annee_academique: str, session: str, empreinte: dict,
+                    modules: list, salles: list, professeurs: list, inscriptions: np.ndarray):
+        """
+        Écrit l'instantané
+
+        Les fichiers sont écrits sous un nom temporaire puis renommés : un
+        instantané à moitié écrit n'est jamais relu. L'ancien .json, qui porte
+        l'empreinte, est supprimé d'abord et le nouveau renommé en dernier.
+        """
+        os.makedirs(self.repertoire, exist_ok=True)
+        chemin = self.chemin(annee_academique, session)
+        if os.path.exists(chemin + '.json'):
+            os.remove(chemin + '.json')
+
+        with open(chemin + '.tmp.npy', 'wb') as fichier:
+            np.save(fichier, np.ascontiguousarray(inscriptions))
+        with open(chemin + '.tmp.json', 'w', encoding='utf-8') as fichier:
+            json.dump({
+                'empreinte': empreinte,
+                'modules': modules,
+                'salles': salles,
+                'professeurs': professeurs
+            }, fichier)
+
+        os.replace(chemin + '.tmp.npy', chemin + '.npy')
+        os.replace(chemin + '.tmp.json', chemin + '.json')
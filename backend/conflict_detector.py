@@ -8,6 +8,8 @@ from collections import defaultdict
 from typing import List, Dict, Tuple
 from datetime import datetime
 
+from examen import STATUT_PLANIFIE
+
 class ConflictDetector:
     """Détecte les conflits dans un planning d'examens"""
     
@@ -77,7 +79,7 @@ class ConflictDetector:
                 JOIN etudiants et ON i.etudiant_id = et.id
                 WHERE e.annee_academique = %s 
                 AND e.session = %s
-                AND e.statut = 'Planifié'
+                AND e.statut = %s
             )
             SELECT 
                 etudiant_id,
@@ -91,7 +93,7 @@ class ConflictDetector:
             GROUP BY etudiant_id, etudiant_matricule, etudiant_nom, etudiant_prenom, date_examen
             HAVING COUNT(*) > 1
             ORDER BY date_examen, nb_examens DESC
-        """, (self.annee_academique, self.session))
+        """, (self.annee_academique, self.session, STATUT_PLANIFIE))
         
         conflits = []
         for row in cur.fetchall():
@@ -138,11 +140,11 @@ class ConflictDetector:
             JOIN modules m ON e.module_id = m.id
             WHERE e.annee_academique = %s 
             AND e.session = %s
-            AND e.statut = 'Planifié'
+            AND e.statut = %s
             GROUP BY p.id, p.matricule, p.nom, p.prenom, e.date_examen
             HAVING COUNT(*) > 3
             ORDER BY nb_surveillances DESC, e.date_examen
-        """, (self.annee_academique, self.session))
+        """, (self.annee_academique, self.session, STATUT_PLANIFIE))
         
         conflits = []
         for row in cur.fetchall():
@@ -165,7 +167,7 @@ class ConflictDetector:
     
     def detecter_depassement_capacite_salles(self) -> List[dict]:
         """
-        Détecte les examens où le nombre d'étudiants dépasse la capacité de la salle
+        Détecte les salles d'examen dont l'effectif dépasse la capacité
         
         Returns:
             Liste des dépassements détectés
@@ -179,21 +181,22 @@ class ConflictDetector:
                 e.id,
                 m.code,
                 m.nom,
-                e.date_examen,
-                e.heure_debut,
+                es.date_examen,
+                es.heure_debut,
                 l.nom as salle_nom,
                 l.capacite_examen,
-                e.nb_etudiants_inscrits,
-                (e.nb_etudiants_inscrits - l.capacite_examen) as depassement
-            FROM examens e
+                es.nb_etudiants,
+                (es.nb_etudiants - l.capacite_examen) as depassement
+            FROM examen_salles es
+            JOIN examens e ON es.examen_id = e.id
             JOIN modules m ON e.module_id = m.id
-            JOIN lieux_examen l ON e.lieu_id = l.id
+            JOIN lieux_examen l ON es.lieu_id = l.id
             WHERE e.annee_academique = %s 
             AND e.session = %s
-            AND e.statut = 'Planifié'
-            AND e.nb_etudiants_inscrits > l.capacite_examen
+            AND e.statut = %s
+            AND es.nb_etudiants > l.capacite_examen
             ORDER BY depassement DESC
-        """, (self.annee_academique, self.session))
+        """, (self.annee_academique, self.session, STATUT_PLANIFIE))
         
         conflits = []
         for row in cur.fetchall():
@@ -232,19 +235,20 @@ class ConflictDetector:
             WITH examens_avec_fin AS (
                 SELECT 
                     e.id,
-                    e.lieu_id,
+                    es.lieu_id,
                     l.nom as salle_nom,
-                    e.date_examen,
-                    e.heure_debut,
-                    (e.heure_debut + (e.duree_minutes || ' minutes')::INTERVAL) as heure_fin,
+                    es.date_examen,
+                    es.heure_debut,
+                    (es.heure_debut + (e.duree_minutes || ' minutes')::INTERVAL) as heure_fin,
                     m.code as module_code,
                     m.nom as module_nom
-                FROM examens e
-                JOIN lieux_examen l ON e.lieu_id = l.id
+                FROM examen_salles es
+                JOIN examens e ON es.examen_id = e.id
+                JOIN lieux_examen l ON es.lieu_id = l.id
                 JOIN modules m ON e.module_id = m.id
                 WHERE e.annee_academique = %s 
                 AND e.session = %s
-                AND e.statut = 'Planifié'
+                AND e.statut = %s
             )
             SELECT DISTINCT
                 e1.id as examen1_id,
@@ -266,7 +270,7 @@ class ConflictDetector:
                     (e1.heure_debut < e2.heure_fin AND e1.heure_fin > e2.heure_debut)
                 )
             ORDER BY e1.date_examen, e1.heure_debut
-        """, (self.annee_academique, self.session))
+        """, (self.annee_academique, self.session, STATUT_PLANIFIE))
         
         conflits = []
         for row in cur.fetchall():
@@ -317,7 +321,7 @@ class ConflictDetector:
                 LEFT JOIN departements d ON p.departement_id = d.id
                 WHERE e.annee_academique = %s 
                 AND e.session = %s
-                AND e.statut = 'Planifié'
+                AND e.statut = %s
                 OR e.id IS NULL
                 GROUP BY p.id, p.nom, p.prenom, d.nom
             )
@@ -328,7 +332,7 @@ class ConflictDetector:
                 STDDEV(nb_surveillances) as stddev_surv,
                 COUNT(*) as nb_profs
             FROM stats_profs
-        """, (self.annee_academique, self.session))
+        """, (self.annee_academique, self.session, STATUT_PLANIFIE))
         
         row = cur.fetchone()
         stats = {
@@ -350,10 +354,10 @@ class ConflictDetector:
                 WHERE s.professeur_id = p.id
                 AND e.annee_academique = %s 
                 AND e.session = %s
-                AND e.statut = 'Planifié'
+                AND e.statut = %s
             )
             LIMIT 10
-        """, (self.annee_academique, self.session))
+        """, (self.annee_academique, self.session, STATUT_PLANIFIE))
         
         stats['profs_non_utilises'] = [
             {
@@ -0,0 +1,155 @@
+"""
+Graphe de conflits entre modules et ordres de planification
+Deux modules sont adjacents s'ils ont au moins un étudiant en commun
+"""
+
+import heapq
+from array import array
+import random
+from collections import defaultdict
+from datetime import date as date_type
+from typing import Dict, Iterator, List, Optional, Set
+
+
+class ConflictGraph:
+    """Graphe module x module construit une seule fois à partir des cohortes"""
+
+    def __init__(self, modules: List[dict]):
+        """
+        Construit le graphe à partir de module['cohortes']
+
+        Tous les modules d'une même cohorte partagent ses étudiants : ils forment
+        une clique. Le coût est donc la somme des carrés du nombre de modules par
+        cohorte, et non le nombre d'inscriptions.
+        """
+        modules_par_cohorte = defaultdict(list)
+        for module in modules:
+            for cohorte_id in module['cohortes']:
+                modules_par_cohorte[cohorte_id].append(module['id'])
+
+        voisins: Dict[int, Set[int]] = {module['id']: set() for module in modules}
+        for modules_cohorte in modules_par_cohorte.values():
+            for module_id in modules_cohorte:
+                voisins[module_id].update(modules_cohorte)
+
+        # Listes d'adjacence gardées en tableaux d'entiers triés, bien plus
+        # compacts que des ensembles une fois le graphe construit
+        self.voisins: Dict[int, array] = {}
+        for module_id, ensemble in voisins.items():
+            ensemble.discard(module_id)
+            self.voisins[module_id] = array('i', sorted(ensemble))
+
+    def degre(self, module_id: int) -> int:
+        """Nombre de modules en conflit avec le module"""
+        return len(self.voisins[module_id])
+
+    def nb_aretes(self) -> int:
+        """Nombre d'arêtes du graphe"""
+        return sum(len(voisins) for voisins in self.voisins.values()) // 2
+
+    def clique_gloutonne(self, nb_departs: int = 8) -> List[int]:
+        """
+        Grande clique trouvée gloutonnement, minorant du nombre de jours nécessaires
+
+        Depuis chacun des nb_departs modules de plus fort degré, la clique est
+        étendue par le candidat ayant le plus de voisins, les candidats étant
+        les voisins communs de tous les modules déjà retenus.
+        """
+        departs = sorted(self.voisins, key=self.degre, reverse=True)[:nb_departs]
+        meilleure: List[int] = []
+        for depart in departs:
+            clique = [depart]
+            candidats = set(self.voisins[depart])
+            while candidats:
+                suivant = max(candidats, key=lambda module_id: (self.degre(module_id), -module_id))
+                clique.append(suivant)
+                candidats.intersection_update(self.voisins[suivant])
+            if len(clique) > len(meilleure):
+                meilleure = clique
+        return meilleure
+
+
+class OrdreEffectif:
+    """Ordre historique : modules triés par nombre d'étudiants décroissant"""
+
+    def __init__(self, modules: List[dict], graphe: ConflictGraph,
+                 rng: Optional[random.Random] = None):
+        if rng is None:
+            self.modules = sorted(modules, key=lambda m: m['nb_etudiants'], reverse=True)
+        else:
+            self.modules = sorted(modules, key=lambda m: (-m['nb_etudiants'], rng.random()))
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.modules)
+
+    def marquer_planifie(self, module: dict, date: date_type):
+        """Aucune mise à jour : l'ordre est statique"""
+
+
+class OrdreDSatur:
+    """
+    Ordre DSATUR : le prochain module est celui dont le plus de jours sont déjà
+    bloqués par ses voisins planifiés (saturation), puis celui de plus fort
+    degré, puis celui ayant le plus d'étudiants. Les égalités restantes sont
+    départagées au hasard si un générateur est fourni.
+
+    La file de priorité est mise à jour paresseusement : une entrée périmée est
+    ignorée quand elle sort du tas.
+    """
+
+    def __init__(self, modules: List[dict], graphe: ConflictGraph,
+                 rng: Optional[random.Random] = None):
+        self.graphe = graphe
+        self.modules = {module['id']: module for module in modules}
+        self.alea = {
+            module_id: rng.random() if rng is not None else 0.0
+            for module_id in self.modules
+        }
+        self.jours_bloques: Dict[int, Set[date_type]] = defaultdict(set)
+        self.traites: Set[int] = set()
+        self.tas = [self._cle(module_id) for module_id in self.modules]
+        heapq.heapify(self.tas)
+
+    def _cle(self, module_id: int) -> tuple:
+        return (
+            -len(self.jours_bloques[module_id]),
+            -self.graphe.degre(module_id),
+            -self.modules[module_id]['nb_etudiants'],
+            self.alea[module_id],
+            module_id
+        )
+
+    def __iter__(self) -> Iterator[dict]:
+        while self.tas:
+            saturation, _, _, _, module_id = heapq.heappop(self.tas)
+            if module_id in self.traites or -saturation != len(self.jours_bloques[module_id]):
+                continue
+            self.traites.add(module_id)
+            yield self.modules[module_id]
+
+    def marquer_planifie(self, module: dict, date: date_type):
+        """Bloque la date pour les voisins non encore traités du module"""
+        for voisin_id in self.graphe.voisins[module['id']]:
+            if voisin_id in self.traites or voisin_id not in self.modules:
+                continue
+            bloques = self.jours_bloques[voisin_id]
+            if date not in bloques:
+                bloques.add(date)
+                heapq.heappush(self.tas, self._cle(voisin_id))
+
+
+ORDRES_MODULES = {
+    'effectif': OrdreEffectif,
+    'dsatur': OrdreDSatur,
+}
+
+
+def creer_ordre(ordre: str, modules: List[dict], graphe: ConflictGraph,
+                rng: Optional[random.Random] = None):
+    """Instancie l'ordre de planification demandé"""
+    if ordre not in ORDRES_MODULES:
+        raise ValueError(
+            f"Ordre de planification inconnu: {ordre} "
+            f"(disponibles: {', '.join(ORDRES_MODULES)})"
+        )
+    return ORDRES_MODULES[ordre](modules, graphe, rng)
@@ -0,0 +1,77 @@
+"""
+Lecture en flux d'un COPY ... TO STDOUT (FORMAT binary)
+Les lignes sont décodées au fil de l'eau en tableaux d'entiers, sans tuples Python
+"""
+
+from typing import List
+
+import numpy as np
+
+SIGNATURE_COPY = b"PGCOPY\n\xff\r\n\x00"
+FIN_COPY = b"\xff\xff"
+
+
+class LecteurCopyEntiers:
+    """
+    Décode un COPY binaire dont toutes les colonnes sont des int4 non nuls
+
+    S'utilise comme fichier de destination de cursor.copy_expert : chaque bloc
+    reçu est découpé en lignes de taille fixe (nombre de champs, puis longueur
+    et valeur de chaque champ) décodées en tableaux NumPy. Seul le reste d'une
+    ligne incomplète est gardé en tampon, la mémoire reste donc bornée par la
+    taille des tableaux d'entiers.
+    """
+
+    def __init__(self, nb_colonnes: int):
+        self.nb_colonnes = nb_colonnes
+        self.format_ligne = np.dtype(
+            [('nb_champs', '>i2')]
+            + [(nom, '>i4') for i in range(nb_colonnes) for nom in (f'longueur_{i}', f'valeur_{i}')]
+        )
+        self.tampon = b""
+        self.entete_lu = False
+        self.termine = False
+        self.blocs: List[np.ndarray] = []
+
+    def write(self, donnees: bytes) -> int:
+        self.tampon += bytes(donnees)
+
+        if not self.entete_lu:
+            # Signature, drapeaux (int32) puis longueur de l'extension d'en-tête (int32)
+            if len(self.tampon) < 19:
+                return len(donnees)
+            if not self.tampon.startswith(SIGNATURE_COPY):
+                raise ValueError("Flux COPY binaire invalide (signature absente)")
+            longueur_extension = int.from_bytes(self.tampon[15:19], 'big')
+            if len(self.tampon) < 19 + longueur_extension:
+                return len(donnees)
+            self.tampon = self.tampon[19 + longueur_extension:]
+            self.entete_lu = True
+
+        taille = self.format_ligne.itemsize
+        # La fin de flux (int16 -1) ne fait que 2 octets : elle ne peut pas
+        # occuper une ligne complète
+        nb_lignes = len(self.tampon) // taille
+        if nb_lignes:
+            lignes = np.frombuffer(self.tampon, dtype=self.format_ligne, count=nb_lignes)
+            if (lignes['nb_champs'] != self.nb_colonnes).any() or any(
+                (lignes[f'longueur_{i}'] != 4).any() for i in range(self.nb_colonnes)
+            ):
+                raise ValueError("Flux COPY binaire inattendu : colonnes int4 non nulles attendues")
+            self.blocs.append(np.stack(
+                [lignes[f'valeur_{i}'].astype(np.int64) for i in range(self.nb_colonnes)], axis=1
+            ))
+            self.tampon = self.tampon[nb_lignes * taille:]
+
+        if self.tampon[:2] == FIN_COPY:
+            self.termine = True
+            self.tampon = b""
+        return len(donnees)
+
+    def resultat(self) -> np.ndarray:
+        """Tableau (nb_lignes, nb_colonnes) des valeurs lues"""
+        if not self.termine:
+            raise ValueError("Flux COPY binaire incomplet")
+        if not self.blocs:
+            return np.empty((0, self.nb_colonnes), dtype=np.int64)
+        return np.concatenate(self.blocs)
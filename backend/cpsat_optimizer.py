@@ -0,0 +1,262 @@
+"""
+Moteur de planification par programmation par contraintes (OR-Tools CP-SAT)
+Alternative à l'algorithme glouton quand celui-ci laisse des modules non planifiés
+"""
+
+import time as time_module
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from optimizer import ExamScheduleOptimizer
+
+
+class CpSatScheduleOptimizer(ExamScheduleOptimizer):
+    """
+    Optimiseur CP-SAT avec la même interface que ExamScheduleOptimizer
+
+    Le glouton est exécuté d'abord : s'il place tous les modules son planning est
+    conservé, sinon il sert de solution de départ (hint) au solveur. Le planning
+    reconstruit à partir de la solution n'est retenu que s'il place plus de
+    modules que le glouton, dont le planning est restauré sinon. La
+    reconstruction rejoue le planning comme le glouton : une durée égale à
+    celle du glouton lui est réservée sur le budget, retirée du temps du solveur.
+
+    Le modèle ne suit pas chaque professeur, seulement les surveillances de
+    chaque jour. Comme un examen demande autant de surveillants distincts que
+    de salles et qu'un professeur surveille au plus
+    MAX_SURVEILLANCES_PAR_JOUR_PROF fois par jour, les examens d'un jour ont
+    des surveillants si et seulement si aucun ne demande plus de salles qu'il
+    n'y a de professeurs et si le jour ne demande pas plus de
+    MAX_SURVEILLANCES_PAR_JOUR_PROF surveillances par professeur : ce sont
+    les deux contraintes du modèle. L'approximation porte sur la
+    reconstruction, qui choisit les surveillants gloutonnement (responsable,
+    département, puis les moins chargés) sans garantie d'atteindre la borne,
+    et replace par le glouton les modules restés sans surveillants.
+    """
+
+    def __init__(self, db_config: dict, annee_academique: str = "2024-2025", session: str = "Normale",
+                 temps_limite: Optional[float] = None, nb_workers: int = 8, **options):
+        """
+        Args:
+            temps_limite: Budget total en secondes (glouton inclus),
+                          TEMPS_MAX_GENERATION_SECONDES par défaut
+            nb_workers: Nombre de workers de recherche parallèle de CP-SAT
+            options: Options transmises à ExamScheduleOptimizer
+        """
+        super().__init__(db_config, annee_academique, session, **options)
+        self.temps_limite = temps_limite or self.TEMPS_MAX_GENERATION_SECONDES
+        self.nb_workers = nb_workers
+        self.capacites_cumulees = None
+
+    def besoin_salles(self, module: dict) -> int:
+        """
+        Nombre minimal de salles de l'examen du module quand toutes sont libres,
+        les plus grandes d'abord comme dans l'allocateur (0 sans inscrits)
+        """
+        if module['nb_etudiants'] <= 0:
+            return 0
+        return int(np.searchsorted(self.capacites_cumulees, module['nb_etudiants'])) + 1
+
+    def taille_examen(self, module: dict) -> tuple:
+        """Salles et durée de l'examen : deux examens de même taille sont interchangeables"""
+        return self.besoin_salles(module), module['duree_minutes']
+
+    def construire_modele(self, dates: List, hints: Dict[int, tuple]):
+        """
+        Construit le modèle CP-SAT
+
+        Variables :
+            - y[m, d] = 1 si l'examen du module m a lieu le jour d
+            - n[d, s, t] = nombre d'examens de taille t (taille_examen : salles
+              et durée) commençant au créneau s du jour d
+        Contraintes :
+            - au plus un jour par module
+            - une cohorte (donc chaque étudiant) passe au plus un examen par jour
+            - les examens d'un jour sont répartis entre ses créneaux, et chaque
+              cellule de l'allocateur de salles utilise au plus le nombre de
+              salles disponibles, examens commencés plus tôt et encore en cours
+              compris
+            - surveillances par jour <= MAX_SURVEILLANCES_PAR_JOUR_PROF x professeurs,
+              et un module demandant plus de salles qu'il n'y a de professeurs
+              n'est pas planifiable (surveillants distincts)
+        Objectif : maximiser le nombre de modules planifiés.
+
+        Le créneau de chaque module n'est pas une variable : les modules de même
+        taille sont interchangeables, seuls les effectifs par créneau comptent.
+        Le modèle reste ainsi de la taille modules x jours.
+
+        Returns:
+            (modèle, variables y indexées par (module_id, index date),
+             variables n indexées par (index date, index créneau, taille))
+        """
+        model = cp_model.CpModel()
+        nb_salles_total = len(self.salles_disponibles)
+        nb_salles_max = min(nb_salles_total, len(self.professeurs_disponibles))
+        self.capacites_cumulees = np.cumsum(
+            sorted((salle['capacite'] for salle in self.salles_disponibles), reverse=True)
+        )
+        capacite_surveillance = self.MAX_SURVEILLANCES_PAR_JOUR_PROF * len(self.professeurs_disponibles)
+
+        y = {}
+        modules_par_jour_taille = defaultdict(list)
+        modules_par_cohorte_jour = defaultdict(list)
+        surveillances_par_jour = defaultdict(list)
+
+        for module in self.modules_a_planifier:
+            taille = self.taille_examen(module)
+            nb_salles = taille[0]
+            if nb_salles == 0 or nb_salles > nb_salles_max:
+                continue
+
+            variables_module = []
+            for d in range(len(dates)):
+                var = model.NewBoolVar(f"y_{module['id']}_{d}")
+                y[module['id'], d] = var
+                variables_module.append(var)
+                modules_par_jour_taille[d, taille].append(var)
+                surveillances_par_jour[d].append(nb_salles * var)
+                for cohorte_id in module['cohortes']:
+                    modules_par_cohorte_jour[cohorte_id, d].append(var)
+
+            model.AddAtMostOne(variables_module)
+
+        n = {}
+        salles_par_cellule = defaultdict(list)
+        for (d, taille), variables in modules_par_jour_taille.items():
+            nb_salles, duree = taille
+            borne = min(len(variables), nb_salles_total // nb_salles)
+            repartition = []
+            for s, heure in enumerate(self.CRENEAUX_HORAIRES):
+                var = model.NewIntVar(0, borne, f"n_{d}_{s}_{nb_salles}_{duree}")
+                n[d, s, taille] = var
+                repartition.append(var)
+                premiere, derniere = self.salles_libres.cellules(heure, duree)
+                for k in range(premiere, derniere + 1):
+                    salles_par_cellule[d, k].append(nb_salles * var)
+            model.Add(sum(repartition) == sum(variables))
+
+        for termes in salles_par_cellule.values():
+            model.Add(sum(termes) <= nb_salles_total)
+
+        for termes in surveillances_par_jour.values():
+            model.Add(sum(termes) <= capacite_surveillance)
+
+        for variables in modules_par_cohorte_jour.values():
+            if len(variables) > 1:
+                model.AddAtMostOne(variables)
+
+        model.Maximize(sum(y.values()))
+
+        for (module_id, d), var in y.items():
+            model.AddHint(var, hints.get(module_id) == dates[d])
+
+        return model, y, n
+
+    def reconstruire_planning(self, affectations: Dict[int, object],
+                              repartition: Dict[tuple, int], dates: List) -> List[dict]:
+        """
+        Rejoue les jours choisis par le solveur en attribuant créneau, salles et surveillants
+
+        Chaque créneau reçoit le nombre d'examens de chaque taille fixé par le
+        solveur. Un module dont les ressources ne peuvent être attribuées le jour
+        choisi est replacé au premier créneau libre par le glouton.
+
+        Returns:
+            Liste des modules non planifiés
+        """
+        self.reinitialiser_planning(dates)
+        modules = {module['id']: module for module in self.modules_a_planifier}
+        index_dates = {date: d for d, date in enumerate(dates)}
+
+        a_replacer = []
+        ordre = sorted(
+            affectations.items(),
+            key=lambda item: (item[1], -modules[item[0]]['nb_etudiants'])
+        )
+        for module_id, date in ordre:
+            module = modules[module_id]
+            taille = self.taille_examen(module)
+            d = index_dates[date]
+            creneaux = sorted(
+                range(len(self.CRENEAUX_HORAIRES)),
+                key=lambda s: -repartition.get((d, s, taille), 0)
+            )
+            for s in creneaux:
+                if self.placer_module_creneau(module, date, self.CRENEAUX_HORAIRES[s]):
+                    repartition[d, s, taille] = repartition.get((d, s, taille), 0) - 1
+                    break
+            else:
+                a_replacer.append(module)
+
+        non_planifies = [
+            module for module in self.modules_a_planifier
+            if module['id'] not in affectations
+        ]
+        for module in a_replacer:
+            if self.placer_module(module, dates) is None:
+                non_planifies.append(module)
+
+        return non_planifies
+
+    def generer_planning(self, date_debut: str = "2025-01-20", date_fin: str = "2025-02-15") -> dict:
+        """Génère l'emploi du temps : glouton puis CP-SAT si des modules restent non planifiés"""
+        start_time = time_module.time()
+
+        resultat_glouton = super().generer_planning(date_debut, date_fin)
+        resultat_glouton['moteur'] = 'glouton'
+        if not resultat_glouton['modules_non_planifies']:
+            return resultat_glouton
+
+        # Temps réservé à la reconstruction, qui rejoue le planning comme le glouton
+        duree_reconstruction = time_module.time() - start_time
+        dates = self.dates_disponibles
+        placements_glouton = self.exporter_placements()
+        hints = {examen.module_id: self.date_examen(examen) for examen in self.examens_planifies}
+        if self.temps_limite - 2 * duree_reconstruction <= 0 or self.arret_demande():
+            return resultat_glouton
+
+        model, y, n = self.construire_modele(dates, hints)
+        budget = self.temps_limite - (time_module.time() - start_time) - duree_reconstruction
+        if budget <= 0 or self.arret_demande():
+            return resultat_glouton
+
+        print(f"\n⏳ Recherche CP-SAT ({self.nb_workers} workers, {budget:.1f}s, "
+              f"{duree_reconstruction:.1f}s réservées à la reconstruction)...")
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = budget
+        solver.parameters.num_workers = self.nb_workers
+        statut = solver.Solve(model)
+
+        resultat_glouton['statut_solveur'] = solver.StatusName(statut)
+        resultat_glouton['temps_execution'] = time_module.time() - start_time
+        if statut not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            print(f"   ✗ Aucune solution CP-SAT ({solver.StatusName(statut)})")
+            return resultat_glouton
+
+        affectations = {
+            module_id: dates[d]
+            for (module_id, d), var in y.items()
+            if solver.BooleanValue(var)
+        }
+        repartition = {cle: solver.Value(var) for cle, var in n.items()}
+        print(f"   ✓ {solver.StatusName(statut)}: {len(affectations)} modules placés "
+              f"(glouton: {resultat_glouton['nb_planifies']})")
+
+        if len(affectations) <= resultat_glouton['nb_planifies']:
+            return resultat_glouton
+
+        modules_non_planifies = self.reconstruire_planning(affectations, repartition, dates)
+        if len(self.examens_par_module) <= resultat_glouton['nb_planifies']:
+            print(f"   ✗ {len(self.examens_par_module)} modules placés à la reconstruction, "
+                  f"planning glouton restauré")
+            self.restaurer_placements(placements_glouton, dates)
+            resultat_glouton['temps_execution'] = time_module.time() - start_time
+            return resultat_glouton
+
+        resultat = self.construire_resultat(modules_non_planifies, start_time)
+        resultat['moteur'] = 'cpsat'
+        resultat['statut_solveur'] = solver.StatusName(statut)
+        return resultat
@@ -10,6 +10,8 @@ from contextlib import contextmanager
 from typing import List, Dict, Any, Optional
 import logging
 
+from examen import STATUT_PLANIFIE
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -263,7 +265,13 @@ class DashboardQueries:
                 COUNT(DISTINCT f.id) as total_formations,
                 COUNT(DISTINCT et.id) as total_etudiants,
                 COUNT(DISTINCT s.professeur_id) as profs_mobilises,
-                COUNT(DISTINCT e.lieu_id) as salles_utilisees,
+                (
+                    SELECT COUNT(DISTINCT es.lieu_id)
+                    FROM examen_salles es
+                    JOIN examens e2 ON es.examen_id = e2.id
+                    WHERE e2.annee_academique = %s
+                    AND e2.statut = %s
+                ) as salles_utilisees,
                 SUM(e.nb_etudiants_inscrits) as total_places_examens
             FROM examens e
             JOIN modules m ON e.module_id = m.id
@@ -272,9 +280,9 @@ class DashboardQueries:
             JOIN etudiants et ON i.etudiant_id = et.id
             LEFT JOIN surveillances s ON e.id = s.examen_id
             WHERE e.annee_academique = %s
-            AND e.statut = 'Planifié'
+            AND e.statut = %s
         """
-        result = db.execute_query(query, (annee,))
+        result = db.execute_query(query, (annee, STATUT_PLANIFIE, annee, STATUT_PLANIFIE))
         return result[0] if result else {}
     
     @staticmethod
@@ -285,18 +293,19 @@ class DashboardQueries:
                 SELECT COUNT(*) as total FROM lieux_examen WHERE est_disponible = TRUE
             )
             SELECT 
-                e.date_examen,
-                COUNT(DISTINCT e.lieu_id) as salles_occupees,
+                es.date_examen,
+                COUNT(DISTINCT es.lieu_id) as salles_occupees,
                 st.total as salles_disponibles,
-                ROUND(COUNT(DISTINCT e.lieu_id)::NUMERIC / st.total * 100, 2) as taux_occupation
-            FROM examens e
+                ROUND(COUNT(DISTINCT es.lieu_id)::NUMERIC / st.total * 100, 2) as taux_occupation
+            FROM examen_salles es
+            JOIN examens e ON es.examen_id = e.id
             CROSS JOIN salles_total st
             WHERE e.annee_academique = %s
-            AND e.statut = 'Planifié'
-            GROUP BY e.date_examen, st.total
-            ORDER BY e.date_examen
+            AND e.statut = %s
+            GROUP BY es.date_examen, st.total
+            ORDER BY es.date_examen
         """
-        return db.execute_query(query, (annee,))
+        return db.execute_query(query, (annee, STATUT_PLANIFIE))
     
     @staticmethod
     def get_repartition_examens_par_dept(db: Database, annee: str) -> List[Dict]:
@@ -312,11 +321,11 @@ class DashboardQueries:
             JOIN formations f ON m.formation_id = f.id
             JOIN departements d ON f.departement_id = d.id
             WHERE e.annee_academique = %s
-            AND e.statut = 'Planifié'
+            AND e.statut = %s
             GROUP BY d.id, d.nom
             ORDER BY nb_examens DESC
         """
-        return db.execute_query(query, (annee,))
+        return db.execute_query(query, (annee, STATUT_PLANIFIE))
 
 # ============================================
 # HELPERS
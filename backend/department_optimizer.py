@@ -0,0 +1,206 @@
+"""
+Planification décomposée par département, exécutée en parallèle
+Chaque département est planifié dans son propre processus avec un quota de
+salles, puis un passage de réconciliation fusionne les plannings
+"""
+
+import io
+import os
+import time as time_module
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Dict, List, Optional
+
+from conflict_graph import ConflictGraph
+from optimizer import ExamScheduleOptimizer
+
+
+def _planifier_partition(partition: dict, dates: List, options: dict) -> dict:
+    """
+    Planifie un département dans un processus du pool
+
+    Args:
+        partition: Département, ses modules, ses salles (quota) et ses professeurs
+        dates: Jours de la période
+        options: Options transmises à ExamScheduleOptimizer
+
+    Returns:
+        Placements compacts de la partition et durée de sa planification
+    """
+    debut = time_module.time()
+    optimizer = ExamScheduleOptimizer(db_config={}, **options)
+    optimizer.importer_instance({
+        'modules': partition['modules'],
+        'salles': partition['salles'],
+        'professeurs': partition['professeurs'],
+        'taille_cohortes': partition['taille_cohortes'],
+        'graphe_conflits': ConflictGraph(partition['modules'])
+    })
+
+    with redirect_stdout(io.StringIO()):
+        optimizer.reinitialiser_planning(dates)
+        optimizer.executer_glouton(dates)
+
+    return {
+        'departement_id': partition['departement_id'],
+        'nb_modules': len(partition['modules']),
+        'placements': optimizer.exporter_placements(),
+        'duree': time_module.time() - debut
+    }
+
+
+class DepartmentScheduleOptimizer(ExamScheduleOptimizer):
+    """
+    Optimiseur par départements avec la même interface que ExamScheduleOptimizer
+
+    Chaque département reçoit un quota de salles disjoint, proportionnel aux
+    places que demandent ses modules, et ses propres professeurs, puis est
+    planifié par le glouton dans un processus séparé. Les partitions ne
+    peuvent donc pas se disputer une salle ou un surveillant : seuls les
+    étudiants inscrits dans plusieurs départements (options) les relient.
+
+    La réconciliation reprend tels quels les placements des partitions, dans
+    l'ordre des partitions quel que soit l'ordre de fin des processus, en ne
+    vérifiant que la disponibilité des étudiants. Les examens écartés par un
+    conflit d'étudiants et les modules que leur partition n'a pas pu placer
+    sont ensuite placés par le glouton avec toutes les salles et tous les
+    professeurs. Ce dernier passage, exécuté dans le processus principal,
+    s'ajoute à la plus longue des partitions : le gain dépend du nombre de
+    cœurs et de la part d'examens écartés. Sur les instances synthétiques,
+    où les options relient presque tous les modules à d'autres départements,
+    plus d'un tiers des examens sont écartés et le moteur n'est pas plus
+    rapide que le glouton : il n'est proposé ni dans l'interface ni dans
+    generer_plannings tant que benchmark.py departements ne montre pas de gain.
+
+    Le quota de salles peut empêcher de placer un module que le glouton sur
+    toutes les ressources aurait placé. En rattrapage, partitions et
+    réconciliation planifient dans la fenêtre compacte (fenetre_planification).
+    """
+
+    def __init__(self, db_config: dict, annee_academique: str = "2024-2025", session: str = "Normale",
+                 nb_workers: Optional[int] = None, **options):
+        """
+        Args:
+            nb_workers: Nombre de processus (nombre de cœurs par défaut)
+            options: Options transmises à ExamScheduleOptimizer
+        """
+        super().__init__(db_config, annee_academique, session, **options)
+        self.nb_workers = nb_workers or os.cpu_count() or 1
+
+    def repartir_salles(self, modules_par_departement: Dict[int, List[dict]]) -> Dict[int, List[dict]]:
+        """
+        Attribue chaque salle à un département
+
+        Les salles sont prises de la plus grande à la plus petite ; chacune va
+        au département le plus éloigné de sa part de la capacité totale, part
+        proportionnelle au nombre de places que demandent ses modules.
+        """
+        demandes = {
+            departement_id: sum(module['nb_etudiants'] for module in modules)
+            for departement_id, modules in modules_par_departement.items()
+        }
+        demande_totale = sum(demandes.values()) or 1
+        capacite_totale = sum(salle['capacite'] for salle in self.salles_disponibles)
+
+        attribuees = {departement_id: 0 for departement_id in modules_par_departement}
+        quotas: Dict[int, List[dict]] = {departement_id: [] for departement_id in modules_par_departement}
+        for salle in sorted(self.salles_disponibles, key=lambda s: s['capacite'], reverse=True):
+            departement_id = max(
+                quotas,
+                key=lambda d: demandes[d] / demande_totale * capacite_totale - attribuees[d]
+            )
+            quotas[departement_id].append(salle)
+            attribuees[departement_id] += salle['capacite']
+        return quotas
+
+    def construire_partitions(self) -> List[dict]:
+        """Partitions par département, la plus lourde en premier"""
+        modules_par_departement: Dict[int, List[dict]] = defaultdict(list)
+        for module in self.modules_a_planifier:
+            modules_par_departement[module['departement_id']].append(module)
+
+        profs_par_departement: Dict[int, List[dict]] = defaultdict(list)
+        for prof in self.professeurs_disponibles:
+            profs_par_departement[prof['departement_id']].append(prof)
+
+        quotas = self.repartir_salles(modules_par_departement)
+        partitions = [
+            {
+                'departement_id': departement_id,
+                'modules': modules,
+                'salles': quotas[departement_id],
+                'professeurs': profs_par_departement.get(departement_id, []),
+                'taille_cohortes': self.taille_cohortes
+            }
+            for departement_id, modules in modules_par_departement.items()
+        ]
+        partitions.sort(key=lambda p: sum(m['nb_etudiants'] for m in p['modules']), reverse=True)
+        return partitions
+
+    def generer_planning(self, date_debut: str = "2025-01-20", date_fin: str = "2025-02-15") -> dict:
+        """Génère l'emploi du temps département par département, puis réconcilie les étudiants communs"""
+        start_time = time_module.time()
+
+        print("\n" + "="*60)
+        print("   GÉNÉRATION PAR DÉPARTEMENTS DE L'EMPLOI DU TEMPS")
+        print("="*60)
+
+        if not self.donnees_chargees:
+            self.charger_donnees()
+
+        dates = self.fenetre_planification(self.calculer_dates_disponibles(date_debut, date_fin))
+        partitions = self.construire_partitions()
+
+        print(f"\n⏳ {len(partitions)} départements sur "
+              f"{min(self.nb_workers, len(partitions))} processus...\n")
+
+        resultats = []
+        options = self.options_constructeur()
+        with ProcessPoolExecutor(max_workers=max(1, min(self.nb_workers, len(partitions)))) as executor:
+            futures = [
+                executor.submit(_planifier_partition, partition, dates, options)
+                for partition in partitions
+            ]
+            for nb_terminees, future in enumerate(futures, start=1):
+                resultat_partition = future.result()
+                resultats.append(resultat_partition)
+                self.signaler_progression(nb_terminees / len(partitions),
+                                          f"{nb_terminees}/{len(partitions)} départements planifiés")
+                print(f"   ✓ Département {resultat_partition['departement_id']}: "
+                      f"{len(resultat_partition['placements'])}/{resultat_partition['nb_modules']} modules "
+                      f"en {resultat_partition['duree']:.2f}s")
+
+        print("\n⏳ Réconciliation des étudiants communs à plusieurs départements...")
+        debut_reconciliation = time_module.time()
+        self.reinitialiser_planning(dates)
+        a_replacer = []
+        nb_ecartes = 0
+        for partition, resultat_partition in zip(partitions, resultats):
+            placements = {placement[0]: placement for placement in resultat_partition['placements']}
+            for module_partition in partition['modules']:
+                module = self.modules_par_id[module_partition['id']]
+                placement = placements.get(module['id'])
+                if placement is None:
+                    a_replacer.append(module)
+                    continue
+                _, date, heure, salle_ids, surveillants = placement
+                if not self.verifier_disponibilite_etudiants(module, date):
+                    a_replacer.append(module)
+                    nb_ecartes += 1
+                    continue
+                self.planifier_examen(module, date, heure,
+                                      [self.salles_par_id[salle_id] for salle_id in salle_ids],
+                                      list(surveillants))
+        print(f"   ✓ {len(self.examens_par_module)} examens repris, {nb_ecartes} écartés, "
+              f"{len(a_replacer)} modules à replacer")
+
+        modules_non_planifies = self.executer_glouton(dates, modules=a_replacer)
+
+        resultat = self.construire_resultat(modules_non_planifies, start_time)
+        resultat['moteur'] = 'departements'
+        resultat['nb_partitions'] = len(partitions)
+        resultat['nb_examens_ecartes'] = nb_ecartes
+        resultat['duree_partition_max'] = max((r['duree'] for r in resultats), default=0.0)
+        resultat['duree_reconciliation'] = time_module.time() - debut_reconciliation
+        return resultat
@@ -0,0 +1,34 @@
+"""
+Représentation compacte d'un examen planifié
+"""
+
+from typing import Tuple
+
+# Statut des examens écrits par l'optimiseur (contrainte CHECK de examens.statut)
+STATUT_PLANIFIE = 'Planifie'
+
+
+class Examen:
+    """
+    Examen planifié, réduit à des entiers
+
+    Le jour et le créneau sont des indices dans les dates de la période et
+    dans les créneaux horaires de l'optimiseur ; salles et surveillants sont
+    des identifiants. ExamScheduleOptimizer.decrire_examen reconstruit la
+    forme détaillée (dates, salles, libellés) pour l'affichage et la sauvegarde.
+    """
+
+    __slots__ = ('module_id', 'jour', 'creneau', 'salles', 'surveillants', 'nb_etudiants')
+
+    def __init__(self, module_id: int, jour: int, creneau: int, salles: Tuple[int, ...],
+                 surveillants: Tuple[int, ...], nb_etudiants: int):
+        self.module_id = module_id
+        self.jour = jour
+        self.creneau = creneau
+        self.salles = salles
+        self.surveillants = surveillants
+        self.nb_etudiants = nb_etudiants
+
+    def __repr__(self) -> str:
+        return (f"Examen(module_id={self.module_id}, jour={self.jour}, creneau={self.creneau}, "
+                f"salles={self.salles}, surveillants={self.surveillants})")
@@ -0,0 +1,355 @@
+"""
+Génération des plannings en ligne de commande, sans l'interface Streamlit
+
+Chaque couple (année académique, session) est généré dans son propre
+processus, contrôlé par ConflictDetector sur la transaction encore ouverte,
+puis validé seulement s'il ne contient aucun conflit critique.
+
+Usage :
+    python generer_plannings.py 2024-2025:Normale 2024-2025:Rattrapage
+    python generer_plannings.py 2024-2025:Normale --moteur multi-departs --budget 60 --json -
+    python generer_plannings.py 2024-2025:Normale --budget 30 --budget-epuise completer
+    python generer_plannings.py 2024-2025:Rattrapage --periode Rattrapage=2025-06-16:2025-07-04 --dry-run
+
+Codes de sortie (le plus grave l'emporte quand plusieurs couples échouent) :
+    0  tous les plannings sont générés, contrôlés et sauvegardés (ou simulés)
+    1  erreur d'exécution (connexion, requête...)
+    2  conflits critiques détectés, planning non sauvegardé
+    3  période infaisable d'après analyser_faisabilite, rien n'est généré
+    4  modules non planifiés : le planning partiel est sauvegardé, sauf si le
+       budget s'est écoulé (--budget-epuise) : avec conserver, le planning
+       enregistré est gardé s'il compte plus d'examens ; avec completer, les
+       examens enregistrés des modules non atteints sont repris
+    5  arguments invalides
+"""
+
+import argparse
+import importlib
+import io
+import json
+import os
+import sys
+import threading
+import time as time_module
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Dict, List, Optional, Tuple
+
+from optimizer import POLITIQUES_BUDGET
+
+CODE_SUCCES = 0
+CODE_ERREUR = 1
+CODE_CONFLITS = 2
+CODE_INFAISABLE = 3
+CODE_INCOMPLET = 4
+CODE_ARGUMENTS = 5
+
+# Statut d'un couple -> code de sortie, du plus grave au moins grave
+CODES_STATUT = {
+    'erreur': CODE_ERREUR,
+    'conflits': CODE_CONFLITS,
+    'infaisable': CODE_INFAISABLE,
+    'conserve': CODE_INCOMPLET,
+    'incomplet': CODE_INCOMPLET,
+    'sauvegarde': CODE_SUCCES,
+    'simulation': CODE_SUCCES,
+}
+
+MOTEURS = {
+    'glouton': ('optimizer', 'ExamScheduleOptimizer'),
+    'multi-departs': ('parallel_optimizer', 'MultiStartScheduleOptimizer'),
+    'cp-sat': ('cpsat_optimizer', 'CpSatScheduleOptimizer'),
+    'recherche-locale': ('local_search', 'LocalSearchScheduleOptimizer'),
+}
+
+PERIODE_PAR_DEFAUT = ("2025-01-20", "2025-02-15")
+
+
+def lire_couple(texte: str) -> Tuple[str, str]:
+    """'2024-2025:Normale' -> ('2024-2025', 'Normale')"""
+    annee, separateur, session = texte.partition(':')
+    if not separateur or not annee or not session:
+        raise argparse.ArgumentTypeError(f"Couple invalide: {texte} (attendu ANNEE:SESSION)")
+    return annee, session
+
+
+def lire_periode(texte: str) -> Tuple[str, Tuple[str, str]]:
+    """
+    'Rattrapage=2025-06-16:2025-07-04' ou '2024-2025:Rattrapage=2025-06-16:2025-07-04'
+    -> (clé, (début, fin)) ; la clé est une session ou un couple ANNEE:SESSION
+    """
+    cle, separateur, dates = texte.partition('=')
+    debut, separateur_dates, fin = dates.partition(':')
+    if not separateur or not separateur_dates or not cle or not debut or not fin:
+        raise argparse.ArgumentTypeError(
+            f"Période invalide: {texte} (attendu [ANNEE:]SESSION=DEBUT:FIN)"
+        )
+    return cle, (debut, fin)
+
+
+def periode_du_couple(periodes: Dict[str, Tuple[str, str]], annee: str, session: str) -> Tuple[str, str]:
+    """Période du couple, la plus précise l'emportant : ANNEE:SESSION, puis SESSION, puis défaut"""
+    return periodes.get(f"{annee}:{session}") or periodes.get(session) or periodes.get('*', PERIODE_PAR_DEFAUT)
+
+
+def configuration_base(dsn: Optional[str]) -> dict:
+    """
+    Paramètres de connexion : --dsn, sinon la variable DATABASE_URL, sinon config.db_config
+
+    config n'est importé qu'en dernier recours, car il lit les secrets Streamlit.
+    """
+    dsn = dsn or os.environ.get('DATABASE_URL')
+    if dsn:
+        return {'dsn': dsn}
+    from config import db_config
+    return db_config.DB_CONFIG
+
+
+def generer_couple(db_config: dict, annee: str, session: str, date_debut: str, date_fin: str,
+                   moteur: str, budget: Optional[float], politique_budget: str, dry_run: bool,
+                   verbeux: bool, options: dict) -> dict:
+    """
+    Génère, contrôle et sauvegarde le planning d'un couple (exécuté dans un processus du pool)
+
+    Le planning est écrit sans valider la transaction ; ConflictDetector lit
+    alors ce planning sur la même connexion. La transaction est validée
+    seulement sans conflit critique et hors simulation, sinon annulée. Un
+    planning arrêté par le budget avec des modules non planifiés passe d'abord
+    par appliquer_politique_budget.
+
+    Returns:
+        Compte rendu sérialisable en JSON, dont 'statut' (voir CODES_STATUT)
+    """
+    from conflict_detector import ConflictDetector
+
+    nom_module, nom_classe = MOTEURS[moteur]
+    classe_optimiseur = getattr(importlib.import_module(nom_module), nom_classe)
+
+    compte_rendu = {
+        'annee_academique': annee,
+        'session': session,
+        'moteur': moteur,
+        'periode': [date_debut, date_fin],
+        'dry_run': dry_run,
+        'statut': 'erreur',
+        'durees': {},
+    }
+    durees = compte_rendu['durees']
+    debut_total = time_module.perf_counter()
+    optimizer = classe_optimiseur(db_config=db_config, annee_academique=annee, session=session, **options)
+    minuteur = None
+
+    # La sortie standard est réservée au JSON : les messages de l'optimiseur vont sur stderr
+    with redirect_stdout(sys.stderr if verbeux else io.StringIO()):
+        try:
+            optimizer.connect()
+
+            debut = time_module.perf_counter()
+            optimizer.charger_donnees()
+            durees['chargement'] = time_module.perf_counter() - debut
+
+            debut = time_module.perf_counter()
+            analyse = optimizer.analyser_faisabilite(date_debut, date_fin)
+            durees['analyse'] = time_module.perf_counter() - debut
+            compte_rendu['analyse'] = {
+                'verdict': analyse['verdict'],
+                'problemes': analyse['problemes'],
+                'alertes': analyse['alertes'],
+            }
+            if not analyse['faisable']:
+                compte_rendu['statut'] = 'infaisable'
+                return compte_rendu
+
+            if budget:
+                minuteur = threading.Timer(budget, optimizer.arret.set)
+                minuteur.daemon = True
+                minuteur.start()
+            debut = time_module.perf_counter()
+            resultat = optimizer.generer_planning(date_debut=date_debut, date_fin=date_fin)
+            durees['planification'] = time_module.perf_counter() - debut
+            compte_rendu.update({
+                'nb_planifies': resultat['nb_planifies'],
+                'nb_total': resultat['nb_total'],
+                'modules_non_planifies': [module['code'] for module in resultat['modules_non_planifies']],
+                'penalite_etalement': resultat['penalite_etalement'],
+                'budget_atteint': optimizer.arret.is_set(),
+            })
+            if (compte_rendu['budget_atteint'] and resultat['modules_non_planifies']
+                    and not optimizer.appliquer_politique_budget(resultat, politique_budget)):
+                compte_rendu['budget_epuise'] = resultat['budget_epuise']
+                compte_rendu['statut'] = 'conserve'
+                return compte_rendu
+            if 'budget_epuise' in resultat:
+                compte_rendu.update({
+                    'nb_planifies': resultat['nb_planifies'],
+                    'modules_non_planifies': [module['code'] for module in resultat['modules_non_planifies']],
+                    'penalite_etalement': resultat['penalite_etalement'],
+                    'budget_epuise': resultat['budget_epuise'],
+                })
+
+            debut = time_module.perf_counter()
+            optimizer.sauvegarder_planning(valider=False)
+            durees['sauvegarde'] = time_module.perf_counter() - debut
+            compte_rendu['sauvegarde'] = optimizer.derniere_sauvegarde
+
+            debut = time_module.perf_counter()
+            detecteur = ConflictDetector(db_config, annee_academique=annee, session=session)
+            detecteur.conn = optimizer.conn
+            rapport = detecteur.generer_rapport_complet()
+            durees['validation'] = time_module.perf_counter() - debut
+            compte_rendu['validation'] = {
+                **rapport['resume'],
+                'conflits': {nom: len(conflits) for nom, conflits in rapport['conflits'].items()},
+            }
+
+            if rapport['resume']['nb_conflits_critiques'] or dry_run:
+                optimizer.conn.rollback()
+                compte_rendu['statut'] = 'conflits' if rapport['resume']['nb_conflits_critiques'] else 'simulation'
+            else:
+                debut = time_module.perf_counter()
+                optimizer.conn.commit()
+                durees['commit'] = time_module.perf_counter() - debut
+                compte_rendu['statut'] = 'incomplet' if resultat['modules_non_planifies'] else 'sauvegarde'
+
+        except Exception as e:
+            if optimizer.conn is not None and not optimizer.conn.closed:
+                optimizer.conn.rollback()
+            compte_rendu['statut'] = 'erreur'
+            compte_rendu['erreur'] = f"{type(e).__name__}: {e}"
+        finally:
+            if minuteur is not None:
+                minuteur.cancel()
+            optimizer.disconnect()
+            compte_rendu['mesures'] = optimizer.mesures.exporter()
+            durees['total'] = time_module.perf_counter() - debut_total
+
+    return compte_rendu
+
+
+def generer_plannings(couples: List[Tuple[str, str]], periodes: Dict[str, Tuple[str, str]],
+                      db_config: dict, moteur: str = 'glouton', budget: Optional[float] = None,
+                      politique_budget: str = 'conserver', dry_run: bool = False, nb_processus: Optional[int] = None,
+                      verbeux: bool = False, options: Optional[dict] = None) -> List[dict]:
+    """
+    Génère les plannings des couples (année, session), un processus par couple
+
+    Returns:
+        Comptes rendus de generer_couple, dans l'ordre des couples
+    """
+    if moteur not in MOTEURS:
+        raise ValueError(f"Moteur inconnu: {moteur} (disponibles: {', '.join(MOTEURS)})")
+    if politique_budget not in POLITIQUES_BUDGET:
+        raise ValueError(f"Politique de budget inconnue: {politique_budget} "
+                         f"(disponibles: {', '.join(POLITIQUES_BUDGET)})")
+    couples = list(dict.fromkeys(couples))
+    options = options or {}
+    nb_processus = min(nb_processus or os.cpu_count() or 1, len(couples))
+
+    arguments = [
+        (db_config, annee, session, *periode_du_couple(periodes, annee, session),
+         moteur, budget, politique_budget, dry_run, verbeux, options)
+        for annee, session in couples
+    ]
+    if nb_processus <= 1:
+        return [generer_couple(*args) for args in arguments]
+
+    with ProcessPoolExecutor(max_workers=nb_processus) as executor:
+        futures = [executor.submit(generer_couple, *args) for args in arguments]
+        return [future.result() for future in futures]
+
+
+def code_sortie(comptes_rendus: List[dict]) -> int:
+    """Code de sortie du statut le plus grave (ordre de CODES_STATUT)"""
+    statuts = {compte_rendu['statut'] for compte_rendu in comptes_rendus}
+    for statut, code in CODES_STATUT.items():
+        if statut in statuts:
+            return code
+    return CODE_SUCCES
+
+
+def afficher_resume(comptes_rendus: List[dict]):
+    """Résumé lisible des comptes rendus, sur stderr"""
+    symboles = {'sauvegarde': '✅', 'simulation': '🔍', 'incomplet': '⚠️ ', 'conserve': '⏱️ ', 'conflits': '❌',
+                'infaisable': '❌', 'erreur': '✗'}
+    for compte_rendu in comptes_rendus:
+        ligne = (f"{symboles[compte_rendu['statut']]} {compte_rendu['annee_academique']} "
+                 f"{compte_rendu['session']} : {compte_rendu['statut']}")
+        if 'nb_planifies' in compte_rendu:
+            ligne += f", {compte_rendu['nb_planifies']}/{compte_rendu['nb_total']} modules"
+        if 'validation' in compte_rendu:
+            ligne += (f", {compte_rendu['validation']['nb_conflits_critiques']} conflits critiques, "
+                      f"{compte_rendu['validation']['nb_avertissements']} avertissements")
+        ligne += f" ({compte_rendu['durees']['total']:.2f}s)"
+        print(ligne, file=sys.stderr)
+        if compte_rendu['statut'] == 'infaisable':
+            for probleme in compte_rendu['analyse']['problemes']:
+                print(f"   - {probleme}", file=sys.stderr)
+        if 'erreur' in compte_rendu:
+            print(f"   - {compte_rendu['erreur']}", file=sys.stderr)
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Génère, contrôle et sauvegarde les plannings d'examens",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='Codes de sortie' + __doc__.split('Codes de sortie', 1)[1]
+    )
+    parser.add_argument('couples', nargs='+', type=lire_couple, metavar='ANNEE:SESSION',
+                        help="Couples à générer, par exemple 2024-2025:Normale")
+    parser.add_argument('--periode', action='append', type=lire_periode, default=[],
+                        metavar='[ANNEE:]SESSION=DEBUT:FIN',
+                        help="Période d'une session ou d'un couple (répétable, '*' pour toutes) ; "
+                             f"{PERIODE_PAR_DEFAUT[0]}:{PERIODE_PAR_DEFAUT[1]} par défaut")
+    parser.add_argument('--moteur', choices=list(MOTEURS), default='glouton')
+    parser.add_argument('--budget', type=float, default=None,
+                        help="Budget de temps par couple en secondes ; à l'échéance, la génération s'arrête")
+    parser.add_argument('--budget-epuise', dest='politique_budget', choices=list(POLITIQUES_BUDGET),
+                        default='conserver',
+                        help="Sauvegarde d'un planning arrêté par le budget avec des modules non planifiés : "
+                             + " ; ".join(f"{nom}, {description}" for nom, description in POLITIQUES_BUDGET.items()))
+    parser.add_argument('--nb-processus', type=int, default=None,
+                        help="Couples générés en parallèle (nombre de cœurs par défaut)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Générer et contrôler sans rien valider en base")
+    parser.add_argument('--dsn', default=None,
+                        help="Chaîne de connexion PostgreSQL (DATABASE_URL ou config.py sinon)")
+    parser.add_argument('--json', dest='sortie_json', default=None, metavar='FICHIER',
+                        help="Écrit les comptes rendus en JSON dans FICHIER ('-' pour la sortie standard)")
+    parser.add_argument('--verbeux', action='store_true',
+                        help="Affiche sur stderr les messages de l'optimiseur")
+    try:
+        args = parser.parse_args(arguments)
+    except SystemExit as e:
+        return CODE_SUCCES if e.code == 0 else CODE_ARGUMENTS
+
+    try:
+        db_config = configuration_base(args.dsn)
+    except Exception as e:
+        print(f"✗ Configuration de la base introuvable: {e}", file=sys.stderr)
+        return CODE_ERREUR
+
+    debut = time_module.perf_counter()
+    comptes_rendus = generer_plannings(
+        args.couples, dict(args.periode), db_config,
+        moteur=args.moteur, budget=args.budget, politique_budget=args.politique_budget, dry_run=args.dry_run,
+        nb_processus=args.nb_processus, verbeux=args.verbeux
+    )
+    code = code_sortie(comptes_rendus)
+    afficher_resume(comptes_rendus)
+
+    if args.sortie_json:
+        document = json.dumps({
+            'code_sortie': code,
+            'duree': time_module.perf_counter() - debut,
+            'plannings': comptes_rendus,
+        }, ensure_ascii=False, indent=2, default=str)
+        if args.sortie_json == '-':
+            print(document)
+        else:
+            with open(args.sortie_json, 'w', encoding='utf-8') as fichier:
+                fichier.write(document + '\n')
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
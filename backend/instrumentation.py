@@ -0,0 +1,97 @@
+"""
+Mesures de l'optimiseur : durée par phase, compteurs et profilage optionnel
+"""
+
+import cProfile
+import os
+import time as time_module
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+PROFILEURS = ('cprofile', 'pyinstrument')
+
+
+class Mesures:
+    """
+    Durées cumulées par phase et compteurs d'une exécution
+
+    Les phases imbriquées se recouvrent : 'placement' inclut par exemple
+    'recherche_salles' et 'recherche_surveillants'. Dans les boucles chaudes,
+    l'optimiseur ajoute les durées directement (ajouter_duree) plutôt que
+    d'ouvrir un gestionnaire de contexte.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.compteurs: Dict[str, int] = defaultdict(int)
+        self.profil: Optional[str] = None
+
+    @contextmanager
+    def phase(self, nom: str) -> Iterator[None]:
+        debut = time_module.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[nom] += time_module.perf_counter() - debut
+
+    def ajouter_duree(self, nom: str, debut: float):
+        """Ajoute à la phase le temps écoulé depuis debut (perf_counter)"""
+        self.phases[nom] += time_module.perf_counter() - debut
+
+    def compter(self, nom: str, nb: int = 1):
+        self.compteurs[nom] += nb
+
+    def exporter(self) -> dict:
+        """Copie des mesures, pour le dictionnaire de résultat"""
+        return {
+            'phases': dict(self.phases),
+            'compteurs': dict(self.compteurs),
+            'profil': self.profil
+        }
+
+
+@contextmanager
+def profiler(mesures: Mesures, profileur: Optional[str], repertoire: str, prefixe: str) -> Iterator[None]:
+    """
+    Profile le bloc et écrit le profil dans repertoire (sans effet si profileur est None)
+
+    'cprofile' écrit un fichier .prof (lisible avec pstats ou snakeviz),
+    'pyinstrument' une page .html ; pyinstrument n'est importé qu'à la demande.
+    Le chemin du profil est noté dans mesures.profil.
+    """
+    if profileur is None:
+        yield
+        return
+    if profileur not in PROFILEURS:
+        raise ValueError(
+            f"Profileur inconnu: {profileur} (disponibles: {', '.join(PROFILEURS)})"
+        )
+
+    os.makedirs(repertoire, exist_ok=True)
+    horodatage = datetime.now().strftime("%Y%m%d_%H%M%S")
+    chemin = os.path.join(repertoire, f"{prefixe}_{horodatage}")
+
+    if profileur == 'cprofile':
+        profil = cProfile.Profile()
+        profil.enable()
+        try:
+            yield
+        finally:
+            profil.disable()
+            chemin += '.prof'
+            profil.dump_stats(chemin)
+            mesures.profil = chemin
+    else:
+        from pyinstrument import Profiler
+        profil = Profiler()
+        profil.start()
+        try:
+            yield
+        finally:
+            profil.stop()
+            chemin += '.html'
+            with open(chemin, 'w', encoding='utf-8') as fichier:
+                fichier.write(profil.output_html())
+            mesures.profil = chemin
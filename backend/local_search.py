@@ -0,0 +1,385 @@
+"""
+Amélioration du planning glouton par recherche locale (recuit simulé avec liste tabou)
+Déplace ou échange des examens entre (jour, créneau) pour placer les modules restants,
+équilibrer les surveillances et étaler les examens de chaque cohorte
+"""
+
+import math
+import random
+import time as time_module
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from examen import Examen
+from optimizer import ExamScheduleOptimizer
+
+
+class LocalSearchScheduleOptimizer(ExamScheduleOptimizer):
+    """
+    Optimiseur glouton suivi d'une phase de recuit simulé
+
+    Le coût d'un planning combine trois termes tenus à jour à chaque
+    planification ou annulation d'examen, sans jamais recalculer le planning :
+        - le nombre de modules non planifiés (terme dominant), hors modules
+          qu'aucun planning ne peut placer (sans inscrits, plus d'étudiants
+          que de places ou de salles que de professeurs)
+        - la pénalité d'étalement des cohortes (SpreadTracker du glouton)
+        - l'écart à l'équilibre des surveillances : somme des carrés des
+          charges moins sa valeur si la charge était également répartie,
+          soit nombre de professeurs x variance des charges
+    Un mouvement ne touche donc que les cohortes et les surveillants des
+    examens déplacés. Le meilleur planning rencontré est conservé et restauré
+    quand le budget de temps est écoulé.
+
+    POIDS_CHARGE est calibré sur PENALITES_ECART : transférer une surveillance
+    entre deux professeurs dont les charges diffèrent de 10 réduit la somme
+    des carrés de 18, soit 1,8 une fois pondéré, à peu près le coût d'un jour
+    de repos en moins pour deux étudiants. L'équilibrage ne l'emporte ainsi
+    que sur de petites pertes d'étalement.
+    """
+
+    POIDS_NON_PLANIFIE = 1_000_000
+    POIDS_ETALEMENT = 1
+    POIDS_CHARGE = 0.1
+
+    # Probabilités de tirage des mouvements (insertion si des modules restent non planifiés)
+    PROBA_INSERTION = 0.3
+    PROBA_ECHANGE = 0.3
+    PROBA_SURVEILLANT = 0.2
+
+    def __init__(self, db_config: dict, annee_academique: str = "2024-2025", session: str = "Normale",
+                 temps_limite: Optional[float] = None, graine: int = 0,
+                 temperature_initiale: float = 200.0, temperature_finale: float = 0.5,
+                 duree_tabou: int = 20, **options):
+        """
+        Args:
+            temps_limite: Budget total en secondes (glouton inclus),
+                          TEMPS_MAX_GENERATION_SECONDES par défaut
+            graine: Graine du générateur aléatoire des mouvements
+            temperature_initiale: Température au début de la recherche locale
+            temperature_finale: Température atteinte à l'échéance (refroidissement géométrique)
+            duree_tabou: Nombre d'itérations pendant lesquelles un module déplacé ne peut pas rebouger
+            options: Options transmises à ExamScheduleOptimizer
+        """
+        super().__init__(db_config, annee_academique, session, **options)
+        self.temps_limite = temps_limite or self.TEMPS_MAX_GENERATION_SECONDES
+        self.graine = graine
+        self.temperature_initiale = temperature_initiale
+        self.temperature_finale = temperature_finale
+        self.duree_tabou = duree_tabou
+
+        self.ids_non_planifies = set()
+        self.ids_implacables = set()
+        self.charge_profs: Dict[int, int] = defaultdict(int)
+        self.somme_charges = 0
+        self.somme_carres_charges = 0
+        self.profs_par_departement: Dict[int, List[int]] = defaultdict(list)
+
+    def reinitialiser_planning(self, dates_disponibles, rng: Optional[random.Random] = None):
+        """Vide le planning et remet à zéro les termes du coût"""
+        super().reinitialiser_planning(dates_disponibles, rng)
+        self.ids_implacables = self.modules_implacables()
+        self.ids_non_planifies = {module['id'] for module in self.modules_a_planifier} - self.ids_implacables
+        self.charge_profs = defaultdict(int)
+        self.somme_charges = 0
+        self.somme_carres_charges = 0
+
+    def modules_implacables(self) -> set:
+        """
+        Modules qu'aucun planning ne peut placer : sans inscrits, plus
+        d'étudiants que de places dans toutes les salles réunies, ou plus de
+        salles nécessaires que de professeurs (mêmes critères qu'analyser_faisabilite)
+        """
+        capacites_cumulees = np.cumsum(sorted((salle['capacite'] for salle in self.salles_disponibles),
+                                              reverse=True))
+        capacite_totale = int(capacites_cumulees[-1]) if len(capacites_cumulees) else 0
+        return {
+            module['id'] for module in self.modules_a_planifier
+            if module['nb_etudiants'] == 0 or module['nb_etudiants'] > capacite_totale
+            or np.searchsorted(capacites_cumulees, module['nb_etudiants']) + 1 > len(self.professeurs_disponibles)
+        }
+
+    def planifier_examen(self, module: dict, date, heure, salles: List[dict], surveillants: List[int]):
+        """Enregistre l'examen et met à jour les termes du coût"""
+        super().planifier_examen(module, date, heure, salles, surveillants)
+        self.ids_non_planifies.discard(module['id'])
+        self.somme_charges += len(surveillants)
+        for prof_id in surveillants:
+            self.somme_carres_charges += 2 * self.charge_profs[prof_id] + 1
+            self.charge_profs[prof_id] += 1
+
+    def annuler_examen(self, module: dict) -> Examen:
+        """Retire l'examen et met à jour les termes du coût"""
+        examen = super().annuler_examen(module)
+        self.ids_non_planifies.add(module['id'])
+        self.somme_charges -= len(examen.surveillants)
+        for prof_id in examen.surveillants:
+            self.charge_profs[prof_id] -= 1
+            self.somme_carres_charges -= 2 * self.charge_profs[prof_id] + 1
+        return examen
+
+    def desequilibre_charges(self) -> float:
+        """Nombre de professeurs x variance des surveillances par professeur, calculé en O(1)"""
+        if not self.professeurs_disponibles:
+            return 0.0
+        return self.somme_carres_charges - self.somme_charges ** 2 / len(self.professeurs_disponibles)
+
+    def cout(self) -> float:
+        """Coût du planning courant (à minimiser), calculé en O(1)"""
+        return (self.POIDS_NON_PLANIFIE * len(self.ids_non_planifies)
+                + self.POIDS_ETALEMENT * self.etalement.penalite
+                + self.POIDS_CHARGE * self.desequilibre_charges())
+
+    def _retirer(self, module: dict, mouvement: dict):
+        """Annule l'examen du module en le notant dans le mouvement en cours"""
+        mouvement['retires'].append((module, self.annuler_examen(module)))
+
+    def _placer_creneau(self, module: dict, date, heure, mouvement: dict) -> bool:
+        """Place le module sur un créneau précis en le notant dans le mouvement en cours"""
+        if not self.verifier_disponibilite_etudiants(module, date):
+            return False
+        if not self.placer_module_creneau(module, date, heure):
+            return False
+        mouvement['ajoutes'].append(module)
+        return True
+
+    def _placer_n_importe_ou(self, module: dict, rng: random.Random, mouvement: dict) -> bool:
+        """Place le module au premier créneau compatible d'un ordre de jours aléatoire"""
+        dates = rng.sample(self.dates_disponibles, len(self.dates_disponibles))
+        if self.placer_module(module, dates, rng) is None:
+            return False
+        mouvement['ajoutes'].append(module)
+        return True
+
+    def defaire(self, mouvement: dict):
+        """Annule un mouvement : retire les examens ajoutés et replace les examens retirés"""
+        for module in reversed(mouvement['ajoutes']):
+            self.annuler_examen(module)
+        for module, examen in reversed(mouvement['retires']):
+            self.replanifier_examen(module, examen)
+
+    def mouvement_insertion(self, module: dict, rng: random.Random, mouvement: dict) -> bool:
+        """
+        Insère un module non planifié
+
+        Si aucun créneau n'est libre, un jour est tiré au hasard : les modules
+        voisins planifiés ce jour-là sont retirés, le module y est placé et les
+        modules retirés sont replacés ailleurs lorsque c'est possible.
+        """
+        if self._placer_n_importe_ou(module, rng, mouvement):
+            return True
+
+        date = rng.choice(self.dates_disponibles)
+        for voisin_id in self.graphe_conflits.voisins[module['id']]:
+            examen = self.examens_par_module.get(voisin_id)
+            if examen is not None and self.date_examen(examen) == date:
+                self._retirer(self.modules_par_id[voisin_id], mouvement)
+
+        heures = rng.sample(self.CRENEAUX_HORAIRES, len(self.CRENEAUX_HORAIRES))
+        if not any(self._placer_creneau(module, date, heure, mouvement) for heure in heures):
+            return False
+
+        for ejecte, _ in list(mouvement['retires']):
+            self._placer_n_importe_ou(ejecte, rng, mouvement)
+        return True
+
+    def mouvement_deplacement(self, module: dict, rng: random.Random, mouvement: dict) -> bool:
+        """Déplace un examen vers un (jour, créneau) tiré au hasard"""
+        self._retirer(module, mouvement)
+        date = rng.choice(self.dates_disponibles)
+        heure = rng.choice(self.CRENEAUX_HORAIRES)
+        return self._placer_creneau(module, date, heure, mouvement)
+
+    def mouvement_echange(self, module_a: dict, module_b: dict, mouvement: dict) -> bool:
+        """Échange les (jour, créneau) de deux examens"""
+        examen_a = self.examens_par_module[module_a['id']]
+        examen_b = self.examens_par_module[module_b['id']]
+        if examen_a.jour == examen_b.jour and examen_a.creneau == examen_b.creneau:
+            return False
+
+        self._retirer(module_a, mouvement)
+        self._retirer(module_b, mouvement)
+        return (self._placer_creneau(module_a, self.date_examen(examen_b), self.heure_examen(examen_b), mouvement)
+                and self._placer_creneau(module_b, self.date_examen(examen_a), self.heure_examen(examen_a), mouvement))
+
+    def mouvement_surveillant(self, module: dict, rng: random.Random, mouvement: dict) -> bool:
+        """Confie une surveillance de l'examen à un autre professeur du département"""
+        examen = self.examens_par_module[module['id']]
+        date = self.date_examen(examen)
+        remplacables = [
+            i for i, prof_id in enumerate(examen.surveillants)
+            if prof_id != module['prof_responsable_id']
+        ]
+        candidats = [
+            prof_id for prof_id in self.profs_par_departement[module['departement_id']]
+            if prof_id not in examen.surveillants
+            and self.profs_par_jour[date][prof_id] < self.MAX_SURVEILLANCES_PAR_JOUR_PROF
+        ]
+        if not remplacables or not candidats:
+            return False
+
+        surveillants = list(examen.surveillants)
+        surveillants[rng.choice(remplacables)] = rng.choice(candidats)
+        self._retirer(module, mouvement)
+        self.planifier_examen(module, date, self.heure_examen(examen), self.salles_examen(examen), surveillants)
+        mouvement['ajoutes'].append(module)
+        return True
+
+    def tirer_mouvement(self, rng: random.Random, tabou: Dict[int, int], iteration: int) -> Optional[dict]:
+        """
+        Tire et applique un mouvement aléatoire
+
+        Returns:
+            Le mouvement appliqué (modules retirés et ajoutés), ou None si le
+            mouvement tiré est impossible (le planning est alors inchangé)
+        """
+        mouvement = {'retires': [], 'ajoutes': []}
+        tirage = rng.random()
+
+        if self.ids_non_planifies and tirage < self.PROBA_INSERTION:
+            module = self.modules_par_id[rng.choice(tuple(self.ids_non_planifies))]
+            ok = self.mouvement_insertion(module, rng, mouvement)
+        else:
+            if not self.examens_par_module:
+                return None
+            module = self._tirer_planifie(rng, tabou, iteration)
+            if module is None:
+                return None
+            tirage = rng.random()
+            if tirage < self.PROBA_ECHANGE and len(self.examens_par_module) > 1:
+                autre = self._tirer_planifie(rng, tabou, iteration)
+                ok = autre is not None and autre['id'] != module['id'] \
+                    and self.mouvement_echange(module, autre, mouvement)
+            elif tirage < self.PROBA_ECHANGE + self.PROBA_SURVEILLANT:
+                ok = self.mouvement_surveillant(module, rng, mouvement)
+            else:
+                ok = self.mouvement_deplacement(module, rng, mouvement)
+
+        if not ok:
+            self.defaire(mouvement)
+            return None
+        return mouvement
+
+    def _tirer_planifie(self, rng: random.Random, tabou: Dict[int, int], iteration: int) -> Optional[dict]:
+        """Tire un module planifié hors liste tabou (quelques essais au plus)"""
+        for _ in range(5):
+            module = rng.choice(self.modules_a_planifier)
+            if module['id'] in self.examens_par_module and tabou.get(module['id'], 0) <= iteration:
+                return module
+        return None
+
+    def ameliorer_planning(self, echeance: float) -> List[dict]:
+        """
+        Recuit simulé sur le planning courant jusqu'à l'échéance
+
+        Un mouvement qui fait baisser le coût est toujours accepté ; un mouvement
+        qui l'augmente de delta l'est avec la probabilité exp(-delta / T), T
+        décroissant géométriquement de temperature_initiale à temperature_finale
+        au fil du budget. Les modules déplacés par un mouvement accepté deviennent
+        tabous pendant duree_tabou itérations.
+
+        Le meilleur planning n'est copié que lorsqu'un mouvement accepté le
+        quitte en augmentant le coût : une suite d'améliorations ne coûte
+        qu'une copie, et aucune si le planning final est le meilleur.
+
+        Returns:
+            Liste des modules non planifiés du meilleur planning rencontré
+        """
+        rng = random.Random(self.graine)
+        self.profs_par_departement = defaultdict(list)
+        for prof in self.professeurs_disponibles:
+            self.profs_par_departement[prof['departement_id']].append(prof['id'])
+
+        debut = time_module.time()
+        duree = max(echeance - debut, 1e-9)
+        ratio = self.temperature_finale / self.temperature_initiale
+
+        cout = self.cout()
+        meilleur_cout = cout
+        meilleurs_placements = None
+        # Vrai tant que le planning courant est le meilleur rencontré (pas encore copié)
+        sur_meilleur = True
+        tabou: Dict[int, int] = {}
+        iteration = 0
+        nb_acceptes = 0
+        temperature = self.temperature_initiale
+
+        while True:
+            if iteration % 100 == 0:
+                maintenant = time_module.time()
+                if maintenant >= echeance or self.arret_demande():
+                    break
+                temperature = self.temperature_initiale * ratio ** ((maintenant - debut) / duree)
+                if iteration % 10000 == 0:
+                    self.signaler_progression((maintenant - debut) / duree,
+                                              f"Recherche locale : coût {cout:,.0f}")
+            iteration += 1
+
+            mouvement = self.tirer_mouvement(rng, tabou, iteration)
+            if mouvement is None:
+                continue
+
+            nouveau_cout = self.cout()
+            delta = nouveau_cout - cout
+            if delta > 0 and rng.random() >= math.exp(-delta / temperature):
+                self.defaire(mouvement)
+                continue
+
+            if sur_meilleur and nouveau_cout > meilleur_cout:
+                meilleurs_placements = self.copier_avant_mouvement(mouvement)
+                sur_meilleur = False
+
+            cout = nouveau_cout
+            nb_acceptes += 1
+            for module in mouvement['ajoutes']:
+                tabou[module['id']] = iteration + self.duree_tabou
+
+            if cout <= meilleur_cout:
+                meilleur_cout = cout
+                sur_meilleur = True
+
+        print(f"   ✓ {iteration} itérations, {nb_acceptes} mouvements acceptés")
+        if sur_meilleur:
+            return [module for module in self.modules_a_planifier if module['id'] not in self.examens_par_module]
+        return self.restaurer_placements(meilleurs_placements, self.dates_disponibles)
+
+    def copier_avant_mouvement(self, mouvement: dict) -> List[tuple]:
+        """
+        Placements du planning tel qu'avant le mouvement, qui reste appliqué
+
+        Le mouvement est défait le temps de la copie puis rejoué à l'identique :
+        ses retraits précèdent toujours ses ajouts.
+        """
+        ajouts = [(module, self.examens_par_module[module['id']]) for module in mouvement['ajoutes']]
+        self.defaire(mouvement)
+        placements = self.exporter_placements()
+        for module, _ in mouvement['retires']:
+            self.annuler_examen(module)
+        for module, examen in ajouts:
+            self.replanifier_examen(module, examen)
+        return placements
+
+    def generer_planning(self, date_debut: str = "2025-01-20", date_fin: str = "2025-02-15") -> dict:
+        """Génère l'emploi du temps : glouton puis amélioration par recuit simulé"""
+        start_time = time_module.time()
+        echeance = start_time + self.temps_limite
+
+        resultat_glouton = super().generer_planning(date_debut, date_fin)
+        if time_module.time() >= echeance or self.arret_demande():
+            resultat_glouton['moteur'] = 'glouton'
+            return resultat_glouton
+
+        cout_initial = self.cout()
+        print(f"\n⏳ Recherche locale ({echeance - time_module.time():.1f}s)...")
+        modules_non_planifies = self.ameliorer_planning(echeance)
+        print(f"   ✓ Coût {cout_initial:,.0f} → {self.cout():,.0f} | "
+              f"étalement {self.etalement.penalite:,} | "
+              f"écart-type surveillances {self.calculer_ecart_type_surveillances():.2f}")
+
+        resultat = self.construire_resultat(modules_non_planifies, start_time)
+        resultat['moteur'] = 'recherche_locale'
+        resultat['cout_initial'] = cout_initial
+        resultat['cout_final'] = self.cout()
+        return resultat
@@ -0,0 +1,116 @@
+"""
+Structures de suivi de l'occupation des étudiants par jour d'examen
+Chaque structure répond à la question : un module peut-il avoir son examen ce jour-là ?
+"""
+
+import numpy as np
+from collections import defaultdict
+from datetime import date as date_type
+from typing import Dict, List, Optional
+
+from conflict_graph import ConflictGraph
+
+
+class OccupationEnsembles:
+    """Occupation stockée comme un ensemble de cohortes occupées par jour"""
+
+    def __init__(self, modules: List[dict], nb_cohortes: int, dates: List[date_type],
+                 graphe: Optional[ConflictGraph] = None):
+        self.cohortes_par_jour = defaultdict(set)
+
+    def est_libre(self, module: dict, date: date_type) -> bool:
+        """Vérifie qu'aucune cohorte du module n'a déjà un examen ce jour-là"""
+        cohortes_occupees = self.cohortes_par_jour[date]
+        for cohorte_id in module['cohortes']:
+            if cohorte_id in cohortes_occupees:
+                return False
+        return True
+
+    def occuper(self, module: dict, date: date_type):
+        """Marque toutes les cohortes du module comme occupées ce jour-là"""
+        self.cohortes_par_jour[date].update(module['cohortes'])
+
+    def liberer(self, module: dict, date: date_type):
+        """Libère les cohortes du module ce jour-là"""
+        self.cohortes_par_jour[date].difference_update(module['cohortes'])
+
+
+class OccupationMatricielle:
+    """
+    Occupation stockée dans une matrice booléenne NumPy jours x cohortes
+
+    Chaque module reçoit un tableau d'indices de ses cohortes : la vérification
+    devient un any() vectorisé sur une ligne de la matrice et l'enregistrement
+    une seule affectation par indexation.
+    """
+
+    def __init__(self, modules: List[dict], nb_cohortes: int, dates: List[date_type],
+                 graphe: Optional[ConflictGraph] = None):
+        self.index_dates = {d: i for i, d in enumerate(dates)}
+        self.matrice = np.zeros((len(dates), nb_cohortes), dtype=np.bool_)
+        self.index_cohortes: Dict[int, np.ndarray] = {
+            module['id']: np.asarray(module['cohortes'], dtype=np.intp)
+            for module in modules
+        }
+
+    def est_libre(self, module: dict, date: date_type) -> bool:
+        """Vérifie qu'aucune cohorte du module n'a déjà un examen ce jour-là"""
+        ligne = self.matrice[self.index_dates[date]]
+        return not ligne[self.index_cohortes[module['id']]].any()
+
+    def occuper(self, module: dict, date: date_type):
+        """Marque toutes les cohortes du module comme occupées ce jour-là"""
+        self.matrice[self.index_dates[date], self.index_cohortes[module['id']]] = True
+
+    def liberer(self, module: dict, date: date_type):
+        """Libère les cohortes du module ce jour-là"""
+        self.matrice[self.index_dates[date], self.index_cohortes[module['id']]] = False
+
+
+class OccupationGraphe:
+    """
+    Occupation déduite du graphe de conflits entre modules
+
+    Planifier un module bloque la date pour tous ses voisins : la vérification
+    d'un module est alors une simple recherche dans ses jours bloqués.
+    """
+
+    def __init__(self, modules: List[dict], nb_cohortes: int, dates: List[date_type],
+                 graphe: Optional[ConflictGraph] = None):
+        self.graphe = graphe or ConflictGraph(modules)
+        self.jours_bloques: Dict[int, Dict[date_type, int]] = defaultdict(lambda: defaultdict(int))
+
+    def est_libre(self, module: dict, date: date_type) -> bool:
+        """Vérifie qu'aucun module voisin n'a déjà un examen ce jour-là"""
+        return date not in self.jours_bloques[module['id']]
+
+    def occuper(self, module: dict, date: date_type):
+        """Bloque la date pour tous les modules voisins"""
+        for voisin_id in self.graphe.voisins[module['id']]:
+            self.jours_bloques[voisin_id][date] += 1
+
+    def liberer(self, module: dict, date: date_type):
+        """Débloque la date pour les voisins qui n'ont plus d'autre conflit ce jour-là"""
+        for voisin_id in self.graphe.voisins[module['id']]:
+            bloques = self.jours_bloques[voisin_id]
+            bloques[date] -= 1
+            if bloques[date] == 0:
+                del bloques[date]
+
+
+BACKENDS_OCCUPATION = {
+    'ensembles': OccupationEnsembles,
+    'numpy': OccupationMatricielle,
+    'graphe': OccupationGraphe,
+}
+
+
+def creer_occupation(backend: str, modules: List[dict], nb_cohortes: int,
+                     dates: List[date_type], graphe: Optional[ConflictGraph] = None):
+    """Instancie la structure d'occupation correspondant au backend demandé"""
+    if backend not in BACKENDS_OCCUPATION:
+        raise ValueError(
+            f"Backend d'occupation inconnu: {backend} "
+            f"(disponibles: {', '.join(BACKENDS_OCCUPATION)})"
+        )
+    return BACKENDS_OCCUPATION[backend](modules, nb_cohortes, dates, graphe)
@@ -3,19 +3,56 @@ Algorithme d'optimisation pour la génération automatique des emplois du temps
 Objectif : Générer un planning optimal en moins de 45 secondes
 """
 
+import io
 import psycopg2
+import psycopg2.errors
+from psycopg2.extras import execute_values
 from datetime import datetime, timedelta, time
 from collections import defaultdict
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterable, Callable
+import math
+import random
+import threading
+import numpy as np
 import time as time_module
 
+from allocation_salles import AllocateurSalles
+from cache_instance import CacheInstance, calculer_empreinte
+from conflict_graph import ConflictGraph, creer_ordre
+from copie_binaire import LecteurCopyEntiers
+from examen import STATUT_PLANIFIE, Examen
+from instrumentation import Mesures, profiler
+from occupation import creer_occupation
+from spread import SpreadTracker
+from surveillants import FileSurveillants
+
+# Sauvegarde d'un planning arrêté par son budget de temps -> description
+POLITIQUES_BUDGET = {
+    'conserver': "le planning enregistré est gardé si le planning obtenu compte moins d'examens",
+    'completer': "les examens enregistrés des modules non atteints sont repris",
+}
+
 class ExamScheduleOptimizer:
     """Optimiseur pour la génération d'emplois du temps d'examens"""
     
-    def __init__(self, db_config: dict, annee_academique: str = "2024-2025", session: str = "Normale"):
+    def __init__(self, db_config: dict, annee_academique: str = "2024-2025", session: str = "Normale",
+                 backend_occupation: str = "ensembles", ordre_modules: str = "dsatur",
+                 repertoire_cache: Optional[str] = None, profileur: Optional[str] = None,
+                 repertoire_profils: str = "profils", rattrapage_non_valides: bool = True,
+                 etaler_examens: bool = True):
         self.db_config = db_config
         self.annee_academique = annee_academique
         self.session = session
+        self.backend_occupation = backend_occupation
+        self.ordre_modules = ordre_modules
+        self.repertoire_cache = repertoire_cache
+        self.profileur = profileur
+        self.repertoire_profils = repertoire_profils
+        self.rattrapage_non_valides = rattrapage_non_valides
+        # En session de rattrapage, seuls les modules non validés sont repassés
+        self.mode_rattrapage = session == "Rattrapage" and rattrapage_non_valides
+        # Le glouton préfère les jours qui laissent du repos aux cohortes du module
+        self.etaler_examens = etaler_examens
         self.conn = None
         
         # Contraintes métier
@@ -23,6 +60,9 @@ class ExamScheduleOptimizer:
         self.MAX_SURVEILLANCES_PAR_JOUR_PROF = 3
         self.CAPACITE_MAX_SALLE = 20
         
+        # Performance cible
+        self.TEMPS_MAX_GENERATION_SECONDES = 45
+        
         # Créneaux horaires disponibles
         self.CRENEAUX_HORAIRES = [
             time(8, 0),
@@ -37,12 +77,72 @@ class ExamScheduleOptimizer:
         self.professeurs_disponibles = []
         self.etudiants_par_module = {}
         
+        # Cohortes : groupes d'étudiants inscrits exactement aux mêmes modules
+        self.taille_cohortes = []
+        self.graphe_conflits = None
+        
+        self.donnees_chargees = False
+        
         # Suivi des planifications
-        self.examens_planifies = []
-        self.etudiants_par_jour = defaultdict(set)
+        self.dates_disponibles = []
+        self.examens_par_module = {}
+        self.occupation = None
         self.profs_par_jour = defaultdict(lambda: defaultdict(int))
-        self.salles_occupees = defaultdict(set)
+        self.modules_par_id = {}
+        self.index_dates = {}
+        self.index_creneaux = {}
+        self.salles_par_id = {}
+        self.salles_libres = None
+        self.profs_par_id = {}
+        self.files_surveillants = None
+        self.etalement = None
+        self.derniere_reparation = None
+        self.derniere_sauvegarde = None
         
+        # Suivi depuis un autre thread (tâches de fond) : progression et arrêt
+        self.rappel_progression: Optional[Callable[[float, str], None]] = None
+        self.arret = threading.Event()
+        
+        # Durées par phase et compteurs, cumulés depuis la création de l'optimiseur
+        self.mesures = Mesures()
+        
+    def options_constructeur(self) -> dict:
+        """Options du constructeur, pour recréer un optimiseur équivalent dans un autre processus"""
+        return {
+            'annee_academique': self.annee_academique,
+            'session': self.session,
+            'backend_occupation': self.backend_occupation,
+            'ordre_modules': self.ordre_modules,
+            'repertoire_cache': self.repertoire_cache,
+            'profileur': self.profileur,
+            'repertoire_profils': self.repertoire_profils,
+            'rattrapage_non_valides': self.rattrapage_non_valides,
+            'etaler_examens': self.etaler_examens
+        }
+    
+    @property
+    def examens_planifies(self) -> List[Examen]:
+        """Examens planifiés, dans l'ordre de planification"""
+        return list(self.examens_par_module.values())
+    
+    def signaler_progression(self, avancement: float, message: str):
+        """Transmet l'avancement (entre 0 et 1) de l'étape en cours au rappel éventuel"""
+        if self.rappel_progression is not None:
+            self.rappel_progression(avancement, message)
+    
+    def arret_demande(self) -> bool:
+        """Vrai si l'arrêt a été demandé : les modules restants sont alors déclarés non planifiés"""
+        return self.arret.is_set()
+    
+    def profiler(self):
+        """
+        Profile le bloc avec le profileur choisi ('cprofile' ou 'pyinstrument')
+        et écrit un profil par exécution dans repertoire_profils ; sans effet
+        si aucun profileur n'est choisi
+        """
+        return profiler(self.mesures, self.profileur, self.repertoire_profils,
+                        f"profil_{self.annee_academique}_{self.session}")
+    
     def connect(self):
         """Établit la connexion à la base de données"""
         self.conn = psycopg2.connect(**self.db_config)
@@ -53,22 +153,58 @@ class ExamScheduleOptimizer:
             self.conn.close()
             
     def charger_donnees(self):
-        """Charge toutes les données nécessaires depuis la BD"""
+        """
+        Charge toutes les données nécessaires depuis la BD
+        
+        Si repertoire_cache est défini, l'instantané de l'année et de la session
+        est réutilisé tant que l'empreinte des tables sources n'a pas changé.
+        
+        En mode rattrapage, seules les inscriptions non validées de l'année
+        sont chargées, et seuls les modules qui en ont au moins une.
+        """
         print("⏳ Chargement des données...")
+        debut = time_module.perf_counter()
         
         cur = self.conn.cursor()
         
+        cache = empreinte = None
+        if self.repertoire_cache:
+            cache = CacheInstance(self.repertoire_cache)
+            empreinte = calculer_empreinte(cur, self.annee_academique, self.mode_rattrapage)
+            instance = cache.charger(self.annee_academique, self.session, empreinte)
+            if instance is not None:
+                print("   ✓ Données relues depuis le cache")
+                self.charger_instance(instance['modules'], instance['salles'],
+                                      instance['professeurs'], instance['inscriptions'])
+                self.mesures.ajouter_duree('chargement', debut)
+                self.afficher_donnees_chargees()
+                return
+        
         # Charger les modules à planifier
-        cur.execute("""
-            SELECT m.id, m.code, m.nom, m.formation_id, m.duree_examen_minutes,
-                   f.departement_id, m.professeur_responsable_id
-            FROM modules m
-            JOIN formations f ON m.formation_id = f.id
-            ORDER BY m.formation_id, m.id
-        """)
+        if self.mode_rattrapage:
+            cur.execute("""
+                SELECT m.id, m.code, m.nom, m.formation_id, m.duree_examen_minutes,
+                       f.departement_id, m.professeur_responsable_id
+                FROM modules m
+                JOIN formations f ON m.formation_id = f.id
+                WHERE EXISTS (
+                    SELECT 1 FROM inscriptions i
+                    WHERE i.module_id = m.id AND i.annee_academique = %s
+                    AND i.est_valide IS NOT TRUE
+                )
+                ORDER BY m.formation_id, m.id
+            """, (self.annee_academique,))
+        else:
+            cur.execute("""
+                SELECT m.id, m.code, m.nom, m.formation_id, m.duree_examen_minutes,
+                       f.departement_id, m.professeur_responsable_id
+                FROM modules m
+                JOIN formations f ON m.formation_id = f.id
+                ORDER BY m.formation_id, m.id
+            """)
         
-        for row in cur.fetchall():
-            self.modules_a_planifier.append({
+        modules = [
+            {
                 'id': row[0],
                 'code': row[1],
                 'nom': row[2],
@@ -76,7 +212,9 @@ class ExamScheduleOptimizer:
                 'duree_minutes': row[4],
                 'departement_id': row[5],
                 'prof_responsable_id': row[6]
-            })
+            }
+            for row in cur.fetchall()
+        ]
         
         # Charger les salles disponibles
         cur.execute("""
@@ -86,14 +224,16 @@ class ExamScheduleOptimizer:
             ORDER BY capacite_examen DESC
         """)
         
-        for row in cur.fetchall():
-            self.salles_disponibles.append({
+        salles = [
+            {
                 'id': row[0],
                 'nom': row[1],
                 'type': row[2],
                 'capacite': row[3],
                 'batiment': row[4]
-            })
+            }
+            for row in cur.fetchall()
+        ]
         
         # Charger les professeurs
         cur.execute("""
@@ -102,105 +242,180 @@ class ExamScheduleOptimizer:
             ORDER BY departement_id
         """)
         
-        for row in cur.fetchall():
-            self.professeurs_disponibles.append({
+        professeurs = [
+            {
                 'id': row[0],
                 'matricule': row[1],
                 'nom': row[2],
                 'prenom': row[3],
                 'departement_id': row[4]
-            })
+            }
+            for row in cur.fetchall()
+        ]
         
-        # Charger le nombre d'étudiants par module
-        cur.execute("""
-            SELECT module_id, COUNT(DISTINCT etudiant_id) as nb_etudiants
-            FROM inscriptions
-            WHERE annee_academique = %s
-            GROUP BY module_id
-        """, (self.annee_academique,))
+        # Charger les inscriptions en un seul parcours : le COPY binaire est
+        # décodé au fil de l'eau en colonnes d'entiers, les effectifs par
+        # module sont calculés localement
+        inscriptions = self.charger_inscriptions(cur)
+        if cache is not None:
+            cache.enregistrer(self.annee_academique, self.session, empreinte,
+                              modules, salles, professeurs, inscriptions)
         
-        for row in cur.fetchall():
-            self.etudiants_par_module[row[0]] = row[1]
+        self.charger_instance(modules, salles, professeurs, inscriptions)
+        self.mesures.ajouter_duree('chargement', debut)
+        self.afficher_donnees_chargees()
+    
+    def afficher_donnees_chargees(self):
+        """Résumé des données chargées"""
+        print(f"   ✓ {len(self.modules_a_planifier)} modules à planifier")
+        print(f"   ✓ {len(self.salles_disponibles)} salles disponibles")
+        print(f"   ✓ {len(self.professeurs_disponibles)} professeurs disponibles")
+        print(f"   ✓ {len(self.taille_cohortes)} cohortes d'étudiants")
+    
+    def charger_inscriptions(self, cur) -> np.ndarray:
+        """
+        Inscriptions de l'année sous forme de tableau (module_id, etudiant_id),
+        limitées aux inscriptions non validées en mode rattrapage
         
-        # Charger les étudiants inscrits à chaque module
-        cur.execute("""
-            SELECT module_id, etudiant_id
+        Utilise COPY ... TO STDOUT (FORMAT binary) : les lignes ne deviennent
+        jamais des tuples Python et la mémoire reste bornée par le tableau final.
+        """
+        condition = "AND est_valide IS NOT TRUE" if self.mode_rattrapage else ""
+        requete = cur.mogrify(f"""
+            SELECT module_id::int4, etudiant_id::int4
             FROM inscriptions
-            WHERE annee_academique = %s
-        """, (self.annee_academique,))
+            WHERE annee_academique = %s {condition}
+        """, (self.annee_academique,)).decode()
         
-        etudiants_modules = defaultdict(list)
-        for row in cur.fetchall():
-            etudiants_modules[row[0]].append(row[1])
+        lecteur = LecteurCopyEntiers(2)
+        cur.copy_expert(f"COPY ({requete}) TO STDOUT (FORMAT binary)", lecteur)
+        return lecteur.resultat()
+    
+    def charger_instance(self, modules: List[dict], salles: List[dict],
+                         professeurs: List[dict], inscriptions: Iterable[Tuple[int, int]]):
+        """
+        Charge une instance déjà en mémoire (sans base de données)
         
-        for module in self.modules_a_planifier:
-            module['etudiants'] = etudiants_modules.get(module['id'], [])
-            module['nb_etudiants'] = len(module['etudiants'])
+        Args:
+            modules: Modules à planifier (id, code, nom, formation_id, duree_minutes,
+                     departement_id, prof_responsable_id)
+            salles: Salles disponibles, triées par capacité décroissante
+            professeurs: Professeurs (id, matricule, nom, prenom, departement_id)
+            inscriptions: Couples (module_id, etudiant_id), en liste ou en tableau
+                          NumPy à deux colonnes
         
-        print(f"   ✓ {len(self.modules_a_planifier)} modules à planifier")
-        print(f"   ✓ {len(self.salles_disponibles)} salles disponibles")
-        print(f"   ✓ {len(self.professeurs_disponibles)} professeurs disponibles")
+        Les inscriptions sont gardées en colonnes d'entiers : aucune liste
+        d'étudiants n'est créée par module, seuls les effectifs et les cohortes
+        sont conservés.
+        """
+        self.modules_a_planifier = modules
+        self.salles_disponibles = salles
+        self.professeurs_disponibles = professeurs
+        self.modules_par_id = {module['id']: module for module in modules}
+        
+        couples = np.asarray(inscriptions if isinstance(inscriptions, np.ndarray) else list(inscriptions),
+                             dtype=np.int64).reshape(-1, 2)
+        
+        # Rang de chaque module dans modules_a_planifier ; les inscriptions à un
+        # module inconnu sont ignorées
+        ids_modules = np.array([module['id'] for module in modules], dtype=np.int64)
+        ordre_ids = np.argsort(ids_modules)
+        position = np.searchsorted(ids_modules[ordre_ids], couples[:, 0])
+        position[position == len(ids_modules)] = 0
+        connus = ids_modules[ordre_ids][position] == couples[:, 0] if len(ids_modules) else np.zeros(len(couples), bool)
+        rangs_modules = ordre_ids[position[connus]]
+        etudiants = couples[connus, 1]
+        
+        # Une clé par inscription, triée par étudiant puis par module : les
+        # doublons disparaissent et les modules de chaque étudiant sont contigus
+        cles = np.unique((etudiants << 32) | rangs_modules)
+        etudiants = cles >> 32
+        rangs_modules = (cles & 0xFFFFFFFF).astype(np.int32)
+        
+        effectifs = np.bincount(rangs_modules, minlength=len(modules))
+        for module, nb in zip(modules, effectifs.tolist()):
+            module['nb_etudiants'] = nb
+        self.etudiants_par_module = {module['id']: module['nb_etudiants'] for module in modules}
+        
+        self.construire_cohortes(etudiants, rangs_modules)
+        self.graphe_conflits = ConflictGraph(self.modules_a_planifier)
+        self.donnees_chargees = True
+    
+    def construire_cohortes(self, etudiants: np.ndarray, rangs_modules: np.ndarray):
+        """
+        Regroupe les étudiants inscrits exactement aux mêmes modules en cohortes
+        
+        Deux étudiants d'une même cohorte ont toujours les mêmes examens : savoir
+        si une cohorte a déjà un examen un jour donné suffit donc à savoir si l'un
+        de ses étudiants en a un. Chaque module reçoit la liste de ses cohortes
+        dans module['cohortes'].
+        
+        Args:
+            etudiants: Étudiant de chaque inscription, trié
+            rangs_modules: Rang du module de chaque inscription, trié pour un même étudiant
+        """
+        debuts = np.flatnonzero(np.r_[True, etudiants[1:] != etudiants[:-1]]) if len(etudiants) else np.array([], int)
+        fins = np.r_[debuts[1:], len(etudiants)]
+        
+        index_cohortes = {}
+        self.taille_cohortes = []
+        cohortes_par_rang = defaultdict(list)
+        
+        for debut, fin in zip(debuts.tolist(), fins.tolist()):
+            signature = rangs_modules[debut:fin].tobytes()
+            cohorte_id = index_cohortes.get(signature)
+            if cohorte_id is None:
+                cohorte_id = len(self.taille_cohortes)
+                index_cohortes[signature] = cohorte_id
+                self.taille_cohortes.append(0)
+                for rang in rangs_modules[debut:fin].tolist():
+                    cohortes_par_rang[rang].append(cohorte_id)
+            self.taille_cohortes[cohorte_id] += 1
+        
+        for rang, module in enumerate(self.modules_a_planifier):
+            module['cohortes'] = cohortes_par_rang.get(rang, [])
         
     def calculer_nb_salles_necessaires(self, nb_etudiants: int) -> int:
         """Calcule le nombre de salles nécessaires pour un nombre d'étudiants"""
         return (nb_etudiants + self.CAPACITE_MAX_SALLE - 1) // self.CAPACITE_MAX_SALLE
     
-    def trouver_salles_disponibles(self, date: datetime.date, heure: time, nb_salles: int) -> List[dict]:
-        """Trouve des salles disponibles pour un créneau donné"""
-        cle_creneau = (date, heure)
-        salles_occupees = self.salles_occupees[cle_creneau]
-        
-        salles_libres = [
-            salle for salle in self.salles_disponibles 
-            if salle['id'] not in salles_occupees
-        ]
-        
-        if len(salles_libres) >= nb_salles:
-            return salles_libres[:nb_salles]
-        return []
+    def trouver_salles_disponibles(self, date: datetime.date, heure: time, duree_minutes: int,
+                                   nb_etudiants: int) -> List[dict]:
+        """
+        Trouve les salles libres pendant toute la durée de l'examen pouvant
+        accueillir nb_etudiants, en minimisant le nombre de salles puis les
+        places perdues
+        """
+        return self.salles_libres.trouver(date, heure, duree_minutes, nb_etudiants)
     
-    def verifier_disponibilite_etudiants(self, etudiants: List[int], date: datetime.date) -> bool:
-        """Vérifie qu'aucun étudiant n'a déjà un examen ce jour-là"""
-        for etudiant_id in etudiants:
-            if etudiant_id in self.etudiants_par_jour[date]:
-                return False
-        return True
+    def verifier_disponibilite_etudiants(self, module: dict, date: datetime.date) -> bool:
+        """Vérifie qu'aucun étudiant du module n'a déjà un examen ce jour-là"""
+        return self.occupation.est_libre(module, date)
     
     def trouver_surveillants(self, date: datetime.date, nb_salles: int, 
                             departement_id: int, prof_responsable_id: Optional[int]) -> List[int]:
-        """Trouve des professeurs disponibles pour surveiller"""
+        """
+        Trouve des professeurs disponibles pour surveiller : le responsable du
+        module, puis les moins chargés du jour dans son département, puis les
+        moins chargés des autres départements
+        """
         surveillants = []
         
         # Prioriser le prof responsable du module
-        if prof_responsable_id:
-            prof = next((p for p in self.professeurs_disponibles if p['id'] == prof_responsable_id), None)
-            if prof and self.profs_par_jour[date][prof_responsable_id] < self.MAX_SURVEILLANCES_PAR_JOUR_PROF:
+        if prof_responsable_id in self.profs_par_id:
+            if self.files_surveillants.est_disponible(date, prof_responsable_id):
                 surveillants.append(prof_responsable_id)
         
         # Profs du même département
-        profs_dept = [
-            p for p in self.professeurs_disponibles 
-            if p['departement_id'] == departement_id
-            and p['id'] not in surveillants
-            and self.profs_par_jour[date][p['id']] < self.MAX_SURVEILLANCES_PAR_JOUR_PROF
-        ]
-        
-        profs_dept.sort(key=lambda p: self.profs_par_jour[date][p['id']])
-        
-        while len(surveillants) < nb_salles and profs_dept:
-            surveillants.append(profs_dept.pop(0)['id'])
+        surveillants += self.files_surveillants.moins_charges(
+            date, departement_id, nb_salles - len(surveillants), set(surveillants)
+        )
         
         # Si pas assez, prendre d'autres départements
         if len(surveillants) < nb_salles:
-            autres_profs = [
-                p for p in self.professeurs_disponibles
-                if p['id'] not in surveillants
-                and self.profs_par_jour[date][p['id']] < self.MAX_SURVEILLANCES_PAR_JOUR_PROF
-            ]
-            autres_profs.sort(key=lambda p: self.profs_par_jour[date][p['id']])
-            
-            while len(surveillants) < nb_salles and autres_profs:
-                surveillants.append(autres_profs.pop(0)['id'])
+            surveillants += self.files_surveillants.moins_charges(
+                date, None, nb_salles - len(surveillants), set(surveillants)
+            )
         
         return surveillants if len(surveillants) == nb_salles else []
     
@@ -208,38 +423,84 @@ class ExamScheduleOptimizer:
                         salles: List[dict], surveillants: List[int]):
         """Enregistre la planification d'un examen"""
         
-        cle_creneau = (date, heure)
-        for salle in salles:
-            self.salles_occupees[cle_creneau].add(salle['id'])
+        self.salles_libres.occuper(date, heure, module['duree_minutes'], salles)
         
-        for etudiant_id in module['etudiants']:
-            self.etudiants_par_jour[date].add(etudiant_id)
+        self.occupation.occuper(module, date)
         
         for prof_id in surveillants:
             self.profs_par_jour[date][prof_id] += 1
+            self.files_surveillants.ajouter(date, prof_id)
         
-        self.examens_planifies.append({
-            'module_id': module['id'],
-            'module_code': module['code'],
-            'module_nom': module['nom'],
-            'date': date,
-            'heure': heure,
-            'duree_minutes': module['duree_minutes'],
-            'salles': salles,
-            'surveillants': surveillants,
-            'nb_etudiants': module['nb_etudiants']
-        })
+        self.etalement.ajouter(module, date)
+        
+        self.examens_par_module[module['id']] = Examen(
+            module['id'],
+            self.index_dates[date],
+            self.index_creneaux[heure],
+            tuple(salle['id'] for salle in salles),
+            tuple(surveillants),
+            module['nb_etudiants']
+        )
     
-    def generer_planning(self, date_debut: str = "2025-01-20", date_fin: str = "2025-02-15") -> dict:
-        """Génère l'emploi du temps complet des examens"""
-        start_time = time_module.time()
+    def annuler_examen(self, module: dict) -> Examen:
+        """
+        Retire l'examen planifié d'un module et libère ses salles, ses étudiants
+        et ses surveillants
         
-        print("\n" + "="*60)
-        print("   GÉNÉRATION DE L'EMPLOI DU TEMPS DES EXAMENS")
-        print("="*60)
+        Returns:
+            L'examen retiré
+        """
+        examen = self.examens_par_module.pop(module['id'])
+        date = self.date_examen(examen)
+        
+        self.salles_libres.liberer(date, self.heure_examen(examen), module['duree_minutes'],
+                                  self.salles_examen(examen))
         
-        self.charger_donnees()
+        self.occupation.liberer(module, date)
+        self.etalement.retirer(module, date)
         
+        for prof_id in examen.surveillants:
+            self.files_surveillants.retirer(date, prof_id)
+            self.profs_par_jour[date][prof_id] -= 1
+            if self.profs_par_jour[date][prof_id] == 0:
+                del self.profs_par_jour[date][prof_id]
+        
+        return examen
+    
+    def replanifier_examen(self, module: dict, examen: Examen):
+        """Replace un examen retiré par annuler_examen à l'identique"""
+        self.planifier_examen(module, self.date_examen(examen), self.heure_examen(examen),
+                              self.salles_examen(examen), list(examen.surveillants))
+    
+    def date_examen(self, examen: Examen) -> datetime.date:
+        """Date d'un examen planifié"""
+        return self.dates_disponibles[examen.jour]
+    
+    def heure_examen(self, examen: Examen) -> time:
+        """Heure de début d'un examen planifié"""
+        return self.CRENEAUX_HORAIRES[examen.creneau]
+    
+    def salles_examen(self, examen: Examen) -> List[dict]:
+        """Salles d'un examen planifié, salle principale en premier"""
+        return [self.salles_par_id[salle_id] for salle_id in examen.salles]
+    
+    def decrire_examen(self, examen: Examen) -> dict:
+        """Forme détaillée d'un examen planifié (libellés, date, heure, salles), pour l'affichage et la sauvegarde"""
+        module = self.modules_par_id[examen.module_id]
+        return {
+            'module_id': examen.module_id,
+            'module_code': module['code'],
+            'module_nom': module['nom'],
+            'date': self.date_examen(examen),
+            'heure': self.heure_examen(examen),
+            'duree_minutes': module['duree_minutes'],
+            'salles': self.salles_examen(examen),
+            'surveillants': list(examen.surveillants),
+            'nb_etudiants': examen.nb_etudiants
+        }
+    
+    def calculer_dates_disponibles(self, date_debut: str, date_fin: str) -> List[datetime.date]:
+        """Liste les jours ouvrés (lundi à vendredi) de la période d'examens"""
         date_debut_obj = datetime.strptime(date_debut, "%Y-%m-%d").date()
         date_fin_obj = datetime.strptime(date_fin, "%Y-%m-%d").date()
         
@@ -250,65 +511,617 @@ class ExamScheduleOptimizer:
                 dates_disponibles.append(date_courante)
             date_courante += timedelta(days=1)
         
+        return dates_disponibles
+    
+    def analyser_faisabilite(self, date_debut: str = "2025-01-20", date_fin: str = "2025-02-15") -> dict:
+        """
+        Analyse rapide de la période avant toute planification
+        
+        Compare des minorants de la demande aux ressources de la période :
+        jours (modules d'une même cohorte et clique du graphe de conflits),
+        places, salles-créneaux et surveillances (un surveillant par salle,
+        chaque module prenant au moins les plus grandes salles qui le
+        contiennent). Un minorant qui dépasse l'offre rend la période
+        impossible ; une offre utilisée à plus de 90 % la rend tendue.
+        
+        Returns:
+            Dictionnaire avec 'verdict' ('impossible', 'tendu' ou 'ok'),
+            'faisable', 'bornes', 'problemes', 'alertes' et 'duree'
+        """
+        debut = time_module.perf_counter()
+        if not self.donnees_chargees:
+            self.charger_donnees()
+        
+        nb_jours = len(self.calculer_dates_disponibles(date_debut, date_fin))
+        nb_creneaux = len(self.CRENEAUX_HORAIRES)
+        modules = [module for module in self.modules_a_planifier if module['nb_etudiants'] > 0]
+        
+        modules_par_cohorte = np.zeros(len(self.taille_cohortes), dtype=np.int64)
+        for module in modules:
+            modules_par_cohorte[module['cohortes']] += 1
+        clique = self.graphe_conflits.clique_gloutonne()
+        examens_par_jour = self.MAX_EXAMENS_PAR_JOUR_ETUDIANT
+        jours_necessaires = math.ceil(
+            max(int(modules_par_cohorte.max(initial=0)), len(clique)) / examens_par_jour
+        )
+        
+        # Nombre minimal de salles de chaque module : les plus grandes d'abord
+        capacites = np.sort([salle['capacite'] for salle in self.salles_disponibles])[::-1]
+        capacites_cumulees = np.cumsum(capacites)
+        effectifs = np.array([module['nb_etudiants'] for module in modules], dtype=np.int64)
+        salles_minimales = np.searchsorted(capacites_cumulees, effectifs) + 1
+        capacite_totale = int(capacites_cumulees[-1]) if len(capacites_cumulees) else 0
+        
+        bornes = {
+            'jours': (jours_necessaires, nb_jours),
+            'places': (int(effectifs.sum()), capacite_totale * nb_jours * nb_creneaux),
+            'salles_creneaux': (int(salles_minimales.sum()),
+                                len(self.salles_disponibles) * nb_jours * nb_creneaux),
+            'surveillances': (int(salles_minimales.sum()),
+                              len(self.professeurs_disponibles) * self.MAX_SURVEILLANCES_PAR_JOUR_PROF * nb_jours)
+        }
+        libelles = {
+            'jours': "jours nécessaires",
+            'places': "places",
+            'salles_creneaux': "salles-créneaux",
+            'surveillances': "surveillances"
+        }
+        
+        problemes = []
+        alertes = []
+        for nom, (demande, offre) in bornes.items():
+            if demande > offre:
+                problemes.append(f"{libelles[nom]} : au moins {demande} pour {offre} disponibles")
+            elif offre and demande > 0.9 * offre:
+                alertes.append(f"{libelles[nom]} : au moins {demande} pour {offre} disponibles "
+                               f"({demande / offre:.0%})")
+        
+        trop_grands = [module['code'] for module, n in zip(modules, effectifs) if n > capacite_totale]
+        if trop_grands:
+            problemes.append(f"{len(trop_grands)} modules dépassent la capacité totale des salles "
+                             f"({', '.join(trop_grands[:5])})")
+        sous_encadres = [
+            module['code'] for module, nb in zip(modules, salles_minimales)
+            if nb > len(self.professeurs_disponibles)
+        ]
+        if sous_encadres:
+            problemes.append(f"{len(sous_encadres)} modules demandent plus de salles que de professeurs "
+                             f"({', '.join(sous_encadres[:5])})")
+        nb_sans_inscrits = len(self.modules_a_planifier) - len(modules)
+        if nb_sans_inscrits:
+            alertes.append(f"{nb_sans_inscrits} modules sans inscrits ne seront pas planifiés")
+        
+        verdict = 'impossible' if problemes else 'tendu' if alertes else 'ok'
+        analyse = {
+            'verdict': verdict,
+            'faisable': not problemes,
+            'bornes': bornes,
+            'clique': clique,
+            'problemes': problemes,
+            'alertes': alertes,
+            'duree': time_module.perf_counter() - debut
+        }
+        
+        symbole = {'impossible': '❌', 'tendu': '⚠️', 'ok': '✅'}[verdict]
+        print(f"\n{symbole} Analyse de faisabilité : {verdict} ({analyse['duree'] * 1000:.1f} ms)")
+        for probleme in problemes:
+            print(f"   ❌ {probleme}")
+        for alerte in alertes:
+            print(f"   ⚠️ {alerte}")
+        return analyse
+    
+    def reinitialiser_planning(self, dates_disponibles: List[datetime.date],
+                               rng: Optional[random.Random] = None):
+        """
+        Vide le planning en cours et prépare le suivi d'occupation pour la période
+        
+        Args:
+            dates_disponibles: Jours de la période d'examens
+            rng: Si fourni, l'ordre des salles de même capacité est tiré au hasard ;
+                 sinon il suit leur identifiant
+        
+        L'ordre est celui d'une copie de salles_disponibles, qui n'est jamais
+        modifiée : un processus réutilisé pour plusieurs variantes obtient le
+        même planning sans rng qu'un processus neuf.
+        """
+        if rng is not None:
+            salles = sorted(self.salles_disponibles, key=lambda s: (-s['capacite'], rng.random()))
+        else:
+            salles = sorted(self.salles_disponibles, key=lambda s: (-s['capacite'], s['id']))
+        
+        self.dates_disponibles = dates_disponibles
+        self.index_dates = {date: i for i, date in enumerate(dates_disponibles)}
+        self.index_creneaux = {heure: i for i, heure in enumerate(self.CRENEAUX_HORAIRES)}
+        self.salles_par_id = {salle['id']: salle for salle in self.salles_disponibles}
+        self.examens_par_module = {}
+        self.profs_par_jour = defaultdict(lambda: defaultdict(int))
+        self.salles_libres = AllocateurSalles(salles, self.CRENEAUX_HORAIRES)
+        self.profs_par_id = {prof['id']: prof for prof in self.professeurs_disponibles}
+        self.files_surveillants = FileSurveillants(self.professeurs_disponibles,
+                                                   self.MAX_SURVEILLANCES_PAR_JOUR_PROF)
+        self.etalement = SpreadTracker(self.taille_cohortes, dates_disponibles)
+        self.occupation = creer_occupation(
+            self.backend_occupation,
+            self.modules_a_planifier,
+            len(self.taille_cohortes),
+            dates_disponibles,
+            self.graphe_conflits
+        )
+    
+    def placer_module(self, module: dict, dates: List[datetime.date],
+                      rng: Optional[random.Random] = None) -> Optional[datetime.date]:
+        """
+        Place le module au premier créneau compatible avec toutes les contraintes
+        
+        Args:
+            module: Module à planifier
+            dates: Dates candidates, dans l'ordre de préférence
+            rng: Si fourni, les créneaux de chaque jour sont essayés dans un ordre aléatoire
+        
+        Returns:
+            La date retenue, ou None si aucun créneau ne convient
+        """
+        creneaux = self.CRENEAUX_HORAIRES
+        if rng is not None:
+            creneaux = rng.sample(creneaux, len(creneaux))
+        
+        mesures = self.mesures
+        for date in dates:
+            mesures.compteurs['dates_essayees'] += 1
+            if not self.verifier_disponibilite_etudiants(module, date):
+                mesures.compteurs['rejets_etudiants'] += 1
+                continue
+            
+            for heure in creneaux:
+                if self.placer_module_creneau(module, date, heure):
+                    return date
+        
+        return None
+    
+    def ordonner_dates_etalement(self, module: dict, dates: List[datetime.date]) -> List[datetime.date]:
+        """
+        Dates candidates triées par pénalité d'étalement croissante
+        
+        Le tri est stable : à pénalité égale, l'ordre reçu est conservé (jours
+        les plus tôt pour le glouton déterministe, ordre tiré pour les variantes).
+        """
+        deltas = self.etalement.deltas_ajout(module, dates)
+        return [dates[i] for i in np.argsort(deltas, kind='stable').tolist()]
+    
+    def placer_module_creneau(self, module: dict, date: datetime.date, heure: time) -> bool:
+        """Place le module sur un créneau précis si salles et surveillants sont disponibles"""
+        mesures = self.mesures
+        mesures.compteurs['creneaux_essayes'] += 1
+        
+        debut = time_module.perf_counter()
+        salles = self.trouver_salles_disponibles(date, heure, module['duree_minutes'], module['nb_etudiants'])
+        mesures.ajouter_duree('recherche_salles', debut)
+        if not salles:
+            mesures.compteurs['rejets_salles'] += 1
+            return False
+        
+        debut = time_module.perf_counter()
+        surveillants = self.trouver_surveillants(
+            date, 
+            len(salles), 
+            module['departement_id'],
+            module['prof_responsable_id']
+        )
+        mesures.ajouter_duree('recherche_surveillants', debut)
+        if not surveillants:
+            mesures.compteurs['rejets_surveillants'] += 1
+            return False
+        
+        self.planifier_examen(module, date, heure, salles, surveillants)
+        return True
+    
+    def generer_planning(self, date_debut: str = "2025-01-20", date_fin: str = "2025-02-15") -> dict:
+        """Génère l'emploi du temps complet des examens"""
+        start_time = time_module.time()
+        
+        print("\n" + "="*60)
+        print("   GÉNÉRATION DE L'EMPLOI DU TEMPS DES EXAMENS")
+        print("="*60)
+        
+        if not self.donnees_chargees:
+            self.charger_donnees()
+        
+        dates_disponibles = self.calculer_dates_disponibles(date_debut, date_fin)
+        
         print(f"\n✓ Période: {date_debut} à {date_fin}")
         print(f"✓ {len(dates_disponibles)} jours disponibles")
         print(f"✓ {len(self.CRENEAUX_HORAIRES)} créneaux par jour\n")
         
-        modules_tries = sorted(
-            self.modules_a_planifier, 
-            key=lambda m: m['nb_etudiants'], 
-            reverse=True
-        )
-        
-        nb_modules_planifies = 0
-        modules_non_planifies = []
+        if self.mode_rattrapage:
+            modules_non_planifies, _ = self.planifier_fenetre_compacte(dates_disponibles)
+            return self.construire_resultat(modules_non_planifies, start_time)
         
+        self.reinitialiser_planning(dates_disponibles)
         print("⏳ Planification en cours...\n")
         
-        for module in modules_tries:
-            planifie = False
-            nb_etudiants = module['nb_etudiants']
-            nb_salles_necessaires = self.calculer_nb_salles_necessaires(nb_etudiants)
+        modules_non_planifies = self.executer_glouton(dates_disponibles)
+        
+        return self.construire_resultat(modules_non_planifies, start_time)
+    
+    def planifier_fenetre_compacte(self, dates: List[datetime.date]) -> Tuple[List[dict], int]:
+        """
+        Planifie dans les premiers jours de la période seulement (rattrapage)
+        
+        La fenêtre part du nombre minimal de jours que donnent les minorants
+        de analyser_faisabilite ; tant que des modules restent non planifiés,
+        elle est élargie d'un quart et seuls ces modules sont placés, autour
+        des examens déjà planifiés.
+        
+        Returns:
+            Modules non planifiés et nombre de jours de la fenêtre finale
+        """
+        if not dates:
+            self.reinitialiser_planning(dates)
+            return list(self.modules_a_planifier), 0
+        
+        bornes = self.analyser_faisabilite(dates[0].isoformat(), dates[-1].isoformat())['bornes']
+        nb_jours = bornes['jours'][0]
+        for nom in ('places', 'salles_creneaux', 'surveillances'):
+            demande, offre = bornes[nom]
+            if offre:
+                nb_jours = max(nb_jours, math.ceil(demande * len(dates) / offre))
+        nb_jours = min(len(dates), max(1, nb_jours))
+        
+        print(f"⏳ Planification sur une fenêtre de {nb_jours} jours...\n")
+        self.reinitialiser_planning(dates[:nb_jours])
+        modules_non_planifies = self.executer_glouton(dates[:nb_jours])
+        
+        while modules_non_planifies and nb_jours < len(dates) and not self.arret_demande():
+            nb_jours = min(len(dates), nb_jours + max(1, nb_jours // 4))
+            print(f"   ⏳ {len(modules_non_planifies)} modules restants, fenêtre élargie à {nb_jours} jours")
+            self.restaurer_placements(self.exporter_placements(), dates[:nb_jours])
+            modules_non_planifies = self.executer_glouton(dates[:nb_jours], modules=modules_non_planifies)
+        
+        return modules_non_planifies, nb_jours
+    
+    def fenetre_planification(self, dates: List[datetime.date]) -> List[datetime.date]:
+        """
+        Jours où un moteur planifie la période : toute la période, ou en
+        rattrapage la fenêtre compacte où le glouton place tous les modules
+        (planifier_fenetre_compacte). Les moteurs qui ne passent pas par
+        generer_planning appellent cette méthode avant de planifier.
+        """
+        if not self.mode_rattrapage or not dates:
+            return dates
+        _, nb_jours = self.planifier_fenetre_compacte(dates)
+        return dates[:nb_jours]
+    
+    def executer_glouton(self, dates: List[datetime.date], rng: Optional[random.Random] = None,
+                         echeance: Optional[float] = None,
+                         modules: Optional[List[dict]] = None) -> List[dict]:
+        """
+        Place les modules un par un dans l'ordre de planification choisi
+        
+        Avec etaler_examens, chaque module essaie d'abord les jours qui
+        pénalisent le moins l'étalement de ses cohortes (SpreadTracker).
+        
+        Args:
+            dates: Jours de la période (planning déjà réinitialisé)
+            rng: Générateur aléatoire pour varier départage, créneaux et salles
+            echeance: Instant (time.time()) au-delà duquel les modules restants
+                      sont déclarés non planifiés
+            modules: Modules à placer autour des examens déjà planifiés
+                     (tous les modules par défaut)
+        
+        Returns:
+            Liste des modules non planifiés
+        """
+        if modules is None:
+            modules = self.modules_a_planifier
+        with self.mesures.phase('tri'):
+            ordre = creer_ordre(self.ordre_modules, modules, self.graphe_conflits, rng)
+            for examen in self.examens_par_module.values():
+                ordre.marquer_planifie({'id': examen.module_id}, self.date_examen(examen))
+        debut = time_module.perf_counter()
+        nb_total = len(self.modules_a_planifier)
+        modules_non_planifies = []
+        
+        for module in ordre:
+            if (echeance is not None and time_module.time() > echeance) or self.arret_demande():
+                modules_non_planifies.append(module)
+                continue
             
-            for date in dates_disponibles:
-                if planifie:
-                    break
-                
-                if not self.verifier_disponibilite_etudiants(module['etudiants'], date):
-                    continue
-                
-                for heure in self.CRENEAUX_HORAIRES:
-                    salles = self.trouver_salles_disponibles(date, heure, nb_salles_necessaires)
-                    if not salles:
-                        continue
-                    
-                    surveillants = self.trouver_surveillants(
-                        date, 
-                        nb_salles_necessaires, 
-                        module['departement_id'],
-                        module['prof_responsable_id']
-                    )
-                    if not surveillants:
-                        continue
-                    
-                    self.planifier_examen(module, date, heure, salles, surveillants)
-                    planifie = True
-                    nb_modules_planifies += 1
-                    
-                    if nb_modules_planifies % 50 == 0:
-                        print(f"   ⏳ {nb_modules_planifies}/{len(modules_tries)} modules planifiés...")
-                    
-                    break
+            dates_module = dates
+            if self.etaler_examens:
+                debut_etalement = time_module.perf_counter()
+                dates_module = self.ordonner_dates_etalement(module, dates)
+                self.mesures.ajouter_duree('etalement', debut_etalement)
             
-            if not planifie:
+            date = self.placer_module(module, dates_module, rng)
+            if date is None:
                 modules_non_planifies.append(module)
+                continue
+            
+            ordre.marquer_planifie(module, date)
+            
+            nb_modules_planifies = len(self.examens_par_module)
+            if nb_modules_planifies % 50 == 0:
+                print(f"   ⏳ {nb_modules_planifies}/{nb_total} modules planifiés...")
+                self.signaler_progression(nb_modules_planifies / nb_total,
+                                          f"{nb_modules_planifies}/{nb_total} modules planifiés")
+        
+        self.mesures.ajouter_duree('placement', debut)
+        return modules_non_planifies
+    
+    def calculer_ecart_type_surveillances(self) -> float:
+        """Écart-type du nombre total de surveillances par professeur (équilibrage)"""
+        if not self.professeurs_disponibles:
+            return 0.0
+        
+        totaux = defaultdict(int)
+        for profs in self.profs_par_jour.values():
+            for prof_id, nb in profs.items():
+                totaux[prof_id] += nb
+        
+        valeurs = [totaux[prof['id']] for prof in self.professeurs_disponibles]
+        moyenne = sum(valeurs) / len(valeurs)
+        return math.sqrt(sum((v - moyenne) ** 2 for v in valeurs) / len(valeurs))
+    
+    def exporter_instance(self) -> dict:
+        """
+        Exporte les données chargées sous une forme transmissible à un autre processus
+        
+        Les cohortes et le graphe de conflits sont transmis déjà calculés.
+        """
+        return {
+            'modules': self.modules_a_planifier,
+            'salles': self.salles_disponibles,
+            'professeurs': self.professeurs_disponibles,
+            'taille_cohortes': self.taille_cohortes,
+            'graphe_conflits': self.graphe_conflits
+        }
+    
+    def importer_instance(self, instance: dict):
+        """Charge une instance produite par exporter_instance (sans recalcul)"""
+        self.modules_a_planifier = [dict(module) for module in instance['modules']]
+        self.salles_disponibles = [dict(salle) for salle in instance['salles']]
+        self.professeurs_disponibles = instance['professeurs']
+        self.taille_cohortes = instance['taille_cohortes']
+        self.graphe_conflits = instance['graphe_conflits']
+        self.modules_par_id = {module['id']: module for module in self.modules_a_planifier}
+        self.donnees_chargees = True
+    
+    def exporter_placements(self) -> List[tuple]:
+        """Planning courant sous forme compacte (module, date, heure, salles, surveillants)"""
+        return [
+            (
+                examen.module_id,
+                self.date_examen(examen),
+                self.heure_examen(examen),
+                examen.salles,
+                examen.surveillants
+            )
+            for examen in self.examens_planifies
+        ]
+    
+    def restaurer_placements(self, placements: List[tuple], dates: List[datetime.date]) -> List[dict]:
+        """
+        Reconstruit le planning à partir de placements compacts
+        
+        Returns:
+            Liste des modules absents des placements (non planifiés)
+        """
+        self.reinitialiser_planning(dates)
+        
+        for module_id, date, heure, salle_ids, surveillants in placements:
+            self.planifier_examen(
+                self.modules_par_id[module_id], date, heure,
+                [self.salles_par_id[salle_id] for salle_id in salle_ids],
+                list(surveillants)
+            )
+        
+        planifies = {placement[0] for placement in placements}
+        return [module for module in self.modules_a_planifier if module['id'] not in planifies]
+    
+    def charger_planning_existant(self) -> Dict[int, dict]:
+        """
+        Charge les examens déjà enregistrés pour l'année et la session
+        
+        Returns:
+            Examens indexés par module : id, date, heure, salles (salle
+            principale en premier) et surveillants (principal en premier)
+        """
+        cur = self.conn.cursor()
+        cur.execute("""
+            SELECT e.id, e.module_id, e.lieu_id, e.date_examen, e.heure_debut,
+                   COALESCE((SELECT array_agg(s.professeur_id
+                                              ORDER BY s.type_surveillance <> 'Principal', s.id)
+                             FROM surveillances s WHERE s.examen_id = e.id), '{}'),
+                   COALESCE((SELECT array_agg(es.lieu_id ORDER BY es.lieu_id <> e.lieu_id, es.id)
+                             FROM examen_salles es WHERE es.examen_id = e.id), '{}')
+            FROM examens e
+            WHERE e.annee_academique = %s AND e.session = %s AND e.statut = %s
+        """, (self.annee_academique, self.session, STATUT_PLANIFIE))
+        
+        return {
+            row[1]: {
+                'id': row[0],
+                'module_id': row[1],
+                'date': row[3],
+                'heure': row[4],
+                'surveillants': list(row[5]),
+                'salles': list(row[6]) or [row[2]]
+            }
+            for row in cur.fetchall()
+        }
+    
+    def fixer_examens_existants(self, existants: Dict[int, dict],
+                                modules_invalides: Iterable[int] = ()) -> List[dict]:
+        """
+        Reprend les examens existants encore valides comme planning figé
         
+        Un examen est invalidé si son module est explicitement désigné, si sa
+        date sort de la période, si l'une de ses salles n'est plus disponible,
+        si ses salles ne suffisent plus à ses étudiants ou ne correspondent plus
+        à ses surveillants,
+        si l'un de ses surveillants n'existe plus ou dépasse son quota du jour,
+        ou si l'un de ses étudiants a déjà un examen figé ce jour-là.
+        
+        Un examen enregistré avant la table examen_salles n'a que sa salle
+        principale : ses autres salles sont réattribuées parmi les salles libres
+        du créneau, après réservation des salles de tous les examens.
+        
+        Returns:
+            Modules à replacer (examens invalidés et modules sans examen)
+        """
+        modules_invalides = set(modules_invalides)
+        dates = set(self.dates_disponibles)
+        salles = {salle['id']: salle for salle in self.salles_disponibles}
+        profs = {prof['id'] for prof in self.professeurs_disponibles}
+        
+        candidats = []
+        for module in self.modules_a_planifier:
+            existant = existants.get(module['id'])
+            if (existant is None or module['id'] in modules_invalides
+                    or existant['date'] not in dates
+                    or any(salle_id not in salles for salle_id in existant['salles'])
+                    or existant['heure'] not in self.CRENEAUX_HORAIRES):
+                continue
+            salles_examen = [salles[salle_id] for salle_id in existant['salles']]
+            if not self.salles_libres.sont_libres(existant['date'], existant['heure'],
+                                                 module['duree_minutes'], salles_examen):
+                continue
+            candidats.append((module, existant, salles_examen))
+            self.salles_libres.occuper(existant['date'], existant['heure'], module['duree_minutes'], salles_examen)
+        
+        candidats.sort(key=lambda candidat: (candidat[1]['date'], candidat[1]['heure']))
+        fixes = set()
+        for module, existant, salles_examen in candidats:
+            date, heure = existant['date'], existant['heure']
+            
+            surveillants = existant['surveillants']
+            manquants = module['nb_etudiants'] - sum(salle['capacite'] for salle in salles_examen)
+            if manquants > 0 and len(salles_examen) == 1:
+                salles_examen = salles_examen + self.trouver_salles_disponibles(
+                    date, heure, module['duree_minutes'], manquants
+                )
+                manquants = module['nb_etudiants'] - sum(salle['capacite'] for salle in salles_examen)
+            
+            if (module['nb_etudiants'] == 0 or manquants > 0
+                    or len(salles_examen) != len(surveillants)
+                    or any(prof_id not in profs for prof_id in surveillants)
+                    or any(self.profs_par_jour[date][prof_id] >= self.MAX_SURVEILLANCES_PAR_JOUR_PROF
+                           for prof_id in surveillants)
+                    or not self.verifier_disponibilite_etudiants(module, date)):
+                self.salles_libres.liberer(date, heure, module['duree_minutes'],
+                                          [salles[salle_id] for salle_id in existant['salles']])
+                continue
+            
+            self.planifier_examen(module, date, heure, salles_examen, surveillants)
+            fixes.add(module['id'])
+        
+        return [module for module in self.modules_a_planifier if module['id'] not in fixes]
+    
+    def reparer_planning(self, date_debut: str = "2025-01-20", date_fin: str = "2025-02-15",
+                         modules_invalides: Iterable[int] = ()) -> dict:
+        """
+        Répare le planning enregistré sans le régénérer entièrement
+        
+        Les examens existants encore valides sont figés ; seuls les modules
+        invalidés (salle retirée, inscriptions modifiées, modules désignés) ou
+        sans examen sont replacés par le glouton autour d'eux. Le résultat
+        indique les examens invalidés et les modules replacés ;
+        sauvegarder_reparation enregistre le planning réparé.
+        
+        Args:
+            date_debut: Début de la période d'examens
+            date_fin: Fin de la période d'examens
+            modules_invalides: Identifiants de modules à replacer quoi qu'il arrive
+        """
+        start_time = time_module.time()
+        
+        print("\n" + "="*60)
+        print("   RÉPARATION DE L'EMPLOI DU TEMPS DES EXAMENS")
+        print("="*60)
+        
+        if not self.donnees_chargees:
+            self.charger_donnees()
+        
+        dates_disponibles = self.calculer_dates_disponibles(date_debut, date_fin)
+        self.reinitialiser_planning(dates_disponibles)
+        
+        existants = self.charger_planning_existant()
+        a_replacer = self.fixer_examens_existants(existants, modules_invalides)
+        print(f"\n✓ {len(self.examens_par_module)} examens conservés, {len(a_replacer)} modules à replacer")
+        
+        modules_non_planifies = self.executer_glouton(dates_disponibles, modules=a_replacer)
+        
+        ids_a_replacer = {module['id'] for module in a_replacer}
+        resultat = self.construire_resultat(modules_non_planifies, start_time)
+        resultat['examens_supprimes'] = [
+            existant['id'] for module_id, existant in existants.items()
+            if module_id not in self.examens_par_module or module_id in ids_a_replacer
+        ]
+        resultat['modules_replaces'] = [
+            module_id for module_id in self.examens_par_module if module_id in ids_a_replacer
+        ]
+        self.derniere_reparation = resultat
+        return resultat
+    
+    def appliquer_politique_budget(self, resultat: dict, politique: str = 'conserver') -> bool:
+        """
+        Prépare la sauvegarde d'un planning arrêté par son budget de temps
+        
+        Les modules que la génération n'a pas atteints n'ont pas d'examen : une
+        sauvegarde supprimerait leurs examens enregistrés. Avec 'completer', ces
+        examens sont repris autour du planning obtenu (fixer_examens_existants),
+        sauf ceux qu'il rend invalides ; avec 'conserver', la sauvegarde est
+        refusée si le planning obtenu compte moins d'examens que le planning
+        enregistré. Le résultat est mis à jour et complété par 'budget_epuise'.
+        
+        Args:
+            resultat: Résultat de generer_planning
+            politique: Clé de POLITIQUES_BUDGET
+        
+        Returns:
+            True si le planning peut être sauvegardé
+        """
+        if politique not in POLITIQUES_BUDGET:
+            raise ValueError(f"Politique de budget inconnue: {politique} "
+                             f"(disponibles: {', '.join(POLITIQUES_BUDGET)})")
+        
+        existants = self.charger_planning_existant()
+        nb_obtenus = len(self.examens_par_module)
+        if politique == 'completer':
+            self.fixer_examens_existants(existants, modules_invalides=set(self.examens_par_module))
+            resultat.update({
+                'nb_planifies': len(self.examens_par_module),
+                'modules_non_planifies': [module for module in self.modules_a_planifier
+                                          if module['id'] not in self.examens_par_module],
+                'examens': self.examens_planifies,
+                'penalite_etalement': self.etalement.penalite,
+            })
+        sauvegarder = politique == 'completer' or nb_obtenus >= len(existants)
+        resultat['budget_epuise'] = {
+            'politique': politique,
+            'examens_enregistres': len(existants),
+            'examens_repris': len(self.examens_par_module) - nb_obtenus,
+            'sauvegarde': sauvegarder,
+        }
+        
+        if sauvegarder:
+            print(f"\n⏱️ Budget écoulé : {nb_obtenus} examens obtenus, "
+                  f"{len(self.examens_par_module) - nb_obtenus} examens enregistrés repris")
+        else:
+            print(f"\n⏱️ Budget écoulé : {nb_obtenus} examens obtenus pour {len(existants)} enregistrés, "
+                  f"le planning enregistré est conservé")
+        return sauvegarder
+    
+    def construire_resultat(self, modules_non_planifies: List[dict], start_time: float) -> dict:
+        """Affiche les statistiques du planning courant et construit le dictionnaire résultat"""
         elapsed_time = time_module.time() - start_time
+        nb_modules_planifies = len(self.examens_par_module)
+        nb_total = len(self.modules_a_planifier)
         
         print(f"\n✓ Planification terminée en {elapsed_time:.2f} secondes")
         print(f"\nSTATISTIQUES:")
-        print(f"   - Modules planifiés: {nb_modules_planifies}/{len(modules_tries)}")
-        print(f"   - Taux de réussite: {(nb_modules_planifies/len(modules_tries)*100):.1f}%")
+        print(f"   - Modules planifiés: {nb_modules_planifies}/{nb_total}")
+        print(f"   - Taux de réussite: {(nb_modules_planifies/nb_total*100):.1f}%")
         
         total_surveillances = sum(sum(profs.values()) for profs in self.profs_par_jour.values())
         nb_profs_utilises = len(set(prof_id for profs in self.profs_par_jour.values() for prof_id in profs.keys()))
@@ -317,28 +1130,427 @@ class ExamScheduleOptimizer:
         print(f"   - Total surveillances: {total_surveillances}")
         print(f"   - Professeurs utilisés: {nb_profs_utilises}/{len(self.professeurs_disponibles)}")
         
-        objectif_atteint = "✓ OUI" if elapsed_time < 45 else "✗ NON"
+        nb_salles_allouees = sum(len(examen.salles) for examen in self.examens_par_module.values())
+        places_perdues = sum(
+            sum(salle['capacite'] for salle in self.salles_examen(examen)) - examen.nb_etudiants
+            for examen in self.examens_par_module.values()
+        )
+        
+        print(f"\nSALLES:")
+        print(f"   - Salles allouées: {nb_salles_allouees}")
+        print(f"   - Places inoccupées: {places_perdues}")
+        
+        print(f"\nÉTALEMENT:")
+        print(f"   - Pénalité des cohortes: {self.etalement.penalite:,}")
+        
+        objectif_atteint = "✓ OUI" if elapsed_time < self.TEMPS_MAX_GENERATION_SECONDES else "✗ NON"
         print(f"\nPERFORMANCE:")
-        print(f"   - Temps: {elapsed_time:.2f}s / 45s")
+        print(f"   - Temps: {elapsed_time:.2f}s / {self.TEMPS_MAX_GENERATION_SECONDES}s")
         print(f"   - Objectif atteint: {objectif_atteint}")
         
-        return {
+        self.mesures.compteurs['operations_tas_salles'] = self.salles_libres.nb_operations_tas()
+        self.mesures.compteurs['operations_tas_surveillants'] = self.files_surveillants.nb_operations_tas()
+        mesures = self.mesures.exporter()
+        for phase, duree in sorted(mesures['phases'].items(), key=lambda item: -item[1]):
+            print(f"   - {phase}: {duree:.3f}s")
+        
+        resultat = {
             'success': True,
             'nb_planifies': nb_modules_planifies,
-            'nb_total': len(modules_tries),
+            'nb_total': nb_total,
             'modules_non_planifies': modules_non_planifies,
             'temps_execution': elapsed_time,
-            'examens': self.examens_planifies
+            'examens': self.examens_planifies,
+            'penalite_etalement': self.etalement.penalite,
+            'mesures': mesures
         }
+        if self.mode_rattrapage:
+            resultat['mode'] = 'rattrapage'
+            resultat['nb_jours_fenetre'] = len(self.dates_disponibles)
+        return resultat
     
-    def sauvegarder_planning(self):
-        """Sauvegarde le planning généré dans la base de données"""
+    def repartir_etudiants(self, examen: dict) -> List[Tuple[dict, int]]:
+        """Répartit les étudiants de l'examen entre ses salles, dans l'ordre d'allocation"""
+        restants = examen['nb_etudiants']
+        repartition = []
+        for salle in examen['salles']:
+            nb = min(restants, salle['capacite'], self.CAPACITE_MAX_SALLE)
+            repartition.append((salle, nb))
+            restants -= nb
+        return repartition
+    
+    def inserer_examen(self, cur, examen: dict) -> int:
+        """Insère un examen planifié, ses salles et ses surveillances, retourne l'id de l'examen"""
+        cur.execute("""
+            INSERT INTO examens (
+                module_id, lieu_id, date_examen, heure_debut, 
+                duree_minutes, annee_academique, session, 
+                nb_etudiants_inscrits, statut
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+        """, (
+            examen['module_id'],
+            examen['salles'][0]['id'],
+            examen['date'],
+            examen['heure'],
+            examen['duree_minutes'],
+            self.annee_academique,
+            self.session,
+            examen['nb_etudiants'],
+            STATUT_PLANIFIE
+        ))
+        
+        examen_id = cur.fetchone()[0]
+        
+        execute_values(cur, """
+            INSERT INTO examen_salles (examen_id, lieu_id, date_examen, heure_debut, nb_etudiants)
+            VALUES %s
+        """, [
+            (examen_id, salle['id'], examen['date'], examen['heure'], nb)
+            for salle, nb in self.repartir_etudiants(examen)
+        ])
+        
+        for i, prof_id in enumerate(examen['surveillants']):
+            type_surveillance = 'Principal' if i == 0 else 'Secondaire'
+            cur.execute("""
+                INSERT INTO surveillances (examen_id, professeur_id, type_surveillance)
+                VALUES (%s, %s, %s)
+            """, (examen_id, prof_id, type_surveillance))
+        
+        return examen_id
+    
+    def inserer_examens_en_masse(self, cur, examens: List[dict]) -> Dict[str, float]:
+        """
+        Insère des examens, leurs salles et leurs surveillances par COPY
+        
+        Le trigger de capacité des salles, ligne à ligne, est désactivé le temps
+        de l'insertion si le rôle en a le droit : la capacité est alors vérifiée
+        en une seule requête après l'insertion. Salles
+        et surveillances sont copiées dans des tables temporaires puis
+        rattachées à leur examen par module, unique pour une année et une session.
+        
+        Returns:
+            Durée de chaque étape en secondes
+        """
+        timings = {}
+        
+        debut = time_module.perf_counter()
+        cur.execute("SAVEPOINT trigger_capacite")
+        try:
+            cur.execute("ALTER TABLE examen_salles DISABLE TRIGGER trig_check_capacite_examen")
+            trigger_desactive = True
+        except psycopg2.errors.InsufficientPrivilege:
+            cur.execute("ROLLBACK TO SAVEPOINT trigger_capacite")
+            trigger_desactive = False
+        
+        lignes_examens = io.StringIO()
+        lignes_salles = io.StringIO()
+        lignes_surveillances = io.StringIO()
+        for examen in examens:
+            lignes_examens.write(
+                f"{examen['module_id']}\t{examen['salles'][0]['id']}\t{examen['date']}\t"
+                f"{examen['heure']}\t{examen['duree_minutes']}\t{self.annee_academique}\t"
+                f"{self.session}\t{examen['nb_etudiants']}\t{STATUT_PLANIFIE}\n"
+            )
+            for salle, nb in self.repartir_etudiants(examen):
+                lignes_salles.write(f"{examen['module_id']}\t{salle['id']}\t{nb}\n")
+            for i, prof_id in enumerate(examen['surveillants']):
+                type_surveillance = 'Principal' if i == 0 else 'Secondaire'
+                lignes_surveillances.write(f"{examen['module_id']}\t{prof_id}\t{type_surveillance}\n")
+        lignes_examens.seek(0)
+        lignes_salles.seek(0)
+        lignes_surveillances.seek(0)
+        
+        cur.copy_expert("""
+            COPY examens (
+                module_id, lieu_id, date_examen, heure_debut,
+                duree_minutes, annee_academique, session,
+                nb_etudiants_inscrits, statut
+            ) FROM STDIN
+        """, lignes_examens)
+        timings['examens'] = time_module.perf_counter() - debut
+        
+        debut = time_module.perf_counter()
+        cur.execute("""
+            CREATE TEMP TABLE salles_a_inserer (
+                module_id INT, lieu_id INT, nb_etudiants INT
+            ) ON COMMIT DROP
+        """)
+        cur.copy_expert("COPY salles_a_inserer FROM STDIN", lignes_salles)
+        cur.execute("""
+            INSERT INTO examen_salles (examen_id, lieu_id, date_examen, heure_debut, nb_etudiants)
+            SELECT e.id, t.lieu_id, e.date_examen, e.heure_debut, t.nb_etudiants
+            FROM salles_a_inserer t
+            JOIN examens e ON e.module_id = t.module_id
+            WHERE e.annee_academique = %s AND e.session = %s
+        """, (self.annee_academique, self.session))
+        timings['salles'] = time_module.perf_counter() - debut
+        
+        debut = time_module.perf_counter()
+        cur.execute("""
+            CREATE TEMP TABLE surveillances_a_inserer (
+                module_id INT, professeur_id INT, type_surveillance VARCHAR(20)
+            ) ON COMMIT DROP
+        """)
+        cur.copy_expert("COPY surveillances_a_inserer FROM STDIN", lignes_surveillances)
+        cur.execute("""
+            INSERT INTO surveillances (examen_id, professeur_id, type_surveillance)
+            SELECT e.id, t.professeur_id, t.type_surveillance
+            FROM surveillances_a_inserer t
+            JOIN examens e ON e.module_id = t.module_id
+            WHERE e.annee_academique = %s AND e.session = %s
+        """, (self.annee_academique, self.session))
+        timings['surveillances'] = time_module.perf_counter() - debut
+        
+        debut = time_module.perf_counter()
+        if trigger_desactive:
+            cur.execute("ALTER TABLE examen_salles ENABLE TRIGGER trig_check_capacite_examen")
+            cur.execute("""
+                SELECT e.module_id, es.nb_etudiants, l.capacite_examen
+                FROM examen_salles es
+                JOIN examens e ON es.examen_id = e.id
+                JOIN lieux_examen l ON es.lieu_id = l.id
+                WHERE e.annee_academique = %s AND e.session = %s
+                AND es.nb_etudiants > l.capacite_examen
+                LIMIT 1
+            """, (self.annee_academique, self.session))
+            depassement = cur.fetchone()
+            if depassement:
+                raise ValueError(
+                    f"Capacite insuffisante pour le module {depassement[0]}: "
+                    f"{depassement[1]} etudiants pour une capacite de {depassement[2]}"
+                )
+        timings['verification'] = time_module.perf_counter() - debut
+        
+        return timings
+    
+    def appliquer_differences(self, cur, examens: List[dict]) -> Tuple[Dict[str, float], Dict[str, int]]:
+        """
+        Aligne les examens enregistrés de l'année et de la session sur le planning
+        
+        Le planning est copié dans des tables temporaires, puis comparé en SQL au
+        planning enregistré : les examens absents du planning sont supprimés, les
+        autres insérés ou mis à jour par upsert (ON CONFLICT), et seules les lignes
+        qui diffèrent sont écrites. Salles et surveillances suivent le même
+        principe ; une surveillance dont l'examen change de date ou d'heure perd
+        sa confirmation.
+        
+        Returns:
+            Durée de chaque étape en secondes et nombre de lignes par opération
+        """
+        timings = {}
+        changements = {}
+        annee_session = (self.annee_academique, self.session)
+        
+        debut = time_module.perf_counter()
+        lignes_examens = io.StringIO()
+        lignes_salles = io.StringIO()
+        lignes_surveillances = io.StringIO()
+        for examen in examens:
+            lignes_examens.write(
+                f"{examen['module_id']}\t{examen['salles'][0]['id']}\t{examen['date']}\t"
+                f"{examen['heure']}\t{examen['duree_minutes']}\t{examen['nb_etudiants']}\n"
+            )
+            for salle, nb in self.repartir_etudiants(examen):
+                lignes_salles.write(f"{examen['module_id']}\t{salle['id']}\t{nb}\n")
+            for i, prof_id in enumerate(examen['surveillants']):
+                type_surveillance = 'Principal' if i == 0 else 'Secondaire'
+                lignes_surveillances.write(f"{examen['module_id']}\t{prof_id}\t{type_surveillance}\n")
+        lignes_examens.seek(0)
+        lignes_salles.seek(0)
+        lignes_surveillances.seek(0)
+        
+        cur.execute("""
+            CREATE TEMP TABLE examens_cible (
+                module_id INT PRIMARY KEY, lieu_id INT, date_examen DATE, heure_debut TIME,
+                duree_minutes INT, nb_etudiants INT
+            ) ON COMMIT DROP
+        """)
+        cur.copy_expert("COPY examens_cible FROM STDIN", lignes_examens)
+        cur.execute("""
+            CREATE TEMP TABLE salles_cible (
+                module_id INT, lieu_id INT, nb_etudiants INT
+            ) ON COMMIT DROP
+        """)
+        cur.copy_expert("COPY salles_cible FROM STDIN", lignes_salles)
+        cur.execute("""
+            CREATE TEMP TABLE surveillances_cible (
+                module_id INT, professeur_id INT, type_surveillance VARCHAR(20)
+            ) ON COMMIT DROP
+        """)
+        cur.copy_expert("COPY surveillances_cible FROM STDIN", lignes_surveillances)
+        cur.execute("ANALYZE examens_cible, salles_cible, surveillances_cible")
+        timings['copie'] = time_module.perf_counter() - debut
+        
+        debut = time_module.perf_counter()
+        cur.execute("""
+            DELETE FROM examens e
+            WHERE e.annee_academique = %s AND e.session = %s
+            AND NOT EXISTS (SELECT 1 FROM examens_cible c WHERE c.module_id = e.module_id)
+        """, annee_session)
+        changements['examens_supprimes'] = cur.rowcount
+        
+        cur.execute("""
+            UPDATE surveillances s
+            SET est_confirme = FALSE
+            FROM examens e
+            JOIN examens_cible c ON c.module_id = e.module_id
+            WHERE s.examen_id = e.id AND s.est_confirme
+            AND e.annee_academique = %s AND e.session = %s
+            AND (e.date_examen, e.heure_debut) IS DISTINCT FROM (c.date_examen, c.heure_debut)
+        """, annee_session)
+        
+        cur.execute("""
+            INSERT INTO examens (
+                module_id, lieu_id, date_examen, heure_debut,
+                duree_minutes, annee_academique, session,
+                nb_etudiants_inscrits, statut
+            )
+            SELECT c.module_id, c.lieu_id, c.date_examen, c.heure_debut,
+                   c.duree_minutes, %s, %s, c.nb_etudiants, %s
+            FROM examens_cible c
+            ON CONFLICT (module_id, annee_academique, session) DO UPDATE SET
+                lieu_id = EXCLUDED.lieu_id,
+                date_examen = EXCLUDED.date_examen,
+                heure_debut = EXCLUDED.heure_debut,
+                duree_minutes = EXCLUDED.duree_minutes,
+                nb_etudiants_inscrits = EXCLUDED.nb_etudiants_inscrits,
+                statut = EXCLUDED.statut
+            WHERE (examens.lieu_id, examens.date_examen, examens.heure_debut, examens.duree_minutes,
+                   examens.nb_etudiants_inscrits, examens.statut)
+                  IS DISTINCT FROM
+                  (EXCLUDED.lieu_id, EXCLUDED.date_examen, EXCLUDED.heure_debut, EXCLUDED.duree_minutes,
+                   EXCLUDED.nb_etudiants_inscrits, EXCLUDED.statut)
+            RETURNING xmax = 0
+        """, (*annee_session, STATUT_PLANIFIE))
+        inseres = [insere for (insere,) in cur.fetchall()]
+        changements['examens_inseres'] = sum(inseres)
+        changements['examens_modifies'] = len(inseres) - sum(inseres)
+        changements['examens_inchanges'] = len(examens) - len(inseres)
+        timings['examens'] = time_module.perf_counter() - debut
+        
+        debut = time_module.perf_counter()
+        cur.execute("""
+            DELETE FROM examen_salles es
+            USING examens e
+            WHERE es.examen_id = e.id AND e.annee_academique = %s AND e.session = %s
+            AND NOT EXISTS (
+                SELECT 1 FROM salles_cible t WHERE t.module_id = e.module_id AND t.lieu_id = es.lieu_id
+            )
+        """, annee_session)
+        changements['salles_supprimees'] = cur.rowcount
+        cur.execute("""
+            INSERT INTO examen_salles (examen_id, lieu_id, date_examen, heure_debut, nb_etudiants)
+            SELECT e.id, t.lieu_id, e.date_examen, e.heure_debut, t.nb_etudiants
+            FROM salles_cible t
+            JOIN examens e ON e.module_id = t.module_id
+            WHERE e.annee_academique = %s AND e.session = %s
+            ON CONFLICT (examen_id, lieu_id) DO UPDATE SET
+                date_examen = EXCLUDED.date_examen,
+                heure_debut = EXCLUDED.heure_debut,
+                nb_etudiants = EXCLUDED.nb_etudiants
+            WHERE (examen_salles.date_examen, examen_salles.heure_debut, examen_salles.nb_etudiants)
+                  IS DISTINCT FROM (EXCLUDED.date_examen, EXCLUDED.heure_debut, EXCLUDED.nb_etudiants)
+        """, annee_session)
+        changements['salles_ecrites'] = cur.rowcount
+        timings['salles'] = time_module.perf_counter() - debut
+        
+        debut = time_module.perf_counter()
+        cur.execute("""
+            DELETE FROM surveillances s
+            USING examens e
+            WHERE s.examen_id = e.id AND e.annee_academique = %s AND e.session = %s
+            AND NOT EXISTS (
+                SELECT 1 FROM surveillances_cible t
+                WHERE t.module_id = e.module_id AND t.professeur_id = s.professeur_id
+            )
+        """, annee_session)
+        changements['surveillances_supprimees'] = cur.rowcount
+        cur.execute("""
+            INSERT INTO surveillances (examen_id, professeur_id, type_surveillance)
+            SELECT e.id, t.professeur_id, t.type_surveillance
+            FROM surveillances_cible t
+            JOIN examens e ON e.module_id = t.module_id
+            WHERE e.annee_academique = %s AND e.session = %s
+            ON CONFLICT (examen_id, professeur_id) DO UPDATE SET
+                type_surveillance = EXCLUDED.type_surveillance
+            WHERE surveillances.type_surveillance IS DISTINCT FROM EXCLUDED.type_surveillance
+        """, annee_session)
+        changements['surveillances_ecrites'] = cur.rowcount
+        timings['surveillances'] = time_module.perf_counter() - debut
+        
+        return timings, changements
+    
+    def incrementer_version_planning(self, cur) -> Optional[int]:
+        """
+        Incrémente la version du planning de l'année et de la session, clé des
+        caches en aval ; None si la table versions_planning n'existe pas encore
+        """
+        cur.execute("SELECT to_regclass('versions_planning') IS NOT NULL")
+        if not cur.fetchone()[0]:
+            return None
+        cur.execute("""
+            INSERT INTO versions_planning (annee_academique, session, version)
+            VALUES (%s, %s, 1)
+            ON CONFLICT (annee_academique, session) DO UPDATE
+            SET version = versions_planning.version + 1, mis_a_jour = CURRENT_TIMESTAMP
+            RETURNING version
+        """, (self.annee_academique, self.session))
+        return cur.fetchone()[0]
+    
+    def sauvegarder_planning(self, en_masse: bool = True, differentiel: bool = True,
+                             valider: bool = True) -> Dict[str, float]:
+        """
+        Sauvegarde le planning généré dans la base de données
+        
+        Args:
+            en_masse: Sans différentiel, insertion par COPY en quelques requêtes ;
+                      sinon un INSERT par examen et par surveillance
+            differentiel: N'écrire que les différences avec le planning enregistré
+                          (appliquer_differences) au lieu de tout supprimer et réinsérer
+            valider: Valider la transaction ; sinon elle reste ouverte, pour que
+                     l'appelant contrôle le planning écrit avant commit ou rollback
+        
+        Returns:
+            Durée de chaque étape en secondes ; les lignes modifiées et la
+            nouvelle version du planning sont dans derniere_sauvegarde
+        """
         print("\n⏳ Sauvegarde du planning dans la base de données...")
         
         cur = self.conn.cursor()
+        debut_total = time_module.perf_counter()
+        timings = {}
         
         try:
+            if differentiel:
+                etape_timings, changements = self.appliquer_differences(
+                    cur, [self.decrire_examen(examen) for examen in self.examens_planifies]
+                )
+                timings.update(etape_timings)
+                self.signaler_progression(0.9, "Validation de la transaction")
+                version = None
+                if any(nb for operation, nb in changements.items() if operation != 'examens_inchanges'):
+                    version = self.incrementer_version_planning(cur)
+                
+                if valider:
+                    debut = time_module.perf_counter()
+                    self.conn.commit()
+                    timings['commit'] = time_module.perf_counter() - debut
+                timings['total'] = time_module.perf_counter() - debut_total
+                self.mesures.phases['sauvegarde'] += timings['total']
+                self.derniere_sauvegarde = {'version': version, 'changements': changements, 'timings': timings}
+                
+                print(f"   ✅ Planning sauvegardé en {timings['total']:.2f}s : "
+                      f"{changements['examens_inseres']} examens insérés, "
+                      f"{changements['examens_modifies']} modifiés, "
+                      f"{changements['examens_inchanges']} inchangés, "
+                      f"{changements['examens_supprimes']} supprimés"
+                      + (f" (version {version})" if version is not None else ""))
+                return timings
+            
             # Supprimer les anciens examens
+            debut = time_module.perf_counter()
             cur.execute("""
                 DELETE FROM surveillances 
                 WHERE examen_id IN (
@@ -351,49 +1563,61 @@ class ExamScheduleOptimizer:
                 DELETE FROM examens 
                 WHERE annee_academique = %s AND session = %s
             """, (self.annee_academique, self.session))
+            timings['suppression'] = time_module.perf_counter() - debut
+            self.signaler_progression(0.1, "Anciens examens supprimés")
             
-            examens_crees = 0
-            
-            for examen in self.examens_planifies:
-                salle_principale = examen['salles'][0]
-                nb_etudiants = min(examen['nb_etudiants'], salle_principale['capacite'])
-                
-                cur.execute("""
-                    INSERT INTO examens (
-                        module_id, lieu_id, date_examen, heure_debut, 
-                        duree_minutes, annee_academique, session, 
-                        nb_etudiants_inscrits, statut
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 'Planifie')
-                    RETURNING id
-                """, (
-                    examen['module_id'],
-                    salle_principale['id'],
-                    examen['date'],
-                    examen['heure'],
-                    examen['duree_minutes'],
-                    self.annee_academique,
-                    self.session,
-                    nb_etudiants
+            if en_masse:
+                timings.update(self.inserer_examens_en_masse(
+                    cur, [self.decrire_examen(examen) for examen in self.examens_planifies]
                 ))
+            else:
+                debut = time_module.perf_counter()
+                examens_crees = 0
                 
-                examen_id = cur.fetchone()[0]
-                examens_crees += 1
-                
-                for i, prof_id in enumerate(examen['surveillants']):
-                    type_surveillance = 'Principal' if i == 0 else 'Secondaire'
-                    cur.execute("""
-                        INSERT INTO surveillances (examen_id, professeur_id, type_surveillance)
-                        VALUES (%s, %s, %s)
-                    """, (examen_id, prof_id, type_surveillance))
-                
-                if examens_crees % 100 == 0:
-                    print(f"   ⏳ {examens_crees}/{len(self.examens_planifies)} examens sauvegardés...")
+                for examen in self.examens_planifies:
+                    self.inserer_examen(cur, self.decrire_examen(examen))
+                    examens_crees += 1
+                    
+                    if examens_crees % 100 == 0:
+                        print(f"   ⏳ {examens_crees}/{len(self.examens_par_module)} examens sauvegardés...")
+                        self.signaler_progression(0.1 + 0.8 * examens_crees / len(self.examens_par_module),
+                                                  f"{examens_crees}/{len(self.examens_par_module)} examens sauvegardés")
+                timings['examens'] = time_module.perf_counter() - debut
+            
+            self.signaler_progression(0.9, "Validation de la transaction")
+            version = self.incrementer_version_planning(cur)
+            if valider:
+                debut = time_module.perf_counter()
+                self.conn.commit()
+                timings['commit'] = time_module.perf_counter() - debut
+            timings['total'] = time_module.perf_counter() - debut_total
+            self.mesures.phases['sauvegarde'] += timings['total']
+            self.derniere_sauvegarde = {'version': version, 'changements': None, 'timings': timings}
             
-            self.conn.commit()
-            print(f"   ✅ {len(self.examens_planifies)} examens sauvegardés!")
+            print(f"   ✅ {len(self.examens_par_module)} examens sauvegardés en {timings['total']:.2f}s "
+                  f"({', '.join(f'{etape} {duree:.2f}s' for etape, duree in timings.items() if etape != 'total')})")
+            return timings
             
         except Exception as e:
             self.conn.rollback()
             print(f"✗ Erreur lors de la sauvegarde: {e}")
-            raise
\ No newline at end of file
+            raise
+    
+    def sauvegarder_reparation(self) -> Dict[str, float]:
+        """
+        Enregistre la réparation calculée par reparer_planning
+        
+        Le planning réparé est écrit par appliquer_differences : les examens
+        invalidés sont supprimés, les modules replacés insérés, et les examens
+        conservés ne sont réécrits que si la réparation les a modifiés (salles
+        ajoutées, effectif recalculé) ; les autres ne sont pas touchés.
+        
+        Returns:
+            Durée de chaque étape en secondes (voir sauvegarder_planning)
+        """
+        if self.derniere_reparation is None:
+            raise ValueError("Aucune réparation à sauvegarder : appeler reparer_planning d'abord")
+        
+        print(f"\n⏳ Sauvegarde de la réparation ({len(self.derniere_reparation['examens_supprimes'])} "
+              f"examens invalidés, {len(self.derniere_reparation['modules_replaces'])} modules replacés)...")
+        return self.sauvegarder_planning(differentiel=True)
@@ -0,0 +1,154 @@
+"""
+Planification gloutonne multi-départs exécutée en parallèle
+Plusieurs variantes aléatoires du glouton tournent dans un pool de processus
+"""
+
+import io
+import multiprocessing
+import os
+import random
+import time as time_module
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import redirect_stdout
+from typing import List, Optional
+
+from optimizer import ExamScheduleOptimizer
+
+# Optimiseur propre à chaque processus du pool, construit une seule fois
+_optimiseur_worker: Optional[ExamScheduleOptimizer] = None
+
+
+def _initialiser_worker(instance: dict, options: dict, arret):
+    """
+    Charge l'instance transmise une fois pour toutes dans le processus du pool
+
+    arret est l'événement partagé par lequel le processus parent interrompt
+    les variantes en cours (annulation ou arrêt de la génération).
+    """
+    global _optimiseur_worker
+    _optimiseur_worker = ExamScheduleOptimizer(db_config={}, **options)
+    _optimiseur_worker.importer_instance(instance)
+    _optimiseur_worker.arret = arret
+
+
+def _executer_variante(graine: Optional[int], dates: List, echeance: float) -> dict:
+    """
+    Exécute une variante du glouton dans un processus du pool
+
+    Args:
+        graine: Graine du générateur aléatoire (None : glouton déterministe)
+        dates: Jours de la période
+        echeance: Instant limite commun à toutes les variantes
+
+    Returns:
+        Placements compacts et score de la variante
+    """
+    optimizer = _optimiseur_worker
+    rng = random.Random(graine) if graine is not None else None
+
+    with redirect_stdout(io.StringIO()):
+        optimizer.reinitialiser_planning(dates, rng)
+        optimizer.executer_glouton(dates, rng, echeance)
+
+    return {
+        'graine': graine,
+        'nb_planifies': len(optimizer.examens_par_module),
+        'ecart_type_surveillances': optimizer.calculer_ecart_type_surveillances(),
+        'placements': optimizer.exporter_placements()
+    }
+
+
+class MultiStartScheduleOptimizer(ExamScheduleOptimizer):
+    """
+    Optimiseur multi-départs avec la même interface que ExamScheduleOptimizer
+
+    La variante 0 est le glouton déterministe ; les suivantes tirent au hasard le
+    départage de l'ordre des modules, l'ordre des créneaux et l'ordre des salles.
+    La meilleure variante est celle qui place le plus de modules, puis celle dont
+    les surveillances sont les mieux réparties. En rattrapage, toutes les
+    variantes planifient dans la fenêtre compacte (fenetre_planification).
+    """
+
+    def __init__(self, db_config: dict, annee_academique: str = "2024-2025", session: str = "Normale",
+                 nb_variantes: int = 16, nb_workers: Optional[int] = None,
+                 temps_limite: Optional[float] = None, graine: int = 0, **options):
+        """
+        Args:
+            nb_variantes: Nombre de variantes du glouton à exécuter
+            nb_workers: Nombre de processus (nombre de cœurs par défaut)
+            temps_limite: Budget total en secondes, TEMPS_MAX_GENERATION_SECONDES par défaut
+            graine: Graine de base des variantes aléatoires
+            options: Options transmises à ExamScheduleOptimizer
+        """
+        super().__init__(db_config, annee_academique, session, **options)
+        self.nb_variantes = nb_variantes
+        self.nb_workers = nb_workers or os.cpu_count() or 1
+        self.temps_limite = temps_limite or self.TEMPS_MAX_GENERATION_SECONDES
+        self.graine = graine
+
+    @staticmethod
+    def score(variante: dict) -> tuple:
+        """Clé de comparaison : plus de modules planifiés, puis meilleur équilibrage"""
+        return (variante['nb_planifies'], -variante['ecart_type_surveillances'])
+
+    def generer_planning(self, date_debut: str = "2025-01-20", date_fin: str = "2025-02-15") -> dict:
+        """Génère l'emploi du temps en gardant la meilleure des variantes parallèles"""
+        start_time = time_module.time()
+        echeance = start_time + self.temps_limite
+
+        print("\n" + "="*60)
+        print("   GÉNÉRATION MULTI-DÉPARTS DE L'EMPLOI DU TEMPS")
+        print("="*60)
+
+        if not self.donnees_chargees:
+            self.charger_donnees()
+
+        dates = self.fenetre_planification(self.calculer_dates_disponibles(date_debut, date_fin))
+        graines = [None] + [self.graine + i for i in range(1, self.nb_variantes)]
+
+        print(f"\n⏳ {len(graines)} variantes sur {self.nb_workers} processus "
+              f"(budget {self.temps_limite:.0f}s)...\n")
+
+        meilleure = None
+        nb_terminees = 0
+        arret_workers = multiprocessing.Event()
+        executor = ProcessPoolExecutor(
+            max_workers=min(self.nb_workers, len(graines)),
+            initializer=_initialiser_worker,
+            initargs=(self.exporter_instance(), self.options_constructeur(), arret_workers)
+        )
+        try:
+            en_cours = {
+                executor.submit(_executer_variante, graine, dates, echeance)
+                for graine in graines
+            }
+            while en_cours:
+                restant = echeance - time_module.time()
+                if restant <= 0 or self.arret_demande():
+                    break
+                terminees, en_cours = wait(en_cours, timeout=min(restant, 0.5), return_when=FIRST_COMPLETED)
+                for future in terminees:
+                    variante = future.result()
+                    nb_terminees += 1
+                    self.signaler_progression(nb_terminees / len(graines),
+                                              f"{nb_terminees}/{len(graines)} variantes terminées")
+                    if meilleure is None or self.score(variante) > self.score(meilleure):
+                        meilleure = variante
+                        print(f"   ✓ Variante {variante['graine']}: {variante['nb_planifies']} modules, "
+                              f"écart-type surveillances {variante['ecart_type_surveillances']:.2f}")
+        finally:
+            # Les variantes encore en cours s'arrêtent au module suivant au lieu d'attendre l'échéance
+            arret_workers.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if meilleure is None:
+            self.reinitialiser_planning(dates)
+            modules_non_planifies = list(self.modules_a_planifier)
+        else:
+            modules_non_planifies = self.restaurer_placements(meilleure['placements'], dates)
+
+        resultat = self.construire_resultat(modules_non_planifies, start_time)
+        resultat['moteur'] = 'multistart'
+        resultat['nb_variantes_terminees'] = nb_terminees
+        resultat['graine_retenue'] = meilleure['graine'] if meilleure else None
+        return resultat
@@ -0,0 +1,259 @@
+"""
+Scénarios « et si » sur le planning (salle retirée, période raccourcie...)
+Chaque scénario est évalué en mémoire, sans écrire dans la table examens
+"""
+
+import copy
+import io
+import os
+import threading
+import time as time_module
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Dict, Iterable, List, Optional
+
+from instrumentation import Mesures
+from optimizer import ExamScheduleOptimizer
+
+# Planning de référence propre à chaque processus du pool, construit une seule fois
+_reference_worker: Optional[ExamScheduleOptimizer] = None
+_existants_worker: Dict[int, dict] = {}
+
+
+class Scenario:
+    """
+    Modifications appliquées aux ressources et à la période du planning de référence
+
+    Les salles retirées sont désignées par identifiant ou par nom.
+    """
+
+    def __init__(self, nom: str, salles_retirees: Iterable = (), salles_ajoutees: Iterable[dict] = (),
+                 professeurs_retires: Iterable[int] = (), date_debut: Optional[str] = None,
+                 date_fin: Optional[str] = None, max_surveillances_par_jour: Optional[int] = None,
+                 modules_a_replacer: Iterable[int] = ()):
+        self.nom = nom
+        self.salles_retirees = set(salles_retirees)
+        self.salles_ajoutees = list(salles_ajoutees)
+        self.professeurs_retires = set(professeurs_retires)
+        self.date_debut = date_debut
+        self.date_fin = date_fin
+        self.max_surveillances_par_jour = max_surveillances_par_jour
+        self.modules_a_replacer = set(modules_a_replacer)
+
+    def __repr__(self):
+        return f"Scenario({self.nom!r})"
+
+
+def bifurquer(reference: ExamScheduleOptimizer, scenario: Scenario) -> ExamScheduleOptimizer:
+    """
+    Copie de l'optimiseur de référence modifiée par le scénario
+
+    La copie est superficielle : modules, cohortes, graphe de conflits et
+    inscriptions restent partagés avec la référence, qui ne les modifie plus
+    après le chargement. Seuls les attributs que le scénario change (salles,
+    professeurs, quota de surveillances) et l'état du planning, recréé par
+    reinitialiser_planning, appartiennent à la copie.
+    """
+    noms_salles = {salle['nom'] for salle in reference.salles_disponibles}
+    ids_salles = {salle['id'] for salle in reference.salles_disponibles}
+    inconnues = [salle for salle in scenario.salles_retirees if salle not in ids_salles and salle not in noms_salles]
+    if inconnues:
+        raise ValueError(f"Salles inconnues dans le scénario {scenario.nom}: {inconnues}")
+
+    copie = copy.copy(reference)
+    copie.conn = None
+    copie.rappel_progression = None
+    copie.arret = threading.Event()
+    copie.mesures = Mesures()
+    copie.derniere_reparation = None
+
+    copie.salles_disponibles = sorted(
+        [
+            salle for salle in reference.salles_disponibles
+            if salle['id'] not in scenario.salles_retirees and salle['nom'] not in scenario.salles_retirees
+        ] + scenario.salles_ajoutees,
+        key=lambda salle: -salle['capacite']
+    )
+    copie.professeurs_disponibles = [
+        prof for prof in reference.professeurs_disponibles if prof['id'] not in scenario.professeurs_retires
+    ]
+    if scenario.max_surveillances_par_jour is not None:
+        copie.MAX_SURVEILLANCES_PAR_JOUR_PROF = scenario.max_surveillances_par_jour
+    return copie
+
+
+def calculer_indicateurs(optimizer: ExamScheduleOptimizer, existants: Dict[int, dict]) -> dict:
+    """Indicateurs du planning courant, comparé au planning de référence (existants)"""
+    nb_planifies = len(optimizer.examens_par_module)
+    nb_total = len(optimizer.modules_a_planifier)
+
+    nb_conserves = nb_deplaces = 0
+    for module_id, examen in optimizer.examens_par_module.items():
+        existant = existants.get(module_id)
+        if existant is None:
+            continue
+        if (existant['date'], existant['heure']) == (optimizer.date_examen(examen), optimizer.heure_examen(examen)):
+            nb_conserves += 1
+        else:
+            nb_deplaces += 1
+
+    jours = sorted({examen.jour for examen in optimizer.examens_par_module.values()})
+    return {
+        'nb_planifies': nb_planifies,
+        'nb_total': nb_total,
+        'taux_placement': nb_planifies / nb_total if nb_total else 1.0,
+        'nb_conserves': nb_conserves,
+        'nb_deplaces': nb_deplaces,
+        'nb_retires': sum(1 for module_id in existants if module_id not in optimizer.examens_par_module),
+        'nb_jours_utilises': len(jours),
+        'dernier_jour': optimizer.dates_disponibles[jours[-1]].isoformat() if jours else None,
+        'nb_salles_allouees': sum(len(examen.salles) for examen in optimizer.examens_par_module.values()),
+        'places_inoccupees': sum(
+            sum(salle['capacite'] for salle in optimizer.salles_examen(examen)) - examen.nb_etudiants
+            for examen in optimizer.examens_par_module.values()
+        ),
+        'ecart_type_surveillances': optimizer.calculer_ecart_type_surveillances(),
+        'penalite_etalement': optimizer.etalement.penalite
+    }
+
+
+def evaluer_scenario(reference: ExamScheduleOptimizer, existants: Dict[int, dict], scenario: Scenario,
+                     date_debut: str, date_fin: str) -> dict:
+    """
+    Replanifie de façon incrémentale le planning de référence selon le scénario
+
+    Les examens de référence encore valides (salles, surveillants, période)
+    sont repris tels quels par fixer_examens_existants ; seuls les autres sont
+    replacés par le glouton. En rattrapage, la période est réduite à la
+    fenêtre compacte du scénario (fenetre_planification), comme pour une
+    génération réelle.
+
+    Returns:
+        Nom du scénario, indicateurs, placements compacts, modules non planifiés et durée
+    """
+    debut = time_module.time()
+    optimizer = bifurquer(reference, scenario)
+    dates = optimizer.calculer_dates_disponibles(scenario.date_debut or date_debut, scenario.date_fin or date_fin)
+
+    with redirect_stdout(io.StringIO()):
+        dates = optimizer.fenetre_planification(dates)
+        optimizer.reinitialiser_planning(dates)
+        a_replacer = optimizer.fixer_examens_existants(existants, scenario.modules_a_replacer)
+        modules_non_planifies = optimizer.executer_glouton(dates, modules=a_replacer)
+
+    return {
+        'scenario': scenario.nom,
+        'indicateurs': calculer_indicateurs(optimizer, existants),
+        'placements': optimizer.exporter_placements(),
+        'modules_non_planifies': [module['id'] for module in modules_non_planifies],
+        'duree': time_module.time() - debut
+    }
+
+
+def _initialiser_worker(instance: dict, options: dict, contraintes: dict, existants: Dict[int, dict]):
+    """Reconstruit une fois pour toutes le planning de référence dans le processus du pool"""
+    global _reference_worker, _existants_worker
+    _reference_worker = ExamScheduleOptimizer(db_config={}, **options)
+    _reference_worker.importer_instance(instance)
+    _reference_worker.__dict__.update(contraintes)
+    _existants_worker = existants
+
+
+def _evaluer_scenario_worker(scenario: Scenario, date_debut: str, date_fin: str) -> dict:
+    return evaluer_scenario(_reference_worker, _existants_worker, scenario, date_debut, date_fin)
+
+
+class MoteurScenarios:
+    """
+    Évalue des scénarios à partir d'un planning de référence
+
+    La référence est le planning en mémoire de l'optimiseur s'il en a un,
+    sinon le planning enregistré pour son année et sa session (lu sans être
+    modifié). Les scénarios s'exécutent en parallèle dans un pool de
+    processus qui reçoit l'instance une seule fois.
+    """
+
+    def __init__(self, optimizer: ExamScheduleOptimizer, date_debut: str = "2025-01-20",
+                 date_fin: str = "2025-02-15", nb_workers: Optional[int] = None):
+        """
+        Args:
+            optimizer: Optimiseur aux données chargées
+            date_debut, date_fin: Période de référence, que les scénarios peuvent modifier
+            nb_workers: Nombre de processus (nombre de cœurs par défaut)
+        """
+        if not optimizer.donnees_chargees:
+            optimizer.charger_donnees()
+        self.reference = optimizer
+        self.date_debut = date_debut
+        self.date_fin = date_fin
+        self.nb_workers = nb_workers or os.cpu_count() or 1
+
+        if optimizer.examens_par_module:
+            self.existants = {
+                module_id: {'date': date, 'heure': heure, 'salles': list(salle_ids),
+                            'surveillants': list(surveillants)}
+                for module_id, date, heure, salle_ids, surveillants in optimizer.exporter_placements()
+            }
+        else:
+            self.existants = optimizer.charger_planning_existant()
+
+    def evaluer(self, scenarios: List[Scenario]) -> List[dict]:
+        """
+        Évalue les scénarios, ainsi qu'un scénario 'reference' sans modification
+        rejoué de la même façon pour servir de point de comparaison
+
+        Returns:
+            Résultats de evaluer_scenario, la référence en premier
+        """
+        scenarios = [Scenario('reference')] + list(scenarios)
+        nb_workers = min(self.nb_workers, len(scenarios))
+
+        print(f"\n⏳ {len(scenarios)} scénarios sur {nb_workers} processus...")
+        if nb_workers == 1:
+            resultats = [
+                evaluer_scenario(self.reference, self.existants, scenario, self.date_debut, self.date_fin)
+                for scenario in scenarios
+            ]
+        else:
+            contraintes = {
+                'MAX_EXAMENS_PAR_JOUR_ETUDIANT': self.reference.MAX_EXAMENS_PAR_JOUR_ETUDIANT,
+                'MAX_SURVEILLANCES_PAR_JOUR_PROF': self.reference.MAX_SURVEILLANCES_PAR_JOUR_PROF,
+                'CAPACITE_MAX_SALLE': self.reference.CAPACITE_MAX_SALLE,
+                'CRENEAUX_HORAIRES': self.reference.CRENEAUX_HORAIRES
+            }
+            with ProcessPoolExecutor(
+                max_workers=nb_workers,
+                initializer=_initialiser_worker,
+                initargs=(self.reference.exporter_instance(), self.reference.options_constructeur(),
+                          contraintes, self.existants)
+            ) as executor:
+                resultats = list(executor.map(
+                    _evaluer_scenario_worker, scenarios,
+                    [self.date_debut] * len(scenarios), [self.date_fin] * len(scenarios)
+                ))
+
+        for resultat in resultats:
+            indicateurs = resultat['indicateurs']
+            print(f"   ✓ {resultat['scenario']}: {indicateurs['nb_planifies']}/{indicateurs['nb_total']} modules, "
+                  f"{indicateurs['nb_deplaces']} déplacés, {indicateurs['nb_retires']} retirés "
+                  f"({resultat['duree']:.2f}s)")
+        return resultats
+
+    @staticmethod
+    def comparer(resultats: List[dict]) -> Dict[str, dict]:
+        """
+        Écart de chaque scénario à la référence (premier résultat), indicateur par indicateur
+
+        Returns:
+            Pour chaque scénario, {indicateur: (valeur, écart à la référence)} ;
+            l'écart vaut None pour les indicateurs non numériques
+        """
+        reference = resultats[0]['indicateurs']
+        comparaison = {}
+        for resultat in resultats:
+            comparaison[resultat['scenario']] = {
+                nom: (valeur, valeur - reference[nom]
+                      if isinstance(valeur, (int, float)) and reference[nom] is not None else None)
+                for nom, valeur in resultat['indicateurs'].items()
+            }
+        return comparaison
@@ -0,0 +1,137 @@
+"""
+Pénalité d'étalement des examens par cohorte
+Mesure à quel point les examens d'une cohorte s'enchaînent sans jour de repos
+"""
+
+import numpy as np
+from datetime import date as date_type
+from typing import Dict, Iterable, List, Optional
+
+
+class SpreadTracker:
+    """
+    Pénalité d'étalement tenue à jour à chaque ajout ou retrait d'examen
+
+    Deux examens successifs d'une cohorte séparés de 1 jour (aucun repos) ou
+    de 2 jours (un seul jour de repos) sont pénalisés, proportionnellement au
+    nombre d'étudiants de la cohorte. Les examens sont comptés dans une
+    matrice cohortes x jours calendaires : la variation due à un examen ne
+    dépend que des jours à moins de ecart_max de sa date. Ce voisinage est lu
+    pour toutes les cohortes du module (et toutes les dates candidates avec
+    deltas_ajout) en une fois, codé en entier et converti en variation par une
+    table calculée à la construction.
+    """
+
+    PENALITES_ECART = {1: 2, 2: 1}
+
+    def __init__(self, taille_cohortes: List[int], dates: Iterable[date_type] = ()):
+        """
+        Args:
+            taille_cohortes: Nombre d'étudiants de chaque cohorte
+            dates: Jours de la période ; la matrice s'étend d'elle-même si un
+                   examen tombe en dehors
+        """
+        self.taille_cohortes = np.asarray(taille_cohortes, dtype=np.int64)
+        self.ecart_max = max(self.PENALITES_ECART)
+        self.decalages = np.arange(-self.ecart_max, self.ecart_max + 1)
+        self.poids_voisinage = 1 << np.arange(len(self.decalages))
+        self.delta_par_voisinage = np.array(
+            [self._delta_voisinage(code) for code in range(1 << len(self.decalages))], dtype=np.int64
+        )
+
+        jours = [date.toordinal() for date in dates]
+        self.origine: Optional[int] = min(jours) - self.ecart_max if jours else None
+        nb_colonnes = max(jours) - min(jours) + 1 + 2 * self.ecart_max if jours else 0
+        self.examens = np.zeros((len(self.taille_cohortes), nb_colonnes), dtype=np.int8)
+        self.index_cohortes: Dict[int, np.ndarray] = {}
+        self.colonne_par_date: Dict[date_type, int] = {}
+        self.penalite = 0
+
+    @classmethod
+    def penalite_ecart(cls, ecart: int) -> int:
+        """Pénalité entre deux examens successifs séparés de `ecart` jours"""
+        return cls.PENALITES_ECART.get(ecart, 0)
+
+    def _delta_voisinage(self, code: int) -> int:
+        """
+        Variation de pénalité d'une cohorte pour un examen au centre du voisinage
+
+        Le bit i du code vaut 1 si la cohorte a un examen au jour decalages[i].
+        """
+        occupes = [decalage for i, decalage in enumerate(self.decalages.tolist()) if code >> i & 1]
+        if 0 in occupes:
+            # Un examen le même jour qu'un autre de la cohorte ne change aucun écart
+            return 0
+        precedent = min((-decalage for decalage in occupes if decalage < 0), default=None)
+        suivant = min((decalage for decalage in occupes if decalage > 0), default=None)
+
+        delta = 0
+        if precedent is not None:
+            delta += self.penalite_ecart(precedent)
+        if suivant is not None:
+            delta += self.penalite_ecart(suivant)
+        if precedent is not None and suivant is not None:
+            delta -= self.penalite_ecart(precedent + suivant)
+        return delta
+
+    def _cohortes(self, module: dict) -> np.ndarray:
+        """Indices des cohortes du module, calculés une seule fois"""
+        cohortes = self.index_cohortes.get(module['id'])
+        if cohortes is None:
+            cohortes = np.asarray(module['cohortes'], dtype=np.intp)
+            self.index_cohortes[module['id']] = cohortes
+        return cohortes
+
+    def _colonnes(self, dates: List[date_type]) -> np.ndarray:
+        """Colonnes des dates dans la matrice, étendue si une date (ou son voisinage) en sort"""
+        try:
+            return np.array([self.colonne_par_date[date] for date in dates], dtype=np.intp)
+        except KeyError:
+            pass
+        jours = np.fromiter((date.toordinal() for date in dates), dtype=np.int64, count=len(dates))
+        if self.origine is None:
+            self.origine = int(jours.min()) - self.ecart_max
+        avant = max(0, self.origine + self.ecart_max - int(jours.min()))
+        apres = max(0, int(jours.max()) + self.ecart_max + 1 - self.origine - self.examens.shape[1])
+        if avant or apres:
+            self.examens = np.pad(self.examens, ((0, 0), (avant, apres)))
+            self.origine -= avant
+            self.colonne_par_date.clear()
+        colonnes = jours - self.origine
+        self.colonne_par_date.update(zip(dates, colonnes.tolist()))
+        return colonnes
+
+    def _deltas(self, cohortes: np.ndarray, colonnes: np.ndarray) -> np.ndarray:
+        """Variation de pénalité pour un examen des cohortes à chacune des colonnes"""
+        # voisinage[cohorte, candidat, decalage] : la cohorte a un examen ce jour-là
+        voisinage = self.examens[cohortes][:, colonnes[:, None] + self.decalages] > 0
+        return self.taille_cohortes[cohortes] @ self.delta_par_voisinage[voisinage @ self.poids_voisinage]
+
+    def deltas_ajout(self, module: dict, dates: List[date_type]) -> np.ndarray:
+        """Variation de la pénalité totale pour chaque date candidate de l'examen du module"""
+        if not dates:
+            return np.zeros(0, dtype=np.int64)
+        colonnes = self._colonnes(dates)
+        return self._deltas(self._cohortes(module), colonnes)
+
+    def delta_ajout(self, module: dict, date: date_type) -> int:
+        """Variation de la pénalité totale si le module passe son examen à cette date"""
+        return int(self.deltas_ajout(module, [date])[0])
+
+    def ajouter(self, module: dict, date: date_type) -> int:
+        """Enregistre l'examen du module et retourne la variation de pénalité"""
+        cohortes = self._cohortes(module)
+        colonne = self._colonnes([date])
+        delta = int(self._deltas(cohortes, colonne)[0])
+        self.examens[cohortes, colonne[0]] += 1
+        self.penalite += delta
+        return delta
+
+    def retirer(self, module: dict, date: date_type) -> int:
+        """Retire l'examen du module et retourne la variation de pénalité"""
+        cohortes = self._cohortes(module)
+        colonne = self._colonnes([date])
+        self.examens[cohortes, colonne[0]] -= 1
+        delta = -int(self._deltas(cohortes, colonne)[0])
+        self.penalite += delta
+        return delta
@@ -0,0 +1,118 @@
+"""
+Files de priorité des surveillants par jour
+Chaque jour, les professeurs sont rangés par nombre de surveillances déjà attribuées
+"""
+
+import heapq
+from datetime import date as date_type
+from typing import Dict, List, Optional, Set
+
+
+class JourSurveillants:
+    """
+    Professeurs disponibles d'un jour, rangés par charge
+
+    Pour chaque département et pour l'ensemble des professeurs, un tas de
+    rangs (position dans la liste des professeurs) par niveau de charge
+    0 .. max_par_jour - 1 : à charge égale, le professeur de plus petit rang
+    passe en premier. Quand la charge d'un professeur change, il est ajouté
+    au tas de son nouveau niveau ; son ancienne entrée est ignorée quand elle
+    ressort (suppression paresseuse). Un professeur au maximum n'est dans
+    aucun tas valide.
+    """
+
+    def __init__(self, rangs_par_departement: Dict[int, List[int]], nb_professeurs: int,
+                 max_par_jour: int):
+        self.max_par_jour = max_par_jour
+        self.charge: List[int] = [0] * nb_professeurs
+        self.tas: Dict[Optional[int], List[List[int]]] = {
+            departement_id: [list(rangs)] + [[] for _ in range(max_par_jour - 1)]
+            for departement_id, rangs in rangs_par_departement.items()
+        }
+        self.tas[None] = [list(range(nb_professeurs))] + [[] for _ in range(max_par_jour - 1)]
+        self.nb_operations_tas = 0
+
+    def changer_charge(self, rang: int, departement_id: int, delta: int):
+        """Met à jour la charge du professeur et le range dans le tas de son nouveau niveau"""
+        charge = self.charge[rang] + delta
+        self.charge[rang] = charge
+        if charge < self.max_par_jour:
+            heapq.heappush(self.tas[departement_id][charge], rang)
+            heapq.heappush(self.tas[None][charge], rang)
+            self.nb_operations_tas += 2
+
+    def moins_charges(self, departement_id: Optional[int], nb: int, exclus: Set[int]) -> List[int]:
+        """
+        Rangs des nb professeurs les moins chargés du département (tous si None)
+
+        Les professeurs exclus et ceux ayant atteint le maximum sont ignorés.
+        Les tas sont laissés intacts, hormis les entrées périmées retirées.
+        """
+        choisis = []
+        for niveau, tas in enumerate(self.tas.get(departement_id, ())):
+            gardes = []
+            while tas and len(choisis) < nb:
+                rang = heapq.heappop(tas)
+                self.nb_operations_tas += 1
+                if self.charge[rang] != niveau or (gardes and gardes[-1] == rang):
+                    continue
+                gardes.append(rang)
+                if rang not in exclus:
+                    choisis.append(rang)
+            for rang in gardes:
+                heapq.heappush(tas, rang)
+            self.nb_operations_tas += len(gardes)
+            if len(choisis) == nb:
+                break
+        return choisis
+
+
+class FileSurveillants:
+    """Files de surveillants de chaque jour de la période, créées à la première utilisation"""
+
+    def __init__(self, professeurs: List[dict], max_par_jour: int):
+        """
+        Args:
+            professeurs: Professeurs ; à charge égale, l'ordre de la liste est
+                         l'ordre de préférence
+            max_par_jour: Nombre maximal de surveillances par jour et par professeur
+        """
+        self.professeurs = professeurs
+        self.max_par_jour = max_par_jour
+        self.rang_par_id = {prof['id']: rang for rang, prof in enumerate(professeurs)}
+        self.rangs_par_departement: Dict[int, List[int]] = {}
+        for rang, prof in enumerate(professeurs):
+            self.rangs_par_departement.setdefault(prof['departement_id'], []).append(rang)
+        self.jours: Dict[date_type, JourSurveillants] = {}
+
+    def jour(self, date: date_type) -> JourSurveillants:
+        jour = self.jours.get(date)
+        if jour is None:
+            jour = JourSurveillants(self.rangs_par_departement, len(self.professeurs), self.max_par_jour)
+            self.jours[date] = jour
+        return jour
+
+    def nb_operations_tas(self) -> int:
+        """Nombre d'insertions et de retraits effectués dans les tas de professeurs"""
+        return sum(jour.nb_operations_tas for jour in self.jours.values())
+
+    def est_disponible(self, date: date_type, prof_id: int) -> bool:
+        """Vérifie que le professeur peut encore surveiller ce jour-là"""
+        return self.jour(date).charge[self.rang_par_id[prof_id]] < self.max_par_jour
+
+    def moins_charges(self, date: date_type, departement_id: Optional[int], nb: int,
+                      exclus: Set[int] = frozenset()) -> List[int]:
+        """Identifiants des nb professeurs disponibles les moins chargés (département, ou tous si None)"""
+        exclus_rangs = {self.rang_par_id[prof_id] for prof_id in exclus}
+        rangs = self.jour(date).moins_charges(departement_id, nb, exclus_rangs)
+        return [self.professeurs[rang]['id'] for rang in rangs]
+
+    def ajouter(self, date: date_type, prof_id: int):
+        """Compte une surveillance de plus pour le professeur ce jour-là"""
+        rang = self.rang_par_id[prof_id]
+        self.jour(date).changer_charge(rang, self.professeurs[rang]['departement_id'], 1)
+
+    def retirer(self, date: date_type, prof_id: int):
+        """Compte une surveillance de moins pour le professeur ce jour-là"""
+        rang = self.rang_par_id[prof_id]
+        self.jour(date).changer_charge(rang, self.professeurs[rang]['departement_id'], -1)
@@ -0,0 +1,209 @@
+"""
+Exécution en tâche de fond de la génération des plannings
+Une seule génération active par (année académique, session), suivie par scrutation
+"""
+
+import threading
+import time as time_module
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple, Type
+
+from optimizer import POLITIQUES_BUDGET, ExamScheduleOptimizer
+
+# Part de la barre de progression attribuée à chaque étape d'une génération
+ETAPES_GENERATION = {
+    'chargement': (0.0, 0.1),
+    'analyse': (0.1, 0.15),
+    'planification': (0.15, 0.85),
+    'sauvegarde': (0.85, 1.0),
+}
+
+
+class Tache:
+    """
+    Génération lancée en arrière-plan
+
+    L'état passe de 'en_attente' à 'en_cours' puis à 'terminee', 'annulee'
+    ou 'echouee'. Les attributs sont écrits par le thread de la tâche et lus
+    tels quels par l'interface.
+
+    L'arrêt est transmis à l'optimiseur par un threading.Event. Une annulation
+    abandonne la génération ; un budget écoulé l'arrête aussi, et le planning
+    obtenu est sauvegardé selon politique_budget (voir POLITIQUES_BUDGET) s'il
+    laisse des modules non planifiés.
+    """
+
+    def __init__(self, annee_academique: str, session: str, moteur: str,
+                 budget_secondes: Optional[float], politique_budget: str = 'conserver'):
+        self.id = uuid.uuid4().hex[:8]
+        self.annee_academique = annee_academique
+        self.session = session
+        self.moteur = moteur
+        self.budget_secondes = budget_secondes
+        self.politique_budget = politique_budget
+        self.etat = 'en_attente'
+        self.etape = None
+        self.avancement = 0.0
+        self.message = "En attente d'un thread libre"
+        self.evenements = deque(maxlen=200)
+        self.resultat: Optional[dict] = None
+        self.analyse: Optional[dict] = None
+        self.erreur: Optional[str] = None
+        self.creation = time_module.time()
+        self.debut: Optional[float] = None
+        self.fin: Optional[float] = None
+        self.arret = threading.Event()
+        self.annulation_demandee = False
+        self.budget_epuise = False
+
+    @property
+    def est_active(self) -> bool:
+        return self.etat in ('en_attente', 'en_cours')
+
+    @property
+    def duree(self) -> float:
+        if self.debut is None:
+            return 0.0
+        return (self.fin or time_module.time()) - self.debut
+
+    def signaler(self, etape: str, avancement: float, message: str):
+        """Enregistre un événement de progression de l'étape (avancement entre 0 et 1)"""
+        debut, fin = ETAPES_GENERATION[etape]
+        self.etape = etape
+        self.avancement = debut + (fin - debut) * min(max(avancement, 0.0), 1.0)
+        self.message = message
+        self.evenements.append((time_module.time(), etape, self.avancement, message))
+
+    def epuiser_budget(self):
+        """Arrête la génération à l'échéance du budget : le planning obtenu reste sauvegardable"""
+        self.budget_epuise = True
+        self.arret.set()
+
+    def annuler(self):
+        """Demande l'arrêt : la génération s'interrompt et rien n'est sauvegardé"""
+        self.annulation_demandee = True
+        self.arret.set()
+
+
+class GestionnaireTaches:
+    """
+    Pool de threads exécutant les générations
+
+    Une même instance est partagée par toutes les sessions de l'interface :
+    une génération déjà active pour la même année et la même session est
+    renvoyée au lieu d'en lancer une seconde.
+    """
+
+    def __init__(self, db_config: dict, nb_threads: int = 2):
+        self.db_config = db_config
+        self.executor = ThreadPoolExecutor(max_workers=nb_threads, thread_name_prefix='generation')
+        self.taches: Dict[str, Tache] = {}
+        self.actives: Dict[Tuple[str, str], Tache] = {}
+        self.verrou = threading.Lock()
+
+    def lancer(self, classe_optimiseur: Type[ExamScheduleOptimizer], moteur: str,
+               annee_academique: str, session: str, date_debut: str, date_fin: str,
+               budget_secondes: Optional[float] = None, politique_budget: str = 'conserver',
+               **options) -> Tache:
+        """
+        Lance une génération suivie d'une sauvegarde, sauf si une autre est déjà
+        active pour la même année et la même session
+
+        Args:
+            budget_secondes: Temps maximal avant arrêt automatique (sans limite si None)
+            politique_budget: Sauvegarde du planning arrêté par le budget (POLITIQUES_BUDGET)
+            options: Options transmises au constructeur de l'optimiseur
+
+        Returns:
+            La tâche lancée, ou la tâche déjà active
+        """
+        if politique_budget not in POLITIQUES_BUDGET:
+            raise ValueError(f"Politique de budget inconnue: {politique_budget} "
+                             f"(disponibles: {', '.join(POLITIQUES_BUDGET)})")
+        with self.verrou:
+            active = self.actives.get((annee_academique, session))
+            if active is not None and active.est_active:
+                return active
+            tache = Tache(annee_academique, session, moteur, budget_secondes, politique_budget)
+            self.taches[tache.id] = tache
+            self.actives[(annee_academique, session)] = tache
+
+        self.executor.submit(self._executer, tache, classe_optimiseur, date_debut, date_fin, options)
+        return tache
+
+    def tache_active(self, annee_academique: str, session: str) -> Optional[Tache]:
+        """Dernière tâche lancée pour l'année et la session, active ou non"""
+        return self.actives.get((annee_academique, session))
+
+    def _executer(self, tache: Tache, classe_optimiseur: Type[ExamScheduleOptimizer],
+                  date_debut: str, date_fin: str, options: dict):
+        tache.etat = 'en_cours'
+        tache.debut = time_module.time()
+        minuteur = None
+        optimizer = None
+
+        try:
+            optimizer = classe_optimiseur(
+                db_config=self.db_config,
+                annee_academique=tache.annee_academique,
+                session=tache.session,
+                **options
+            )
+            optimizer.arret = tache.arret
+            if tache.budget_secondes:
+                minuteur = threading.Timer(tache.budget_secondes, tache.epuiser_budget)
+                minuteur.daemon = True
+                minuteur.start()
+
+            optimizer.connect()
+
+            tache.signaler('chargement', 0.0, "Chargement des données")
+            optimizer.charger_donnees()
+
+            tache.signaler('analyse', 0.0, "Analyse de faisabilité de la période")
+            tache.analyse = optimizer.analyser_faisabilite(date_debut, date_fin)
+            if not tache.analyse['faisable']:
+                tache.erreur = "Période infaisable : " + " ; ".join(tache.analyse['problemes'])
+                tache.etat = 'echouee'
+                return
+
+            tache.signaler('planification', 0.0, "Génération du planning")
+            optimizer.rappel_progression = lambda avancement, message: tache.signaler(
+                'planification', avancement, message
+            )
+            with optimizer.profiler():
+                tache.resultat = optimizer.generer_planning(date_debut=date_debut, date_fin=date_fin)
+
+            if tache.annulation_demandee:
+                tache.message = "Génération annulée, planning non sauvegardé"
+                tache.etat = 'annulee'
+                return
+
+            if (tache.budget_epuise and tache.resultat['modules_non_planifies']
+                    and not optimizer.appliquer_politique_budget(tache.resultat, tache.politique_budget)):
+                tache.resultat['mesures'] = optimizer.mesures.exporter()
+                tache.signaler('sauvegarde', 1.0, "Budget écoulé, planning enregistré conservé")
+                tache.etat = 'terminee'
+                return
+
+            tache.signaler('sauvegarde', 0.0, "Sauvegarde dans la base de données")
+            optimizer.rappel_progression = lambda avancement, message: tache.signaler(
+                'sauvegarde', avancement, message
+            )
+            optimizer.sauvegarder_planning()
+            tache.resultat['mesures'] = optimizer.mesures.exporter()
+            tache.resultat['sauvegarde'] = optimizer.derniere_sauvegarde
+            tache.signaler('sauvegarde', 1.0, "Planning sauvegardé")
+            tache.etat = 'terminee'
+
+        except Exception as e:
+            tache.erreur = str(e)
+            tache.etat = 'echouee'
+        finally:
+            if minuteur is not None:
+                minuteur.cancel()
+            if optimizer is not None:
+                optimizer.disconnect()
+            tache.fin = time_module.time()
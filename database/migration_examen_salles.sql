@@ -0,0 +1,50 @@
+-- ============================================
+-- MIGRATION - SALLES ALLOUEES PAR EXAMEN
+-- A appliquer une fois sur une base creee avec une version anterieure de schema.sql
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS examen_salles (
+    id SERIAL PRIMARY KEY,
+    examen_id INT NOT NULL REFERENCES examens(id) ON DELETE CASCADE,
+    lieu_id INT NOT NULL REFERENCES lieux_examen(id) ON DELETE RESTRICT,
+    date_examen DATE NOT NULL,
+    heure_debut TIME NOT NULL,
+    nb_etudiants INT NOT NULL CHECK (nb_etudiants >= 0),
+    CONSTRAINT unique_examen_salle UNIQUE (examen_id, lieu_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_examen_salles_creneau ON examen_salles(date_examen, heure_debut, lieu_id);
+CREATE INDEX IF NOT EXISTS idx_examen_salles_lieu ON examen_salles(lieu_id, date_examen);
+
+-- La capacité est désormais vérifiée salle par salle
+DROP TRIGGER IF EXISTS trig_check_capacite_examen ON examens;
+
+CREATE OR REPLACE FUNCTION check_capacite_examen()
+RETURNS TRIGGER AS $$
+DECLARE
+    capacite_max INT;
+BEGIN
+    SELECT capacite_examen INTO capacite_max
+    FROM lieux_examen
+    WHERE id = NEW.lieu_id;
+    
+    IF NEW.nb_etudiants > capacite_max THEN
+        RAISE EXCEPTION 'Capacite insuffisante: % etudiants pour une capacite de %', 
+                       NEW.nb_etudiants, capacite_max;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trig_check_capacite_examen ON examen_salles;
+CREATE TRIGGER trig_check_capacite_examen
+BEFORE INSERT OR UPDATE ON examen_salles
+FOR EACH ROW
+EXECUTE FUNCTION check_capacite_examen();
+
+-- Examens deja planifies : seule la salle principale est connue
+INSERT INTO examen_salles (examen_id, lieu_id, date_examen, heure_debut, nb_etudiants)
+SELECT e.id, e.lieu_id, e.date_examen, e.heure_debut, LEAST(e.nb_etudiants_inscrits, l.capacite_examen)
+FROM examens e
+JOIN lieux_examen l ON e.lieu_id = l.id
+ON CONFLICT (examen_id, lieu_id) DO NOTHING;
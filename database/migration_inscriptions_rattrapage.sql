@@ -0,0 +1,7 @@
+-- ============================================
+-- MIGRATION - INDEX DES INSCRIPTIONS NON VALIDEES (SESSION DE RATTRAPAGE)
+-- A appliquer une fois sur une base creee avec une version anterieure de schema.sql
+-- ============================================
+
+CREATE INDEX IF NOT EXISTS idx_inscriptions_non_validees ON inscriptions(annee_academique, module_id)
+WHERE est_valide IS NOT TRUE;
@@ -0,0 +1,49 @@
+-- ============================================
+-- MIGRATION - VERSIONS DES DONNÉES D'ENTRÉE DE L'OPTIMISEUR
+-- A appliquer une fois sur une base creee avec une version anterieure de schema.sql
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS versions_donnees (
+    nom_table VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION incrementer_version_donnees()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO versions_donnees (nom_table, version)
+    VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT (nom_table) DO UPDATE SET version = versions_donnees.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_version_modules ON modules;
+CREATE TRIGGER trg_version_modules
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON modules
+FOR EACH STATEMENT
+EXECUTE FUNCTION incrementer_version_donnees();
+
+DROP TRIGGER IF EXISTS trg_version_formations ON formations;
+CREATE TRIGGER trg_version_formations
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON formations
+FOR EACH STATEMENT
+EXECUTE FUNCTION incrementer_version_donnees();
+
+DROP TRIGGER IF EXISTS trg_version_lieux_examen ON lieux_examen;
+CREATE TRIGGER trg_version_lieux_examen
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lieux_examen
+FOR EACH STATEMENT
+EXECUTE FUNCTION incrementer_version_donnees();
+
+DROP TRIGGER IF EXISTS trg_version_professeurs ON professeurs;
+CREATE TRIGGER trg_version_professeurs
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON professeurs
+FOR EACH STATEMENT
+EXECUTE FUNCTION incrementer_version_donnees();
+
+DROP TRIGGER IF EXISTS trg_version_inscriptions ON inscriptions;
+CREATE TRIGGER trg_version_inscriptions
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON inscriptions
+FOR EACH STATEMENT
+EXECUTE FUNCTION incrementer_version_donnees();
@@ -0,0 +1,12 @@
+-- ============================================
+-- MIGRATION - VERSIONS DES PLANNINGS
+-- A appliquer une fois sur une base creee avec une version anterieure de schema.sql
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS versions_planning (
+    annee_academique VARCHAR(9) NOT NULL,
+    session VARCHAR(20) NOT NULL,
+    version BIGINT NOT NULL DEFAULT 0,
+    mis_a_jour TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (annee_academique, session)
+);
@@ -4,6 +4,7 @@
 -- ============================================
 
 -- Suppression des tables si elles existent
+DROP TABLE IF EXISTS examen_salles CASCADE;
 DROP TABLE IF EXISTS surveillances CASCADE;
 DROP TABLE IF EXISTS inscriptions CASCADE;
 DROP TABLE IF EXISTS examens CASCADE;
@@ -14,14 +15,18 @@ DROP TABLE IF EXISTS lieux_examen CASCADE;
 DROP TABLE IF EXISTS formations CASCADE;
 DROP TABLE IF EXISTS departements CASCADE;
 DROP TABLE IF EXISTS users CASCADE;
+DROP TABLE IF EXISTS versions_donnees CASCADE;
+DROP TABLE IF EXISTS versions_planning CASCADE;
 
 -- Suppression des fonctions et triggers
 DROP TRIGGER IF EXISTS trg_update_exam_count ON examens;
 DROP TRIGGER IF EXISTS trig_check_capacite_examen ON examens;
+DROP TRIGGER IF EXISTS trig_check_capacite_examen ON examen_salles;
 DROP FUNCTION IF EXISTS update_exam_student_count();
 DROP FUNCTION IF EXISTS check_capacite_examen();
 DROP FUNCTION IF EXISTS check_student_conflict(INT, DATE);
 DROP FUNCTION IF EXISTS count_prof_surveillances(INT, DATE);
+DROP FUNCTION IF EXISTS incrementer_version_donnees();
 DROP VIEW IF EXISTS v_examens_details;
 DROP VIEW IF EXISTS v_charge_professeurs;
 
@@ -143,6 +148,9 @@ CREATE TABLE inscriptions (
 CREATE INDEX idx_inscriptions_etudiant ON inscriptions(etudiant_id);
 CREATE INDEX idx_inscriptions_module ON inscriptions(module_id);
 CREATE INDEX idx_inscriptions_annee ON inscriptions(annee_academique);
+-- Inscriptions non validees, seules chargees pour une session de rattrapage
+CREATE INDEX idx_inscriptions_non_validees ON inscriptions(annee_academique, module_id)
+WHERE est_valide IS NOT TRUE;
 
 -- ============================================
 -- TABLE: EXAMENS
@@ -168,6 +176,26 @@ CREATE INDEX idx_examens_module ON examens(module_id);
 CREATE INDEX idx_examens_lieu ON examens(lieu_id);
 CREATE INDEX idx_examens_session ON examens(annee_academique, session);
 
+-- ============================================
+-- TABLE: EXAMEN_SALLES (Examens -> Salles)
+-- ============================================
+-- Un examen de plus de 20 etudiants occupe plusieurs salles : examens.lieu_id
+-- ne garde que la salle principale, chaque salle allouee est enregistree ici
+-- avec son effectif. Date et heure sont recopiees depuis examens pour indexer
+-- directement l'occupation par (date, heure, lieu).
+CREATE TABLE examen_salles (
+    id SERIAL PRIMARY KEY,
+    examen_id INT NOT NULL REFERENCES examens(id) ON DELETE CASCADE,
+    lieu_id INT NOT NULL REFERENCES lieux_examen(id) ON DELETE RESTRICT,
+    date_examen DATE NOT NULL,
+    heure_debut TIME NOT NULL,
+    nb_etudiants INT NOT NULL CHECK (nb_etudiants >= 0),
+    CONSTRAINT unique_examen_salle UNIQUE (examen_id, lieu_id)
+);
+
+CREATE INDEX idx_examen_salles_creneau ON examen_salles(date_examen, heure_debut, lieu_id);
+CREATE INDEX idx_examen_salles_lieu ON examen_salles(lieu_id, date_examen);
+
 -- ============================================
 -- TABLE: SURVEILLANCES (Profs -> Examens)
 -- ============================================
@@ -206,7 +234,7 @@ CREATE INDEX idx_users_role ON users(role);
 -- FONCTIONS ET TRIGGERS POUR CONTRAINTES
 -- ============================================
 
--- Fonction pour vérifier la capacité du lieu d'examen
+-- Fonction pour vérifier la capacité de chaque salle allouée à un examen
 CREATE OR REPLACE FUNCTION check_capacite_examen()
 RETURNS TRIGGER AS $$
 DECLARE
@@ -217,10 +245,10 @@ BEGIN
     FROM lieux_examen
     WHERE id = NEW.lieu_id;
     
-    -- Verifier si le nombre d'etudiants depasse la capacité
-    IF NEW.nb_etudiants_inscrits > capacite_max THEN
+    -- Verifier si l'effectif de la salle depasse sa capacité
+    IF NEW.nb_etudiants > capacite_max THEN
         RAISE EXCEPTION 'Capacite insuffisante: % etudiants pour une capacite de %', 
-                       NEW.nb_etudiants_inscrits, capacite_max;
+                       NEW.nb_etudiants, capacite_max;
     END IF;
     RETURN NEW;
 END;
@@ -228,7 +256,7 @@ $$ LANGUAGE plpgsql;
 
 -- Trigger pour vérifier la capacité avant insertion/modification
 CREATE TRIGGER trig_check_capacite_examen
-BEFORE INSERT OR UPDATE ON examens
+BEFORE INSERT OR UPDATE ON examen_salles
 FOR EACH ROW
 EXECUTE FUNCTION check_capacite_examen();
 
@@ -266,6 +294,68 @@ AFTER INSERT ON examens
 FOR EACH ROW
 EXECUTE FUNCTION update_exam_student_count();
 
+-- ============================================
+-- VERSIONS DES DONNÉES D'ENTRÉE DE L'OPTIMISEUR
+-- ============================================
+
+-- Compteur de modifications par table, lu par l'empreinte du cache
+-- d'instances de l'optimiseur (backend/cache_instance.py)
+CREATE TABLE versions_donnees (
+    nom_table VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION incrementer_version_donnees()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO versions_donnees (nom_table, version)
+    VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT (nom_table) DO UPDATE SET version = versions_donnees.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Un incrément par instruction (et non par ligne) sur chaque table source
+CREATE TRIGGER trg_version_modules
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON modules
+FOR EACH STATEMENT
+EXECUTE FUNCTION incrementer_version_donnees();
+
+CREATE TRIGGER trg_version_formations
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON formations
+FOR EACH STATEMENT
+EXECUTE FUNCTION incrementer_version_donnees();
+
+CREATE TRIGGER trg_version_lieux_examen
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lieux_examen
+FOR EACH STATEMENT
+EXECUTE FUNCTION incrementer_version_donnees();
+
+CREATE TRIGGER trg_version_professeurs
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON professeurs
+FOR EACH STATEMENT
+EXECUTE FUNCTION incrementer_version_donnees();
+
+CREATE TRIGGER trg_version_inscriptions
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON inscriptions
+FOR EACH STATEMENT
+EXECUTE FUNCTION incrementer_version_donnees();
+
+-- ============================================
+-- VERSIONS DES PLANNINGS
+-- ============================================
+
+-- Incrementee a chaque sauvegarde du planning d'une annee et d'une session
+-- qui modifie au moins une ligne (ExamScheduleOptimizer.sauvegarder_planning) :
+-- les caches des plannings peuvent l'utiliser comme cle
+CREATE TABLE versions_planning (
+    annee_academique VARCHAR(9) NOT NULL,
+    session VARCHAR(20) NOT NULL,
+    version BIGINT NOT NULL DEFAULT 0,
+    mis_a_jour TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (annee_academique, session)
+);
+
 -- ============================================
 -- VUES UTILES
 -- ============================================
@@ -370,6 +460,7 @@ CREATE SEQUENCE IF NOT EXISTS etudiants_matricule_seq START 100001;
 -- ============================================
 COMMENT ON TABLE examens IS 'Table principale des examens planifies';
 COMMENT ON TABLE surveillances IS 'Attribution des professeurs aux surveillances';
+COMMENT ON TABLE examen_salles IS 'Salles allouees a chaque examen avec leur effectif';
 COMMENT ON COLUMN lieux_examen.capacite_examen IS 'Capacite max en periode examen (20 etudiants)';
 COMMENT ON FUNCTION check_student_conflict IS 'Verifie si un etudiant a deja un examen ce jour-la';
 
@@ -13,8 +13,12 @@ sys.path.insert(0, str(backend_path))
 
 from database import Database
 from config import db_config
-from optimizer import ExamScheduleOptimizer
+from optimizer import POLITIQUES_BUDGET, ExamScheduleOptimizer
+from cpsat_optimizer import CpSatScheduleOptimizer
+from parallel_optimizer import MultiStartScheduleOptimizer
+from local_search import LocalSearchScheduleOptimizer
 from conflict_detector import ConflictDetector
+from taches import GestionnaireTaches
 
 st.set_page_config(
     page_title="Administration des Examens",
@@ -22,6 +26,13 @@ st.set_page_config(
     layout="wide"
 )
 
+
+@st.cache_resource
+def gestionnaire_taches() -> GestionnaireTaches:
+    """Gestionnaire de générations partagé par toutes les sessions du serveur"""
+    return GestionnaireTaches(db_config.DB_CONFIG)
+
+
 st.markdown("""
 <style>
     .admin-header {
@@ -130,6 +141,40 @@ def main():
                 "Date de fin de la période",
                 datetime(2025, 2, 15).date()
             )
+            
+            moteur = st.selectbox(
+                "Moteur d'optimisation",
+                ["Glouton", "Multi-départs", "CP-SAT", "Recherche locale"],
+                index=0,
+                help="Multi-départs exécute plusieurs variantes aléatoires du glouton en parallèle ; "
+                     "CP-SAT repart de la solution gloutonne quand celle-ci laisse des modules non planifiés ; "
+                     "Recherche locale améliore le planning glouton par recuit simulé jusqu'à la fin du budget"
+            )
+            
+            budget = st.number_input(
+                "Budget de temps (secondes, 0 = sans limite)",
+                min_value=0, max_value=3600, value=0,
+                help="À l'échéance, la génération s'arrête et le planning obtenu est sauvegardé "
+                     "selon la politique ci-dessous"
+            )
+            
+            politique_budget = st.selectbox(
+                "Si le budget s'écoule avant la fin",
+                list(POLITIQUES_BUDGET),
+                format_func={
+                    'conserver': "Conserver le planning enregistré",
+                    'completer': "Compléter avec le planning enregistré"
+                }.get,
+                disabled=not budget,
+                help="Modules non atteints à l'échéance : conserver garde le planning enregistré "
+                     "s'il compte plus d'examens ; compléter reprend leurs examens enregistrés"
+            )
+            
+            profilage = st.checkbox(
+                "Profiler la génération (cProfile)",
+                value=False,
+                help="Écrit un fichier .prof par génération, lisible avec pstats ou snakeviz"
+            )
             st.markdown('</div>', unsafe_allow_html=True)
         
         with col2:
@@ -159,47 +204,82 @@ def main():
         col_gen1, col_gen2, col_gen3 = st.columns([1, 2, 1])
         
         with col_gen2:
-            if st.button("Lancer la Génération Automatique", type="primary", use_container_width=True):
-                progress_bar = st.progress(0)
-                status_text = st.empty()
+            gestionnaire = gestionnaire_taches()
+            tache = gestionnaire.tache_active(annee_academique, session)
+            
+            if st.button("Lancer la Génération Automatique", type="primary", use_container_width=True,
+                         disabled=tache is not None and tache.est_active):
+                classe_optimiseur = {
+                    "Glouton": ExamScheduleOptimizer,
+                    "Multi-départs": MultiStartScheduleOptimizer,
+                    "CP-SAT": CpSatScheduleOptimizer,
+                    "Recherche locale": LocalSearchScheduleOptimizer
+                }[moteur]
+                tache = gestionnaire.lancer(
+                    classe_optimiseur,
+                    moteur,
+                    annee_academique,
+                    session,
+                    date_debut.strftime("%Y-%m-%d"),
+                    date_fin.strftime("%Y-%m-%d"),
+                    budget_secondes=budget or None,
+                    politique_budget=politique_budget,
+                    repertoire_cache=str(backend_path.parent / '.cache' / 'instances'),
+                    profileur='cprofile' if profilage else None,
+                    repertoire_profils=str(backend_path.parent / '.cache' / 'profils')
+                )
+            
+            if tache is not None:
+                st.caption(f"Génération {tache.id} ({tache.moteur}) - {tache.annee_academique}, "
+                           f"session {tache.session}")
                 
-                try:
-                    status_text.text("Initialisation de l'optimiseur...")
-                    progress_bar.progress(10)
-                    
-                    optimizer = ExamScheduleOptimizer(
-                        db_config=db_config.DB_CONFIG,
-                        annee_academique=annee_academique,
-                        session=session
-                    )
-                    
-                    status_text.text("Connexion à la base de données...")
-                    progress_bar.progress(20)
-                    optimizer.connect()
-                    
-                    status_text.text("Génération du planning en cours...")
-                    progress_bar.progress(30)
-                    
-                    start_time = time.time()
-                    
-                    resultat = optimizer.generer_planning(
-                        date_debut=date_debut.strftime("%Y-%m-%d"),
-                        date_fin=date_fin.strftime("%Y-%m-%d")
-                    )
-                    
-                    elapsed = time.time() - start_time
-                    
-                    progress_bar.progress(70)
-                    status_text.text("Sauvegarde dans la base de données...")
-                    
-                    optimizer.sauvegarder_planning()
-                    
-                    progress_bar.progress(100)
-                    optimizer.disconnect()
+                if tache.est_active:
+                    st.progress(tache.avancement)
+                    st.text(f"{tache.message} ({tache.duree:.0f}s)")
+                    if st.button("Annuler la génération", use_container_width=True):
+                        tache.annuler()
+                    time.sleep(1)
+                    st.rerun()
+                
+                elif tache.etat == 'echouee':
+                    st.error(f"Erreur lors de la génération: {tache.erreur}")
+                    if tache.analyse and tache.analyse['problemes']:
+                        st.markdown("\n".join(f"- {probleme}" for probleme in tache.analyse['problemes']))
+                
+                elif tache.etat == 'annulee':
+                    st.warning(tache.message)
+                
+                else:
+                    resultat = tache.resultat
+                    elapsed = resultat['temps_execution']
                     
                     st.success(f"Génération terminée en {elapsed:.2f} secondes")
+                    budget_epuise = resultat.get('budget_epuise')
+                    if budget_epuise and not budget_epuise['sauvegarde']:
+                        st.warning(
+                            f"Budget écoulé : {resultat['nb_planifies']} examens obtenus pour "
+                            f"{budget_epuise['examens_enregistres']} enregistrés, "
+                            "le planning enregistré est conservé"
+                        )
+                    elif budget_epuise:
+                        st.info(f"Budget écoulé : {budget_epuise['examens_repris']} examens enregistrés "
+                                "repris pour les modules non atteints")
+                    sauvegarde = resultat.get('sauvegarde')
+                    if sauvegarde and sauvegarde['changements']:
+                        changements = sauvegarde['changements']
+                        st.caption(
+                            f"Sauvegarde : {changements['examens_inseres']} examens insérés, "
+                            f"{changements['examens_modifies']} modifiés, "
+                            f"{changements['examens_inchanges']} inchangés, "
+                            f"{changements['examens_supprimes']} supprimés"
+                            + (f" - version {sauvegarde['version']} du planning"
+                               if sauvegarde['version'] is not None else "")
+                        )
+                    if tache.analyse:
+                        for alerte in tache.analyse['alertes']:
+                            st.warning(alerte)
                     
-                    col1, col2, col3 = st.columns(3)
+                    col1, col2, col3, col4 = st.columns(4)
                     
                     with col1:
                         st.metric(
@@ -221,14 +301,29 @@ def main():
                             len(resultat['modules_non_planifies'])
                         )
                     
+                    with col4:
+                        st.metric(
+                            "Pénalité d'étalement",
+                            f"{resultat.get('penalite_etalement', 0):,}",
+                            help="Examens d'une même cohorte sans jour de repos (2 par étudiant) "
+                                 "ou avec un seul jour de repos (1 par étudiant)"
+                        )
+                    
                     if resultat['modules_non_planifies']:
                         with st.expander("Modules non planifiés"):
                             for module in resultat['modules_non_planifies']:
                                 st.write(f"- {module['code']}: {module['nom']}")
                     
-                except Exception as e:
-                    st.error(f"Erreur lors de la génération: {e}")
-                    progress_bar.progress(0)
+                    mesures = resultat.get('mesures')
+                    if mesures:
+                        with st.expander("Mesures de performance"):
+                            st.markdown("###### Durée par phase (s)")
+                            st.table({phase: [round(duree, 3)] for phase, duree in
+                                      sorted(mesures['phases'].items(), key=lambda item: -item[1])})
+                            st.markdown("###### Compteurs")
+                            st.table({nom: [valeur] for nom, valeur in sorted(mesures['compteurs'].items())})
+                            if mesures['profil']:
+                                st.caption(f"Profil écrit dans {mesures['profil']}")
         
         st.markdown('</div>', unsafe_allow_html=True)
     
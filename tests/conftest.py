@@ -0,0 +1,44 @@
+"""
+Configuration commune des tests
+
+Les modules du backend s'importent à plat (from optimizer import ...), comme
+dans l'application : le dossier backend est ajouté au chemin d'import.
+
+Les tests qui ont besoin de PostgreSQL lisent la chaîne de connexion dans
+EXAMENS_TEST_DSN et sont ignorés sans elle. Chaque test travaille dans un
+schéma temporaire créé à partir de database/schema.sql puis supprimé.
+"""
+
+import os
+import sys
+import uuid
+
+import pytest
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RACINE, 'backend'))
+
+
+@pytest.fixture
+def base_test():
+    """Chaîne de connexion vers un schéma vide où database/schema.sql a été exécuté"""
+    dsn = os.environ.get('EXAMENS_TEST_DSN')
+    if not dsn:
+        pytest.skip("EXAMENS_TEST_DSN non défini (base PostgreSQL de test)")
+    import psycopg2
+    from psycopg2.extensions import make_dsn
+
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    conn.set_client_encoding('UTF8')
+    cur = conn.cursor()
+    cur.execute(f"CREATE SCHEMA {schema}")
+    try:
+        cur.execute(f"SET search_path TO {schema}")
+        with open(os.path.join(RACINE, 'database', 'schema.sql'), encoding='utf-8') as fichier:
+            cur.execute(fichier.read())
+        yield make_dsn(dsn, options=f"-c search_path={schema}")
+    finally:
+        cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        conn.close()
@@ -0,0 +1,69 @@
+"""
+Allocation des salles : le choix de l'allocateur est comparé à une
+recherche exhaustive du meilleur ajustement (le moins de salles, puis le
+moins de places perdues)
+"""
+
+import random
+from datetime import date, time
+from itertools import combinations
+
+import pytest
+
+from allocation_salles import AllocateurSalles, CreneauSalles
+
+CRENEAUX = [time(8, 0), time(10, 30), time(13, 0), time(15, 30)]
+JOUR = date(2025, 1, 20)
+
+
+def meilleur_ajustement(capacites_libres: list, nb_etudiants: int):
+    """(nombre de salles, places offertes) du meilleur choix, None si les salles ne suffisent pas"""
+    for nb_salles in range(1, len(capacites_libres) + 1):
+        totaux = [sum(choix) for choix in combinations(capacites_libres, nb_salles)
+                  if sum(choix) >= nb_etudiants]
+        if totaux:
+            return nb_salles, min(totaux)
+    return None
+
+
+def test_exemple_ou_les_plus_grandes_salles_perdent_des_places():
+    creneau = CreneauSalles({50: [0], 40: [1], 35: [2]})
+
+    assert dict(creneau.choisir_capacites(75)) == {40: 1, 35: 1}
+
+
+@pytest.mark.parametrize('graine', range(20))
+def test_choix_identique_a_la_recherche_exhaustive(graine):
+    rng = random.Random(graine)
+    salles = [
+        {'id': i + 1, 'capacite': rng.choice([20, 25, 30, 35, 40, 50, 60, 80, 120, 200])}
+        for i in range(rng.randint(1, 9))
+    ]
+    allocateur = AllocateurSalles(salles, CRENEAUX)
+    occupees = rng.sample(salles, rng.randint(0, len(salles) - 1))
+    allocateur.occuper(JOUR, CRENEAUX[0], 90, occupees)
+    libres = [salle for salle in salles if salle not in occupees]
+
+    for _ in range(20):
+        nb_etudiants = rng.randint(1, sum(salle['capacite'] for salle in salles) + 10)
+        choisies = allocateur.trouver(JOUR, CRENEAUX[0], 90, nb_etudiants)
+        attendu = meilleur_ajustement([salle['capacite'] for salle in libres], nb_etudiants)
+
+        if attendu is None:
+            assert choisies == []
+        else:
+            assert (len(choisies), sum(salle['capacite'] for salle in choisies)) == attendu
+            assert len({salle['id'] for salle in choisies}) == len(choisies)
+            assert all(salle in libres for salle in choisies)
+
+
+def test_examen_long_reserve_les_creneaux_recouverts():
+    salles = [{'id': 1, 'capacite': 30}, {'id': 2, 'capacite': 30}]
+    allocateur = AllocateurSalles(salles, CRENEAUX)
+
+    allocateur.occuper(JOUR, CRENEAUX[0], 180, [salles[0]])
+
+    assert allocateur.trouver(JOUR, CRENEAUX[1], 90, 30) == [salles[1]]
+    assert allocateur.trouver(JOUR, CRENEAUX[2], 90, 30) == [salles[0]]
+    allocateur.liberer(JOUR, CRENEAUX[0], 180, [salles[0]])
+    assert allocateur.trouver(JOUR, CRENEAUX[1], 90, 30) == [salles[0]]
@@ -0,0 +1,58 @@
+"""
+LecteurCopyEntiers : décodage d'un flux COPY binaire construit à la main,
+reçu en blocs de tailles quelconques
+"""
+
+import struct
+
+import numpy as np
+import pytest
+
+from copie_binaire import FIN_COPY, SIGNATURE_COPY, LecteurCopyEntiers
+
+
+def flux_copy(lignes: list, extension: bytes = b"") -> bytes:
+    """En-tête, lignes d'int4 non nuls puis fin de flux, comme les écrit PostgreSQL"""
+    donnees = SIGNATURE_COPY + struct.pack('>ii', 0, len(extension)) + extension
+    for ligne in lignes:
+        donnees += struct.pack('>h', len(ligne))
+        for valeur in ligne:
+            donnees += struct.pack('>ii', 4, valeur)
+    return donnees + FIN_COPY
+
+
+def lire(donnees: bytes, nb_colonnes: int, taille_bloc: int) -> np.ndarray:
+    lecteur = LecteurCopyEntiers(nb_colonnes)
+    for debut in range(0, len(donnees), taille_bloc):
+        lecteur.write(memoryview(donnees)[debut:debut + taille_bloc])
+    return lecteur.resultat()
+
+
+@pytest.mark.parametrize('taille_bloc', [1, 3, 7, 19, 22, 1000])
+def test_aller_retour(taille_bloc):
+    lignes = [(1, 10), (2, -3), (2147483647, -2147483648), (7, 0)]
+
+    resultat = lire(flux_copy(lignes, extension=b"ext"), 2, taille_bloc)
+
+    assert resultat.dtype == np.int64
+    assert resultat.tolist() == [list(ligne) for ligne in lignes]
+
+
+def test_flux_vide():
+    assert lire(flux_copy([]), 3, 5).shape == (0, 3)
+
+
+def test_signature_invalide():
+    with pytest.raises(ValueError):
+        lire(b"COPY" + flux_copy([(1, 2)])[4:], 2, 64)
+
+
+def test_colonne_non_int4_refusee():
+    donnees = flux_copy([(1, 2)]).replace(struct.pack('>ii', 4, 2), struct.pack('>iq', 8, 2))
+    with pytest.raises(ValueError):
+        lire(donnees, 2, 64)
+
+
+def test_flux_incomplet():
+    with pytest.raises(ValueError):
+        lire(flux_copy([(1, 2)])[:-2], 2, 64)
@@ -0,0 +1,127 @@
+"""
+Génération en ligne de commande : le planning n'est validé en base que si
+ConflictDetector n'y trouve aucun conflit critique
+"""
+
+from contextlib import closing
+
+import psycopg2
+
+import generer_plannings
+from generer_plannings import CODE_CONFLITS, CODE_INCOMPLET, CODE_SUCCES, main
+from optimizer import ExamScheduleOptimizer
+
+
+class OptimiseurConflictuel(ExamScheduleOptimizer):
+    """Glouton dont le dernier examen est déplacé le même jour que le premier"""
+
+    def generer_planning(self, date_debut: str = "2025-01-20", date_fin: str = "2025-02-15") -> dict:
+        resultat = super().generer_planning(date_debut, date_fin)
+        premier, dernier = self.examens_planifies[0], self.examens_planifies[-1]
+        dernier.jour = premier.jour
+        dernier.creneau = (premier.creneau + 1) % len(self.CRENEAUX_HORAIRES)
+        return resultat
+
+
+class OptimiseurInterrompu(ExamScheduleOptimizer):
+    """Glouton dont le budget s'écoule dès le premier module placé"""
+
+    def placer_module(self, module, dates, rng=None):
+        date = super().placer_module(module, dates, rng)
+        self.arret.set()
+        return date
+
+
+def remplir_base(dsn: str):
+    """Deux modules suivis par les mêmes trois étudiants, deux salles, deux professeurs"""
+    with closing(psycopg2.connect(dsn)) as conn, conn:
+        _remplir(conn.cursor())
+
+
+def _remplir(cur):
+    cur.execute("INSERT INTO departements (nom, code) VALUES ('Informatique', 'INFO') RETURNING id")
+    departement_id = cur.fetchone()[0]
+    cur.execute("""
+        INSERT INTO formations (nom, code, departement_id, niveau)
+        VALUES ('Licence informatique', 'L3-INFO', %s, 'L3') RETURNING id
+    """, (departement_id,))
+    formation_id = cur.fetchone()[0]
+    cur.execute("""
+        INSERT INTO professeurs (matricule, nom, prenom, departement_id)
+        VALUES ('P1', 'Prof', 'Un', %s), ('P2', 'Prof', 'Deux', %s)
+        RETURNING id
+    """, (departement_id, departement_id))
+    prof_id = cur.fetchone()[0]
+    cur.execute("""
+        INSERT INTO lieux_examen (nom, type, capacite_normale, capacite_examen)
+        VALUES ('Salle 1', 'Salle', 40, 20), ('Salle 2', 'Salle', 40, 20)
+    """)
+    cur.execute("""
+        INSERT INTO modules (code, nom, formation_id, semestre, professeur_responsable_id)
+        VALUES ('ALGO', 'Algorithmique', %s, 1, %s), ('BDD', 'Bases de donnees', %s, 1, %s)
+        RETURNING id
+    """, (formation_id, prof_id, formation_id, prof_id))
+    modules = [row[0] for row in cur.fetchall()]
+    cur.execute("""
+        INSERT INTO etudiants (matricule, nom, prenom, formation_id, promotion)
+        SELECT 'E' || n, 'Etudiant', 'N' || n, %s, 2022 FROM generate_series(1, 3) n
+        RETURNING id
+    """, (formation_id,))
+    etudiants = [row[0] for row in cur.fetchall()]
+    cur.executemany("""
+        INSERT INTO inscriptions (etudiant_id, module_id, annee_academique, session)
+        VALUES (%s, %s, '2024-2025', 'Normale')
+    """, [(etudiant_id, module_id) for etudiant_id in etudiants for module_id in modules])
+
+
+def compter_examens(dsn: str) -> int:
+    with closing(psycopg2.connect(dsn)) as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM examens WHERE annee_academique = '2024-2025' AND session = 'Normale'")
+        return cur.fetchone()[0]
+
+
+def lire_examens(dsn: str) -> list:
+    with closing(psycopg2.connect(dsn)) as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT module_id, date_examen, heure_debut FROM examens ORDER BY module_id")
+        return cur.fetchall()
+
+
+def generer(dsn: str, moteur: str, *options: str) -> int:
+    return main(['2024-2025:Normale', '--periode', 'Normale=2025-01-20:2025-01-24',
+                 '--moteur', moteur, '--nb-processus', '1', '--dsn', dsn, *options])
+
+
+def test_planning_valide_sauvegarde(base_test):
+    remplir_base(base_test)
+
+    assert generer(base_test, 'glouton') == CODE_SUCCES
+    assert compter_examens(base_test) == 2
+
+
+def test_conflit_etudiant_annule_la_sauvegarde(base_test, monkeypatch):
+    remplir_base(base_test)
+    monkeypatch.setitem(generer_plannings.MOTEURS, 'conflictuel', (__name__, 'OptimiseurConflictuel'))
+
+    assert generer(base_test, 'conflictuel') == CODE_CONFLITS
+    assert compter_examens(base_test) == 0
+
+
+def test_budget_ecoule_conserve_le_planning_enregistre(base_test, monkeypatch):
+    remplir_base(base_test)
+    monkeypatch.setitem(generer_plannings.MOTEURS, 'interrompu', (__name__, 'OptimiseurInterrompu'))
+    assert generer(base_test, 'glouton') == CODE_SUCCES
+    enregistres = lire_examens(base_test)
+
+    assert generer(base_test, 'interrompu', '--budget-epuise', 'conserver') == CODE_INCOMPLET
+    assert lire_examens(base_test) == enregistres
+
+
+def test_budget_ecoule_reprend_les_examens_non_atteints(base_test, monkeypatch):
+    remplir_base(base_test)
+    monkeypatch.setitem(generer_plannings.MOTEURS, 'interrompu', (__name__, 'OptimiseurInterrompu'))
+    assert generer(base_test, 'glouton') == CODE_SUCCES
+
+    assert generer(base_test, 'interrompu', '--budget-epuise', 'completer') == CODE_SUCCES
+    assert compter_examens(base_test) == 2
@@ -0,0 +1,96 @@
+"""
+Moteurs de planification sur une petite instance synthétique : aucun
+planning ne fait passer deux examens le même jour à un étudiant, ne met deux
+examens qui se chevauchent dans une salle, ne manque de places ni ne donne à
+un professeur plus de surveillances par jour que permis
+"""
+
+import io
+from collections import Counter, defaultdict
+from contextlib import redirect_stdout
+
+import pytest
+
+from benchmark import PERIODE_DEBUT, creer_optimiseur, generer_instance
+from local_search import LocalSearchScheduleOptimizer
+from optimizer import ExamScheduleOptimizer
+from parallel_optimizer import MultiStartScheduleOptimizer
+
+DATE_FIN = "2025-02-15"
+
+
+@pytest.fixture(scope='module')
+def instance():
+    instance = generer_instance(1500, taux_options=0.2, graine=7)
+    # Capacités variées pour que le choix des salles compte
+    for salle in instance['salles']:
+        salle['capacite'] = (20, 30, 45, 60, 120)[salle['id'] % 5]
+    return instance
+
+
+def verifier_planning(optimizer: ExamScheduleOptimizer, instance: dict):
+    """Vérifie les contraintes dures sur les placements exportés"""
+    placements = optimizer.exporter_placements()
+    modules = {module['id']: module for module in instance['modules']}
+    salles = {salle['id']: salle for salle in instance['salles']}
+    profs = {prof['id'] for prof in instance['professeurs']}
+    etudiants_par_module = defaultdict(set)
+    for module_id, etudiant_id in instance['inscriptions'].tolist():
+        etudiants_par_module[module_id].add(etudiant_id)
+
+    assert len({placement[0] for placement in placements}) == len(placements)
+
+    examens_par_etudiant_jour = Counter()
+    intervalles_par_salle = defaultdict(list)
+    surveillances_par_prof_jour = Counter()
+    for module_id, date, heure, salle_ids, surveillants in placements:
+        etudiants = etudiants_par_module[module_id]
+        for etudiant_id in etudiants:
+            examens_par_etudiant_jour[(etudiant_id, date)] += 1
+
+        assert sum(salles[salle_id]['capacite'] for salle_id in salle_ids) >= len(etudiants)
+        assert len(set(salle_ids)) == len(salle_ids)
+        debut = heure.hour * 60 + heure.minute
+        for salle_id in salle_ids:
+            intervalles_par_salle[(salle_id, date)].append((debut, debut + modules[module_id]['duree_minutes']))
+
+        assert len(surveillants) == len(salle_ids)
+        assert len(set(surveillants)) == len(surveillants)
+        assert set(surveillants) <= profs
+        for prof_id in surveillants:
+            surveillances_par_prof_jour[(prof_id, date)] += 1
+
+    assert max(examens_par_etudiant_jour.values(), default=0) <= optimizer.MAX_EXAMENS_PAR_JOUR_ETUDIANT
+    assert max(surveillances_par_prof_jour.values(), default=0) <= optimizer.MAX_SURVEILLANCES_PAR_JOUR_PROF
+    for intervalles in intervalles_par_salle.values():
+        intervalles.sort()
+        for (_, fin), (debut, _) in zip(intervalles, intervalles[1:]):
+            assert fin <= debut
+
+
+@pytest.mark.parametrize('classe_optimiseur, options', [
+    (ExamScheduleOptimizer, {}),
+    (ExamScheduleOptimizer, {'ordre_modules': 'dsatur', 'etaler_examens': False}),
+    (MultiStartScheduleOptimizer, {'nb_variantes': 4, 'nb_workers': 2, 'temps_limite': 30}),
+    (LocalSearchScheduleOptimizer, {'temps_limite': 2}),
+], ids=['glouton', 'glouton-dsatur', 'multi-departs', 'recherche-locale'])
+def test_planning_sans_violation(instance, classe_optimiseur, options):
+    optimizer = creer_optimiseur(instance, classe_optimiseur, **options)
+
+    with redirect_stdout(io.StringIO()):
+        resultat = optimizer.generer_planning(PERIODE_DEBUT, DATE_FIN)
+
+    assert resultat['nb_planifies'] == len(optimizer.exporter_placements()) > 0
+    verifier_planning(optimizer, instance)
+
+
+def test_cpsat_sans_violation(instance):
+    pytest.importorskip('ortools')
+    from cpsat_optimizer import CpSatScheduleOptimizer
+
+    # Période trop courte pour le glouton : CP-SAT reconstruit le planning
+    optimizer = creer_optimiseur(instance, CpSatScheduleOptimizer, temps_limite=5)
+    with redirect_stdout(io.StringIO()):
+        optimizer.generer_planning(PERIODE_DEBUT, "2025-01-29")
+
+    verifier_planning(optimizer, instance)
@@ -0,0 +1,47 @@
+"""
+Backends d'occupation des étudiants : tous répondent de la même façon à
+est_libre au fil d'une même suite d'examens ajoutés et retirés (chaque
+module n'ayant qu'un examen, comme dans l'optimiseur)
+"""
+
+import random
+
+from benchmark import creer_optimiseur, generer_instance, jours_ouvres
+from occupation import BACKENDS_OCCUPATION, creer_occupation
+
+
+def test_backends_identiques():
+    optimizer = creer_optimiseur(generer_instance(1500, taux_options=0.3, graine=3))
+    modules = optimizer.modules_a_planifier
+    dates = jours_ouvres("2025-01-20", "2025-01-31")
+    occupations = {
+        backend: creer_occupation(backend, modules, len(optimizer.taille_cohortes), dates,
+                                  optimizer.graphe_conflits)
+        for backend in BACKENDS_OCCUPATION
+    }
+
+    rng = random.Random(0)
+    planifies = []
+    for _ in range(600):
+        if planifies and rng.random() < 0.3:
+            module, date = planifies.pop(rng.randrange(len(planifies)))
+            for occupation in occupations.values():
+                occupation.liberer(module, date)
+            continue
+
+        module, date = rng.choice(modules), rng.choice(dates)
+        if any(module is planifie for planifie, _ in planifies):
+            continue
+        reponses = {backend: occupation.est_libre(module, date) for backend, occupation in occupations.items()}
+        assert len(set(reponses.values())) == 1, reponses
+        if reponses['ensembles']:
+            planifies.append((module, date))
+            for occupation in occupations.values():
+                occupation.occuper(module, date)
+
+    ids_planifies = {module['id'] for module, _ in planifies}
+    for module in modules:
+        if module['id'] in ids_planifies:
+            continue
+        for date in dates:
+            assert len({occupation.est_libre(module, date) for occupation in occupations.values()}) == 1
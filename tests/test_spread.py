@@ -0,0 +1,47 @@
+"""
+SpreadTracker : la pénalité tenue à jour examen par examen est égale à la
+pénalité recalculée entièrement à partir des jours d'examen des cohortes
+"""
+
+import random
+from collections import defaultdict
+
+from benchmark import creer_optimiseur, generer_instance, jours_ouvres
+from spread import SpreadTracker
+
+
+def penalite_complete(tracker: SpreadTracker, examens: list) -> int:
+    """Somme, par cohorte, des pénalités entre jours d'examen successifs"""
+    jours_par_cohorte = defaultdict(set)
+    for module, date in examens:
+        for cohorte_id in module['cohortes']:
+            jours_par_cohorte[cohorte_id].add(date.toordinal())
+
+    penalite = 0
+    for cohorte_id, jours in jours_par_cohorte.items():
+        jours = sorted(jours)
+        for precedent, suivant in zip(jours, jours[1:]):
+            penalite += int(tracker.taille_cohortes[cohorte_id]) * tracker.penalite_ecart(suivant - precedent)
+    return penalite
+
+
+def test_penalite_incrementale_egale_au_recalcul():
+    optimizer = creer_optimiseur(generer_instance(1500, taux_options=0.3, graine=5))
+    modules = optimizer.modules_a_planifier
+    dates = jours_ouvres("2025-01-20", "2025-02-07")
+    # La matrice doit aussi s'étendre aux dates hors période
+    tracker = SpreadTracker(optimizer.taille_cohortes, dates[2:-2])
+
+    rng = random.Random(0)
+    examens = []
+    for _ in range(500):
+        if examens and rng.random() < 0.35:
+            module, date = examens.pop(rng.randrange(len(examens)))
+            tracker.retirer(module, date)
+        else:
+            module, date = rng.choice(modules), rng.choice(dates)
+            deltas = tracker.deltas_ajout(module, dates)
+            assert tracker.ajouter(module, date) == deltas[dates.index(date)]
+            examens.append((module, date))
+
+        assert tracker.penalite == penalite_complete(tracker, examens)